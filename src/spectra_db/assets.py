@@ -4,9 +4,10 @@ import os
 import shutil
 import tempfile
 from importlib import resources
+from importlib.resources.abc import Traversable
 from pathlib import Path
 
-from spectra_db.util.paths import RepoPaths, get_paths, get_user_paths
+from spectra_db.util.paths import get_install_paths
 
 ASSETS_PKG = "spectra_db_assets"
 
@@ -16,14 +17,19 @@ _DB_FILENAME_BY_PROFILE: dict[str, str] = {
 }
 
 
-def _copy_file_atomic(src: Path, dst: Path) -> None:
+def _copy_file_atomic(src: Traversable | Path, dst: Path) -> None:
     dst.parent.mkdir(parents=True, exist_ok=True)
-    fd, tmp_name = tempfile.mkstemp(prefix=dst.name + ".", suffix=".tmp", dir=str(dst.parent))
+    fd, tmp_name = tempfile.mkstemp(prefix=dst.name + ".", suffix=".tmp", dir=os.fspath(dst.parent))
     try:
-        tmp_path = Path(tmp_name)
-        with src.open("rb") as fsrc, os.fdopen(fd, "wb") as fdst:
-            shutil.copyfileobj(fsrc, fdst, length=16 * 1024 * 1024)
-        tmp_path.replace(dst)
+        if isinstance(src, Path):
+            os.close(fd)
+            # copyfile uses the platform's in-kernel fast path (sendfile / copy_file_range / fcopyfile) where available.
+            shutil.copyfile(src, tmp_name)
+        else:
+            # Non-filesystem resource (e.g. zipped package): stream it.
+            with os.fdopen(fd, "wb") as fdst, src.open("rb") as fsrc:
+                shutil.copyfileobj(fsrc, fdst, length=16 * 1024 * 1024)
+        os.replace(tmp_name, dst)
     except Exception:
         try:
             Path(tmp_name).unlink(missing_ok=True)
@@ -32,19 +38,6 @@ def _copy_file_atomic(src: Path, dst: Path) -> None:
         raise
 
 
-def _resolve_install_paths(*, prefer_env: bool = True) -> RepoPaths:
-    """
-    Where to install DB assets:
-
-    - If SPECTRA_DB_DATA_DIR is set and prefer_env=True -> install there (user explicitly requested).
-    - Otherwise -> install into per-user data dir.
-    """
-    p = get_paths()
-    if prefer_env and p.source == "env":
-        return p
-    return get_user_paths()
-
-
 def ensure_profile_db_installed(*, profile: str, dest_db_path: Path) -> None:
     """
     Ensure the DuckDB file for `profile` exists at `dest_db_path`.
@@ -67,7 +60,7 @@ def ensure_profile_db_installed(*, profile: str, dest_db_path: Path) -> None:
     if not src.exists():
         raise FileNotFoundError(f"Assets package '{ASSETS_PKG}' is installed but missing db/{filename}.\nReinstall the correct assets wheel.")
 
-    _copy_file_atomic(Path(str(src)), dest_db_path)
+    _copy_file_atomic(src, dest_db_path)
 
 
 def ensure_db_available(*, profile: str) -> Path:
@@ -76,7 +69,7 @@ def ensure_db_available(*, profile: str) -> Path:
 
     This is what enables: install 3 wheels -> query anywhere, no paths.
     """
-    paths = _resolve_install_paths(prefer_env=True)
+    paths = get_install_paths(prefer_env=True)
     dest = paths.default_duckdb_path if profile == "atomic" else paths.default_molecular_duckdb_path
     ensure_profile_db_installed(profile=profile, dest_db_path=dest)
     return dest
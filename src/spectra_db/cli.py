@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import math
 from collections import defaultdict
@@ -187,7 +188,9 @@ def _degeneracy_g_from_j(j: object) -> float | None:
         return None
 
 
-def main(argv: list[str] | None = None) -> None:
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser once; parse_args() does not mutate it, so repeated main() calls reuse it."""
     ap = argparse.ArgumentParser(description="Query local Spectra DB.")
     ap.add_argument(
         "--profile",
@@ -251,7 +254,11 @@ def main(argv: list[str] | None = None) -> None:
     bs.add_argument("--db-path", type=Path, default=None, help="Override output DuckDB path. Defaults depend on profile.")
     bs.add_argument("--truncate-all", action="store_true", help="Delete existing rows before loading.")
 
-    args = ap.parse_args(argv)
+    return ap
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _build_parser().parse_args(argv)
 
     if args.cmd == "bootstrap":
         paths = get_paths()
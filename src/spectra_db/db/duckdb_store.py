@@ -146,28 +146,38 @@ class DuckDBStore:
             return 0
 
         with self.connect() as con:
-            df = con.execute(
-                "SELECT * FROM read_ndjson_auto(?)",
-                [str(ndjson_path)],
-            ).fetchdf()
+            return self._load_ndjson(con, table_name, ndjson_path, truncate=truncate)
 
-            if len(df) == 0:
-                return 0
+    def _load_ndjson(self, con: duckdb.DuckDBPyConnection, table_name: str, ndjson_path: Path, *, truncate: bool) -> int:
+        """load_table_from_ndjson on a caller-owned connection (so several loads can share a transaction)."""
+        if not ndjson_path.exists():
+            return 0
 
-            if truncate:
-                con.execute(f"DELETE FROM {_qident(table_name)}")
+        df = con.execute(
+            "SELECT * FROM read_ndjson_auto(?)",
+            [str(ndjson_path)],
+        ).fetchdf()
+
+        if len(df) == 0:
+            return 0
 
-            table_cols = self._table_columns(con, table_name)
-            df_cols = list(df.columns)
+        if truncate:
+            con.execute(f"DELETE FROM {_qident(table_name)}")
 
-            common = [c for c in df_cols if c in table_cols]
-            if not common:
-                raise ValueError(f"No matching columns between NDJSON {ndjson_path.name} ({df_cols}) and table {table_name} ({table_cols})")
+        table_cols = self._table_columns(con, table_name)
+        df_cols = list(df.columns)
 
-            con.register("incoming_df", df)
+        common = [c for c in df_cols if c in table_cols]
+        if not common:
+            raise ValueError(f"No matching columns between NDJSON {ndjson_path.name} ({df_cols}) and table {table_name} ({table_cols})")
+
+        con.register("incoming_df", df)
+        try:
             cols_sql = ", ".join(_qident(c) for c in common)
             con.execute(f"INSERT INTO {_qident(table_name)} ({cols_sql}) SELECT {cols_sql} FROM incoming_df")
-            return len(df)
+        finally:
+            con.unregister("incoming_df")
+        return len(df)
 
     def bootstrap_from_normalized_dir(
         self,
@@ -190,14 +200,22 @@ class DuckDBStore:
 
         results: dict[str, int] = {}
 
-        if truncate_all:
-            # truncate in reverse dependency order
-            with self.connect() as con:
+        with self.connect() as con:
+            if truncate_all:
+                # truncate in reverse dependency order. Each DELETE commits on its own: DuckDB rejects
+                # deleting a referenced parent row in the same transaction that deleted its children.
                 for t in ["spectroscopic_parameters", "transitions", "states", "refs", "isotopologues", "species"]:
                     con.execute(f"DELETE FROM {_qident(t)}")
 
-        for table, fname in mapping:
-            path = normalized_dir / fname
-            results[table] = self.load_table_from_ndjson(table, path, truncate=False)
+            # All loads share one connection and one transaction: a single commit instead of one per
+            # table, and a failed load leaves no partially loaded tables behind.
+            con.begin()
+            try:
+                for table, fname in mapping:
+                    results[table] = self._load_ndjson(con, table, normalized_dir / fname, truncate=False)
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
 
         return results
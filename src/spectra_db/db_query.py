@@ -173,29 +173,17 @@ def get_atomic_lines(
         except Exception:
             threshold = None
 
-    # Pull a lot of lines then filter down; still bounded.
-    raw_lines = api.lines(
+    # The Ei_cm-1 <= threshold filter runs in DuckDB, so the limit applies to lines that pass it.
+    filtered = api.lines(
         iso_id=iso_id,
         unit=unit,
         min_wav=min_wav,
         max_wav=max_wav,
+        max_lower_energy=threshold,
         limit=max_lines,
         parse_payload=True,
     )
 
-    filtered: list[dict[str, Any]] = []
-    for r in raw_lines:
-        payload = r.get("payload") or {}
-        ei = payload.get("Ei_cm-1")
-        keep = True
-        if threshold is not None and ei is not None:
-            try:
-                keep = float(ei) <= threshold
-            except Exception:
-                keep = True
-        if keep:
-            filtered.append(r)
-
     out: dict[str, Any] = {
         "profile": "atomic",
         "query": species,
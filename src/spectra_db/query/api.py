@@ -5,14 +5,50 @@ import json
 import re
 from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import duckdb
 
 from spectra_db.db.duckdb_store import DuckDBStore
 from spectra_db.util.paths import get_paths
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+_FORMULA_RE = re.compile(r"(?:[A-Z][a-z]?\d*)+")
+_FORMULA_TOKEN_RE = re.compile(r"[A-Z][a-z]?\d*")
+_DIGITS = "0123456789"
+# Lower-level energy from the ASD line payload, extracted by DuckDB; unparseable payloads/values yield NULL.
+_PAYLOAD_EI_SQL = """TRY_CAST(CASE WHEN json_valid(t.intensity_json) THEN t.intensity_json ->> '$."Ei_cm-1"' END AS DOUBLE)"""
+
+
+@lru_cache(maxsize=1024)
+def _reverse_formula(s: str) -> str | None:
+    """Reverse element tokens of a simple formula ("HF" -> "FH", "DH+" -> "HD+"), or None if not applicable."""
+    q = (s or "").strip()
+    if not q:
+        return None
+
+    # Trailing charge ("+", "-", "+2", ...) without a second regex: strip digits, then look for a sign.
+    head = q.rstrip(_DIGITS)
+    if head and head[-1] in "+-":
+        q_core, charge = head[:-1], q[len(head) - 1 :]
+    else:
+        q_core, charge = q, ""
+
+    if not _FORMULA_RE.fullmatch(q_core):
+        return None
+    tokens = _FORMULA_TOKEN_RE.findall(q_core)
+    if len(tokens) < 2:
+        return None
+
+    rev = "".join(reversed(tokens)) + charge
+    if rev.lower() == q.lower():
+        return None
+    return rev
+
 
 @dataclass
 class QueryAPI:
@@ -21,42 +57,16 @@ class QueryAPI:
     con: duckdb.DuckDBPyConnection
     profile: str = "atomic"
 
-    _FORMULA_TOKEN_RE = re.compile(r"([A-Z][a-z]?)(\d*)")
-    _CHARGE_RE = re.compile(r"([+-]\d*)$")
-
     @classmethod
     def _reverse_formula_tokens(cls, s: str) -> str | None:
-        q = (s or "").strip()
-        if not q:
-            return None
+        return _reverse_formula(s)
 
-        charge = ""
-        m_charge = cls._CHARGE_RE.search(q)
-        if m_charge:
-            charge = m_charge.group(1)
-            q_core = q[: -len(charge)]
-        else:
-            q_core = q
-
-        tokens: list[tuple[str, str]] = []
-        pos = 0
-        for m in cls._FORMULA_TOKEN_RE.finditer(q_core):
-            if m.start() != pos:
-                return None
-            el = m.group(1)
-            cnt = m.group(2) or ""
-            tokens.append((el, cnt))
-            pos = m.end()
-
-        if pos != len(q_core):
-            return None
-        if len(tokens) < 2:
-            return None
-
-        rev = "".join(f"{el}{cnt}" for (el, cnt) in reversed(tokens)) + charge
-        if rev.lower() == s.strip().lower():
-            return None
-        return rev
+    def _formula_condition(self, q: str, *, include_formula_reversal: bool) -> tuple[str, list[Any]]:
+        """WHERE condition matching `q` (and its token-reversed form) as an exact formula, in one IN probe."""
+        rev = self._reverse_formula_tokens(q) if include_formula_reversal else None
+        if rev:
+            return "lower(formula) IN (lower(?), lower(?))", [q, rev]
+        return "lower(formula) = lower(?)", [q]
 
     def _fetch_dicts(self, sql: str, params: Sequence[Any] | None = None) -> list[dict[str, Any]]:
         cur = self.con.execute(sql, params or [])
@@ -127,13 +137,9 @@ class QueryAPI:
                 params.append(q)
 
             elif f == "formula":
-                rev = self._reverse_formula_tokens(q) if include_formula_reversal else None
-                if rev:
-                    clauses.append("SELECT * FROM species WHERE lower(formula) = lower(?) OR lower(formula) = lower(?)")
-                    params.extend([q, rev])
-                else:
-                    clauses.append("SELECT * FROM species WHERE lower(formula) = lower(?)")
-                    params.append(q)
+                cond, cond_params = self._formula_condition(q, include_formula_reversal=include_formula_reversal)
+                clauses.append(f"SELECT * FROM species WHERE {cond}")
+                params.extend(cond_params)
 
             elif f == "name":
                 clauses.append("SELECT * FROM species WHERE name IS NOT NULL AND lower(name) = lower(?)")
@@ -160,12 +166,25 @@ class QueryAPI:
             return None
 
         if exact_first:
-            for mode in ("species_id", "formula", "name"):
-                rows = self.find_species_exact(q, by=(mode,), limit=1, include_formula_reversal=include_formula_reversal)
-                if rows:
-                    sid = rows[0].get("species_id")
-                    if isinstance(sid, str) and sid:
-                        return sid
+            # species_id, then formula, then name -- ranked in one query instead of a round-trip per mode.
+            cond, cond_params = self._formula_condition(q, include_formula_reversal=include_formula_reversal)
+            row = self.con.execute(
+                f"""
+                SELECT species_id FROM (
+                    SELECT species_id, 0 AS mode_rank FROM species WHERE species_id = ?
+                    UNION ALL
+                    SELECT species_id, 1 AS mode_rank FROM species WHERE {cond}
+                    UNION ALL
+                    SELECT species_id, 2 AS mode_rank FROM species WHERE name IS NOT NULL AND lower(name) = lower(?)
+                )
+                WHERE species_id IS NOT NULL AND species_id <> ''
+                ORDER BY mode_rank
+                LIMIT 1
+                """,
+                [q, *cond_params, q],
+            ).fetchone()
+            if row:
+                return row[0]
 
         if fuzzy_fallback:
             rows = self.find_species_smart(q, limit=int(fuzzy_limit), include_formula_reversal=include_formula_reversal)
@@ -256,9 +275,17 @@ class QueryAPI:
         unit: str = "nm",
         min_wav: float | None = None,
         max_wav: float | None = None,
+        max_lower_energy: float | None = None,
         limit: int = 100,
         parse_payload: bool = True,
-    ) -> list[dict[str, Any]]:
+        as_frame: bool = False,
+    ) -> list[dict[str, Any]] | pd.DataFrame:
+        """Lines for `iso_id`, ordered by wavelength.
+
+        max_lower_energy filters on the payload's Ei_cm-1 inside DuckDB; lines without a usable Ei are kept.
+        as_frame=True returns a DataFrame built column-wise by DuckDB (with the raw `intensity_json`
+        column instead of a parsed `payload`), skipping per-row dict materialization.
+        """
         if self.profile != "atomic":
             raise ValueError("lines() is only available on the atomic profile for now.")
 
@@ -271,12 +298,14 @@ class QueryAPI:
         if max_wav is not None:
             clauses.append("t.quantity_value <= ?")
             args.append(max_wav)
+        if max_lower_energy is not None:
+            clauses.append(f"({_PAYLOAD_EI_SQL} IS NULL OR {_PAYLOAD_EI_SQL} <= ?)")
+            args.append(max_lower_energy)
 
         where = " AND ".join(clauses)
         q = f"""
-        SELECT t.quantity_value, t.quantity_unit, t.quantity_uncertainty,
-               t.intensity_json, t.extra_json, t.selection_rules,
-               r.url AS ref_url
+        SELECT t.quantity_value AS wavelength, t.quantity_unit AS unit, t.quantity_uncertainty AS unc,
+               t.selection_rules, r.url AS ref_url, t.extra_json, t.intensity_json
         FROM transitions t
         LEFT JOIN refs r ON t.ref_id = r.ref_id
         WHERE {where}
@@ -284,10 +313,12 @@ class QueryAPI:
         LIMIT ?
         """
         args.append(limit)
+        if as_frame:
+            return self.con.execute(q, args).df()
         rows = self.con.execute(q, args).fetchall()
 
         out: list[dict[str, Any]] = []
-        for wav, u, unc, intensity_json, extra_json, sel, ref_url in rows:
+        for wav, u, unc, sel, ref_url, extra_json, intensity_json in rows:
             rec: dict[str, Any] = {
                 "wavelength": wav,
                 "unit": u,
@@ -307,7 +338,7 @@ class QueryAPI:
 
         return out
 
-    def atomic_levels(self, iso_id: str, limit: int = 50, max_energy: float | None = None) -> list[dict[str, Any]]:
+    def atomic_levels(self, iso_id: str, limit: int = 50, max_energy: float | None = None, *, as_frame: bool = False) -> list[dict[str, Any]] | pd.DataFrame:
         if self.profile != "atomic":
             raise ValueError("atomic_levels() is only available on the atomic profile.")
 
@@ -331,6 +362,8 @@ class QueryAPI:
         LIMIT ?
         """
         args.append(limit)
+        if as_frame:
+            return self.con.execute(q, args).df()
         rows = self.con.execute(q, args).fetchall()
         cols = [
             "state_id",
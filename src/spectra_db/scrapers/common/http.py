@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import hashlib
 import json
+import random
+import threading
 import time
+from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Any
 
@@ -21,6 +26,7 @@ class FetchResult:
     content_path: Path
     meta_path: Path
     from_cache: bool
+    retry_after: str | None = None  # raw Retry-After header, if the server sent one
 
 
 def _utc_iso() -> str:
@@ -40,6 +46,109 @@ def sha256_bytes(b: bytes) -> str:
     return hashlib.sha256(b).hexdigest()
 
 
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header: either delta-seconds or an HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max((when - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, base_s: float, retry_after_s: float | None = None, *, cap_s: float = 60.0) -> float:
+    """Exponential backoff with random jitter, never shorter than the server's Retry-After.
+
+    The jitter keeps concurrent workers from retrying in lockstep; Retry-After only sets a floor
+    and does not change the base schedule.
+    """
+    delay = min(base_s * (2**attempt), cap_s) + random.uniform(0.0, base_s)
+    return max(delay, retry_after_s or 0.0)
+
+
+class TokenBucket:
+    """Thread-safe rate limiter: at most `burst` requests at once, refilled at `rate` per second.
+
+    Shared by concurrent workers so politeness is a global budget rather than a per-thread sleep.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until one token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptivePacer(TokenBucket):
+    """TokenBucket whose rate follows the server: AIMD on throttling responses.
+
+    Every `increase_every` consecutive successes add `step` req/s (up to `max_rate`); a 429 halves
+    the rate (down to `min_rate`). `wait()` is `acquire()`, so with burst=1 it sleeps just
+    `max(0, 1/rate - since_last)`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        *,
+        max_rate: float | None = None,
+        min_rate: float | None = None,
+        step: float = 0.1,
+        increase_every: int = 10,
+    ) -> None:
+        super().__init__(rate, burst)
+        self.max_rate = max_rate if max_rate is not None else 2.0 * rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16.0
+        self.step = step
+        self.increase_every = increase_every
+        self._streak = 0
+
+    def wait(self) -> None:
+        self.acquire()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._streak += 1
+            if self._streak >= self.increase_every:
+                self._streak = 0
+                self.rate = min(self.max_rate, self.rate + self.step)
+
+    def on_429(self) -> None:
+        with self._lock:
+            self._streak = 0
+            self.rate = max(self.min_rate, self.rate * 0.5)
+
+    def observe(self, status_code: int) -> None:
+        """Feed back one network response: a 429 slows down, a 200 counts toward speeding up."""
+        if status_code == 429:
+            self.on_429()
+        elif status_code == 200:
+            self.on_success()
+
+
 def ensure_dir(p: Path) -> None:
     """Create directory if missing."""
     p.mkdir(parents=True, exist_ok=True)
@@ -54,6 +163,8 @@ def fetch_cached(
     polite_delay_s: float = 0.4,
     timeout_s: float = 60.0,
     force: bool = False,
+    throttle: Callable[[], object] | None = None,
+    on_status: Callable[[int], object] | None = None,
 ) -> FetchResult:
     """Fetch a URL with query params, caching response body and metadata.
 
@@ -70,6 +181,8 @@ def fetch_cached(
         polite_delay_s: Sleep duration after a network fetch (not used if cache hit).
         timeout_s: Requests timeout.
         force: If True, re-fetch even if cached.
+        throttle: Called right before a network request (not on cache hits), e.g. TokenBucket.acquire.
+        on_status: Called with the status code of a network response (not on cache hits), e.g. AdaptivePacer.observe.
 
     Returns:
         FetchResult describing the saved files.
@@ -89,14 +202,21 @@ def fetch_cached(
             content_path=body_path,
             meta_path=meta_path,
             from_cache=True,
+            # The stored Retry-After was relative to the original response; replaying it would be stale.
+            retry_after=None,
         )
 
+    if throttle is not None:
+        throttle()
     sess = session or requests.Session()
     headers = {
         "User-Agent": "spectra-db/0.0.1 (research; contact via repo issues)",
     }
     resp = sess.get(url, params=params, headers=headers, timeout=timeout_s)
     retrieved = _utc_iso()
+    retry_after = resp.headers.get("Retry-After")
+    if on_status is not None:
+        on_status(resp.status_code)
 
     body_path.write_bytes(resp.content)
     meta = {
@@ -107,6 +227,8 @@ def fetch_cached(
         "content_sha256": sha256_bytes(resp.content),
         "content_type": resp.headers.get("Content-Type", ""),
     }
+    if retry_after is not None:
+        meta["retry_after"] = retry_after
     meta_path.write_text(json.dumps(meta, indent=2, sort_keys=True), encoding="utf-8")
 
     # be polite only when we actually hit the network
@@ -120,6 +242,7 @@ def fetch_cached(
         content_path=body_path,
         meta_path=meta_path,
         from_cache=False,
+        retry_after=retry_after,
     )
 
 
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import hashlib
+from collections.abc import Callable
 
 
 def short_hash(text: str, n: int = 16) -> str:
     """Return a short stable hex hash of text."""
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:n]
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    if n % 2 == 0:
+        # Hex-encode only the bytes we keep instead of all 64 hex chars.
+        return digest[: n // 2].hex()
+    return digest.hex()[:n]
 
 
 def make_id(prefix: str, *parts: str) -> str:
@@ -14,5 +19,24 @@ def make_id(prefix: str, *parts: str) -> str:
     return f"{prefix}_{short_hash(blob)}"
 
 
+def id_maker(prefix: str, *fixed_parts: str) -> Callable[..., str]:
+    """Return `make(*parts)` == make_id(prefix, *fixed_parts, *parts), with the fixed head pre-joined.
+
+    For hot loops where the leading parts are constant (e.g. the iso_id of a whole ExoMol run):
+    each call only joins the varying suffix and hashes, with no extra function frames.
+    """
+    head = prefix + "|" + "".join(p + "|" for p in fixed_parts)
+    out_prefix = prefix + "_"
+    sha256 = hashlib.sha256
+
+    def make(*parts: str) -> str:
+        if not parts:
+            return make_id(prefix, *fixed_parts)  # head carries a trailing "|" the plain blob lacks
+        # Same as short_hash(blob) with the default n=16.
+        return out_prefix + sha256((head + "|".join(parts)).encode("utf-8")).digest()[:8].hex()
+
+    return make
+
+
 if __name__ == "__main__":
     print(make_id("state", "ASD:He:0/main", "1s2", "1S", "0", "0.0"))
@@ -1,16 +1,76 @@
 from __future__ import annotations
 
+import contextlib
 import json
-from collections.abc import Iterable
+import threading
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson  # optional: much faster decoding for large NDJSON/checkpoint scans
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+# Shared encoder; json.dumps with non-default options constructs a new JSONEncoder per call.
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+_encode_compact = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def json_loads(line: str | bytes) -> Any:
+    """Decode one JSON line, with orjson when it is installed.
+
+    orjson rejects the NaN/Infinity tokens json.dumps writes for non-finite floats, so those lines
+    fall back to the stdlib parser.
+    """
+    if orjson is None:
+        return json.loads(line)
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return json.loads(line)
+
+
+def json_dumps_compact(obj: Any) -> str:
+    """Encode without whitespace (and non-ASCII kept as-is), with orjson when it is installed and the data allows."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            pass
+    return _encode_compact(obj)
+
+
+def file_stamp(path: Path) -> dict[str, int] | None:
+    """Size and mtime of `path` (None if it does not exist), for checking that a derived file still matches its source."""
+    if not path.exists():
+        return None
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# Per-file locks so concurrent dedupe-appends (e.g. levels and lines of one spectrum) cannot both
+# miss an id in the scan and append it twice.
+_path_locks: dict[Path, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    key = path.resolve()
+    with _path_locks_guard:
+        return _path_locks.setdefault(key, threading.Lock())
+
 
 def append_ndjson_dedupe(path: Path, records: Iterable[dict[str, Any]], id_field: str) -> int:
     """Append records to NDJSON, skipping duplicates by id_field.
 
-    Scans existing file once to build a set of seen IDs.
+    Scans existing file once to build a set of seen IDs. Thread-safe per file within one process.
     """
+    with _lock_for(path):
+        return _append_ndjson_dedupe(path, records, id_field)
+
+
+def _append_ndjson_dedupe(path: Path, records: Iterable[dict[str, Any]], id_field: str) -> int:
     path.parent.mkdir(parents=True, exist_ok=True)
 
     seen: set[str] = set()
@@ -21,7 +81,7 @@ def append_ndjson_dedupe(path: Path, records: Iterable[dict[str, Any]], id_field
                 if not line:
                     continue
                 try:
-                    obj = json.loads(line)
+                    obj = json_loads(line)
                     rid = obj.get(id_field)
                     if rid is not None:
                         seen.add(str(rid))
@@ -37,7 +97,53 @@ def append_ndjson_dedupe(path: Path, records: Iterable[dict[str, Any]], id_field
             rid_s = str(rid)
             if rid_s in seen:
                 continue
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.write(_encode(rec) + "\n")
             seen.add(rid_s)
             n += 1
     return n
+
+
+@contextlib.contextmanager
+def ndjson_line_writer(path: Path) -> Iterator[Callable[[Iterable[str]], int]]:
+    """Keep one append handle on `path` open for a whole run.
+
+    Yields `write_lines(lines) -> int` for already-encoded JSON lines (no trailing newline); each batch
+    goes out in a single write. The file is opened on the first non-empty batch (so nothing is created
+    if nothing is written) with a 1 MiB buffer, and closed when the block exits.
+    """
+    with contextlib.ExitStack() as stack:
+        f = None
+
+        def write_lines(lines: Iterable[str]) -> int:
+            nonlocal f
+            lines = list(lines)
+            if not lines:
+                return 0
+            if f is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                f = stack.enter_context(path.open("a", encoding="utf-8", buffering=1 << 20))
+            f.write("\n".join(lines) + "\n")
+            return len(lines)
+
+        yield write_lines
+
+
+@contextlib.contextmanager
+def ndjson_writer(path: Path) -> Iterator[Callable[[Iterable[dict[str, Any]]], int]]:
+    """ndjson_line_writer for dict records: yields `write_rows(records) -> int`."""
+    with ndjson_line_writer(path) as write_lines:
+        yield lambda records: write_lines(_encode(rec) for rec in records)
+
+
+def append_ndjson_rows(path: Path, records: Iterable[dict[str, Any]]) -> int:
+    """Append records to NDJSON without dedupe.
+
+    Serializes the whole batch first, then does a single open + write.
+    """
+    with ndjson_writer(path) as write_rows:
+        return write_rows(records)
+
+
+def write_ndjson_row(path: Path, record: dict[str, Any]) -> None:
+    """Append one record to NDJSON without dedupe."""
+    append_ndjson_rows(path, [record])
@@ -1,17 +1,49 @@
 from __future__ import annotations
 
 import argparse
-import bz2
+import contextlib
+import csv
 import json
-from collections.abc import Iterable
+import math
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-from spectra_db.scrapers.common.ids import make_id
-from spectra_db.scrapers.common.ndjson import write_ndjson_row
+import numpy as np
+import pandas as pd
+
+from spectra_db.scrapers.common.ids import id_maker
+from spectra_db.scrapers.common.ndjson import ndjson_line_writer, write_ndjson_row
 from spectra_db.util.paths import get_paths
 
+try:
+    import indexed_bzip2  # optional: parallel bz2 decoding for large ExoMol dumps
+except Exception:  # pragma: no cover
+    indexed_bzip2 = None  # type: ignore[assignment]
+
+# Rows per read_csv chunk and per NDJSON append; ExoMol files run to millions of lines, so never parse or write per row.
+_BATCH_ROWS = 50_000
+
+# One shared encoder: json.dumps(..., ensure_ascii=False) builds a fresh JSONEncoder on every call.
+_dumps = json.JSONEncoder(ensure_ascii=False).encode
+
+_STATE_NOTES_JSON = _dumps("Imported from ExoMol states file; extra columns preserved in vibrational_json.exomol.*")
+
+
+def _jnum(x: float) -> str:
+    """JSON text for a float, identical to json.dumps (repr for finite values)."""
+    return float.__repr__(x) if math.isfinite(x) else _dumps(x)
+
+
+def _jid(x: str | None) -> str:
+    """JSON text for a make_id() value (hex + underscore, so no escaping needed) or null."""
+    return "null" if x is None else f'"{x}"'
+
 
 @dataclass(frozen=True)
 class RunResult:
@@ -21,13 +53,53 @@ class RunResult:
     notes: str | None = None
 
 
-def _open_maybe_bz2(path: Path) -> Iterable[str]:
-    if path.suffix == ".bz2":
-        with bz2.open(path, "rt", encoding="utf-8", errors="replace") as f:
-            yield from f
-    else:
-        with path.open("rt", encoding="utf-8", errors="replace") as f:
-            yield from f
+def _iter_lines(path: Path) -> Iterator[pd.Series]:
+    """Stripped data lines of an ExoMol file (no blanks or "#" comment lines), in chunks of `_BATCH_ROWS`.
+
+    Lines are read whole by pandas' C reader (NUL as the never-matching separator) so each row's
+    source text is kept as-is for the stored `raw` fields; callers split them into tokens per chunk,
+    which copes with rows of any width. `.bz2` files are decoded on all cores with `indexed_bzip2`
+    when it is installed, otherwise by pandas' single-threaded bz2 reader.
+    """
+    with contextlib.ExitStack() as stack:
+        src: Any = path
+        compression: str | None = "infer"
+        if path.suffix == ".bz2" and indexed_bzip2 is not None:
+            src = stack.enter_context(indexed_bzip2.open(str(path), parallelization=os.cpu_count() or 1))
+            compression = None
+        try:
+            reader = pd.read_csv(
+                src,
+                sep="\x00",
+                header=None,
+                names=["line"],
+                dtype=str,
+                quoting=csv.QUOTE_NONE,
+                compression=compression,
+                encoding_errors="replace",
+                chunksize=_BATCH_ROWS,
+            )
+        except pd.errors.EmptyDataError:
+            return  # empty file
+        with reader:
+            for chunk in reader:
+                lines = chunk["line"].str.strip()
+                lines = lines[(lines != "") & ~lines.str.startswith("#")]
+                if len(lines):
+                    yield lines
+
+
+def _token_column(tokens: pd.DataFrame, k: int) -> pd.Series:
+    """Column `k` of a split chunk, all-missing when no row in the chunk has that many tokens."""
+    return tokens[k] if k in tokens.columns else pd.Series(np.nan, index=tokens.index, dtype=object)
+
+
+def _take(table: np.ndarray, idx: np.ndarray, fill: Any) -> np.ndarray:
+    """`table[idx]`, with `fill` wherever idx has no entry (out of range)."""
+    ok = (idx >= 0) & (idx < len(table))
+    out = np.full(len(idx), fill, dtype=table.dtype)
+    out[ok] = table[idx[ok]]
+    return out
 
 
 def species_id_for(formula: str, charge: int = 0) -> str:
@@ -65,44 +137,67 @@ def ensure_species_and_iso(*, formula: str, charge: int, isotopologue_label: str
     return species, isotopologue
 
 
-def parse_states_line(line: str) -> dict[str, Any] | None:
-    s = line.strip()
-    if not s or s.startswith("#"):
-        return None
-    parts = s.split()
-    # ExoMol states: i, E~, gtot, J, ... (more columns may follow)
-    if len(parts) < 4:
-        return None
-    i = int(parts[0])
-    energy_cm1 = float(parts[1])
-    gtot = float(parts[2])
-    j = float(parts[3])
-
-    # Everything else is preserved verbatim (no guessing of column meanings here).
-    extra_cols = parts[4:] if len(parts) > 4 else []
-    return {
-        "i": i,
-        "energy_cm1": energy_cm1,
-        "gtot": gtot,
-        "j": j,
-        "extra_cols": extra_cols,
-        "raw": s,
-    }
+def _transition_lines(tp: Path, *, iso_id: str, ref_id: str, state_id_by_i: np.ndarray, energy_by_i: np.ndarray) -> Iterator[list[str]]:
+    """Templated transitions.ndjson lines for one ExoMol .trans file, one list per read chunk.
 
+    state_id_by_i / energy_by_i are the states-pass lookup arrays indexed by ExoMol state index.
+    """
+    iso_json = _dumps(iso_id)
+    ref_json = _dumps(ref_id)
+    notes_json = _dumps(f"Imported from {tp.name}")
+    make_trans_id = id_maker("trans", iso_id)
 
-def parse_trans_line(line: str) -> dict[str, Any] | None:
-    s = line.strip()
-    if not s or s.startswith("#"):
-        return None
-    parts = s.split()
-    # ExoMol transitions: f, i, Afi, [nu optional]
-    if len(parts) < 3:
-        return None
-    f = int(parts[0])
-    i = int(parts[1])
-    afi = float(parts[2])
-    nu = float(parts[3]) if len(parts) >= 4 else None
-    return {"f": f, "i": i, "Afi": afi, "nu": nu, "raw": s}
+    # ExoMol transitions: f, i, Afi, [nu optional]; any further columns only go into exomol_raw.
+    for lines in _iter_lines(tp):
+        tokens = lines.str.split(expand=True)
+        if tokens.shape[1] < 3:
+            continue
+        keep = tokens[[0, 1, 2]].notna().all(axis=1).to_numpy()
+        lines, tokens = lines[keep], tokens[keep]
+        f_idx = tokens[0].astype("int64").to_numpy()
+        i_idx = tokens[1].astype("int64").to_numpy()
+        upper_ids = _take(state_id_by_i, f_idx, None)
+        lower_ids = _take(state_id_by_i, i_idx, None)
+
+        # nu is optional in .trans files; when absent, derive it as E(f) - E(i).
+        nu_given = _token_column(tokens, 3).astype(float).to_numpy()
+        nu_derived_mask = np.isnan(nu_given)
+        nu_all = np.where(nu_derived_mask, _take(energy_by_i, f_idx, np.nan) - _take(energy_by_i, i_idx, np.nan), nu_given)
+
+        batch: list[str] = []
+        for f, i, afi, nu, nu_derived, upper_id, lower_id, raw in zip(
+            f_idx.tolist(),
+            i_idx.tolist(),
+            tokens[2].astype(float).tolist(),
+            nu_all.tolist(),
+            nu_derived_mask.tolist(),
+            upper_ids.tolist(),
+            lower_ids.tolist(),
+            lines.tolist(),
+            strict=True,
+        ):
+            if math.isnan(nu):
+                continue  # no nu and at least one state unknown: cannot derive safely
+
+            intensity_json = f'{{"Afi_s-1": {_jnum(afi)}}}'
+            extra_json = f'{{"exomol_raw": {_dumps(raw)}, "nu_derived": {"true" if nu_derived else "false"}}}'
+            batch.append(
+                f'{{"transition_id": "{make_trans_id(str(f), str(i), str(nu), str(afi))}", "iso_id": {iso_json}, '
+                f'"upper_state_id": {_jid(upper_id)}, "lower_state_id": {_jid(lower_id)}, '
+                f'"quantity_value": {_jnum(nu)}, "quantity_unit": "cm-1", "quantity_uncertainty": null, '
+                f'"intensity_json": {_dumps(intensity_json)}, "extra_json": {_dumps(extra_json)}, "selection_rules": null, '
+                f'"ref_id": {ref_json}, "source": "ExoMol", "notes": {notes_json}}}'
+            )
+        yield batch
+
+
+def _write_trans_shard(tp: Path, shard: Path, iso_id: str, ref_id: str, state_id_by_i: np.ndarray, energy_by_i: np.ndarray) -> int:
+    """Process-pool worker: normalize one .trans file into its own NDJSON shard; returns rows written."""
+    n = 0
+    with ndjson_line_writer(shard) as write_lines:
+        for batch in _transition_lines(tp, iso_id=iso_id, ref_id=ref_id, state_id_by_i=state_id_by_i, energy_by_i=energy_by_i):
+            n += write_lines(batch)
+    return n
 
 
 def run(
@@ -113,6 +208,7 @@ def run(
     trans_paths: list[Path],
     ref_id: str,
     max_transitions: int | None,
+    workers: int | None = None,
 ) -> RunResult:
     paths = get_paths()
 
@@ -122,97 +218,91 @@ def run(
     write_ndjson_row(paths.normalized_dir / "isotopologues.ndjson", iso)
 
     iso_id = iso["iso_id"]
-
-    # States
-    idx_to_state_id: dict[int, str] = {}
+    states_out = paths.normalized_dir / "states.ndjson"
+    trans_out = paths.normalized_dir / "transitions.ndjson"
+
+    # Rows are written as templated JSON lines: columns that are constant for the whole run (iso_id,
+    # ref_id, units, notes, the all-null columns) are encoded once here, and only the per-row values
+    # are encoded in the loops. Key order and formatting match json.dumps of the equivalent dict.
+    iso_json = _dumps(iso_id)
+    ref_json = _dumps(ref_id)
+    make_state_id = id_maker("state", iso_id)
+
+    # States. ExoMol state indices are small contiguous ints, so lookups for the
+    # transitions pass are plain arrays indexed by i (no per-row dict hashing).
+    seen_i: list[int] = []
+    seen_energy: list[float] = []
+    seen_state_id: list[str] = []
     states_written = 0
 
-    for line in _open_maybe_bz2(states_path):
-        parsed = parse_states_line(line)
-        if parsed is None:
-            continue
-
-        state_id = make_id("state", iso_id, str(parsed["i"]))
-        idx_to_state_id[parsed["i"]] = state_id
-
-        # Preserve all unmapped columns explicitly.
-        vib_json = json.dumps(
-            {
-                "exomol": {
-                    "i": parsed["i"],
-                    "gtot": parsed["gtot"],
-                    "extra_cols": parsed["extra_cols"],
-                    "raw": parsed["raw"],
-                }
-            },
-            ensure_ascii=False,
-        )
-
-        state_row = {
-            "state_id": state_id,
-            "iso_id": iso_id,
-            "state_type": "molecular",
-            "electronic_label": None,
-            "vibrational_json": vib_json,
-            "rotational_json": None,
-            "parity": None,
-            "configuration": None,
-            "term": None,
-            "j_value": parsed["j"],
-            "f_value": None,
-            "g_value": parsed["gtot"],
-            "energy_value": parsed["energy_cm1"],
-            "energy_unit": "cm-1",
-            "energy_uncertainty": None,
-            "ref_id": ref_id,
-            "notes": "Imported from ExoMol states file; extra columns preserved in vibrational_json.exomol.*",
-        }
-        write_ndjson_row(paths.normalized_dir / "states.ndjson", state_row)
-        states_written += 1
-
-    # Transitions
-    transitions_written = 0
-    for tp in trans_paths:
-        for line in _open_maybe_bz2(tp):
-            parsed = parse_trans_line(line)
-            if parsed is None:
+    with ndjson_line_writer(states_out) as write_states:
+        for lines in _iter_lines(states_path):
+            # ExoMol states: i, E~, gtot, J, ... (more columns may follow, and rows may differ in width)
+            tokens = lines.str.split(expand=True)
+            if tokens.shape[1] < 4:
                 continue
-
-            upper_id = idx_to_state_id.get(parsed["f"])
-            lower_id = idx_to_state_id.get(parsed["i"])
-
-            nu = parsed["nu"]
-            nu_derived = False
-            if nu is None:
-                # Explicit derivation (not silent): compute from states energies
-                if upper_id is None or lower_id is None:
-                    continue
-                # We need energies by index; simplest is to store them while reading states.
-                # For now: require nu to be present OR skip transitions that can't be derived safely.
-                continue
-
-            intensity = {"Afi_s-1": parsed["Afi"]}
-            extra = {"exomol_raw": parsed["raw"], "nu_derived": nu_derived}
-
-            row = {
-                "transition_id": make_id("trans", iso_id, str(parsed["f"]), str(parsed["i"]), str(nu), str(parsed["Afi"])),
-                "iso_id": iso_id,
-                "upper_state_id": upper_id,
-                "lower_state_id": lower_id,
-                "quantity_value": float(nu),
-                "quantity_unit": "cm-1",
-                "quantity_uncertainty": None,
-                "intensity_json": json.dumps(intensity, ensure_ascii=False),
-                "extra_json": json.dumps(extra, ensure_ascii=False),
-                "selection_rules": None,
-                "ref_id": ref_id,
-                "source": "ExoMol",
-                "notes": f"Imported from {tp.name}",
-            }
-            write_ndjson_row(paths.normalized_dir / "transitions.ndjson", row)
-            transitions_written += 1
-            if max_transitions is not None and transitions_written >= max_transitions:
-                return RunResult(ok=True, states_written=states_written, transitions_written=transitions_written)
+            keep = tokens[[0, 1, 2, 3]].notna().all(axis=1).to_numpy()
+            lines, tokens = lines[keep], tokens[keep]
+            batch: list[str] = []
+            for i, energy_cm1, gtot, j, extra, raw in zip(
+                tokens[0].astype("int64").tolist(),
+                tokens[1].astype(float).tolist(),
+                tokens[2].astype(float).tolist(),
+                tokens[3].astype(float).tolist(),
+                tokens.iloc[:, 4:].to_numpy(dtype=object).tolist(),
+                lines.tolist(),
+                strict=True,
+            ):
+                state_id = make_state_id(str(i))
+                seen_i.append(i)
+                seen_energy.append(energy_cm1)
+                seen_state_id.append(state_id)
+
+                # Preserve all unmapped columns explicitly. The fixed wrapper is templated (same
+                # output as json.dumps of the nested dict); only the varying values are encoded.
+                vib_json = f'{{"exomol": {{"i": {i}, "gtot": {_jnum(gtot)}, "extra_cols": {_dumps([c for c in extra if isinstance(c, str)])}, "raw": {_dumps(raw)}}}}}'
+
+                batch.append(
+                    f'{{"state_id": "{state_id}", "iso_id": {iso_json}, "state_type": "molecular", "electronic_label": null, '
+                    f'"vibrational_json": {_dumps(vib_json)}, "rotational_json": null, "parity": null, "configuration": null, '
+                    f'"term": null, "j_value": {_jnum(j)}, "f_value": null, "g_value": {_jnum(gtot)}, "energy_value": {_jnum(energy_cm1)}, '
+                    f'"energy_unit": "cm-1", "energy_uncertainty": null, "ref_id": {ref_json}, "notes": {_STATE_NOTES_JSON}}}'
+                )
+            states_written += write_states(batch)
+
+    n_idx = max(seen_i, default=-1) + 1
+    state_id_by_i = np.full(n_idx, None, dtype=object)
+    state_id_by_i[seen_i] = seen_state_id
+    energy_by_i = np.full(n_idx, np.nan)
+    energy_by_i[seen_i] = seen_energy
+    del seen_i, seen_energy, seen_state_id
+
+    # Transitions. Each .trans file is independent, so several files are normalized in parallel
+    # (one process per file, each writing its own shard) and the shards are appended in input order.
+    # A max_transitions cap needs the files in sequence, so it keeps the single-process path.
+    transitions_written = 0
+    if max_transitions is None and len(trans_paths) > 1 and workers != 1:
+        n_workers = min(workers or os.cpu_count() or 1, len(trans_paths))
+        paths.normalized_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=paths.normalized_dir, prefix=".exomol_trans_") as tmp:
+            shards = [Path(tmp) / f"{k}.ndjson" for k in range(len(trans_paths))]
+            with ProcessPoolExecutor(max_workers=n_workers) as ex:
+                futs = [ex.submit(_write_trans_shard, tp, shard, iso_id, ref_id, state_id_by_i, energy_by_i) for tp, shard in zip(trans_paths, shards, strict=True)]
+                transitions_written = sum(f.result() for f in futs)
+            with trans_out.open("ab") as out:
+                for shard in shards:
+                    if shard.exists():
+                        with shard.open("rb") as f:
+                            shutil.copyfileobj(f, out, 1 << 20)
+        return RunResult(ok=True, states_written=states_written, transitions_written=transitions_written)
+
+    with ndjson_line_writer(trans_out) as write_trans:
+        for tp in trans_paths:
+            for batch in _transition_lines(tp, iso_id=iso_id, ref_id=ref_id, state_id_by_i=state_id_by_i, energy_by_i=energy_by_i):
+                if max_transitions is not None and transitions_written + len(batch) >= max_transitions:
+                    transitions_written += write_trans(batch[: max_transitions - transitions_written])
+                    return RunResult(ok=True, states_written=states_written, transitions_written=transitions_written)
+                transitions_written += write_trans(batch)
 
     return RunResult(ok=True, states_written=states_written, transitions_written=transitions_written)
 
@@ -225,6 +315,7 @@ def main() -> None:
     p.add_argument("--trans", type=Path, nargs="*", default=[])
     p.add_argument("--ref-id", required=True, help="Stable ref key you want to use for ExoMol dataset (e.g. EXOMOL:CO:... ).")
     p.add_argument("--max-transitions", type=int, default=None)
+    p.add_argument("--workers", type=int, default=None, help="Processes for multiple --trans files (default: CPU count; 1 = sequential).")
     args = p.parse_args()
 
     rr = run(
@@ -234,6 +325,7 @@ def main() -> None:
         trans_paths=list(args.trans),
         ref_id=args.ref_id,
         max_transitions=args.max_transitions,
+        workers=args.workers,
     )
     print(json.dumps(rr.__dict__, indent=2))
 
@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 import argparse
-import json
+import hashlib
+import itertools
 import math
+import mmap
+import os
+import threading
 import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 
+import numpy as np
+
+from spectra_db.scrapers.common.http import AdaptivePacer, backoff_delay
+from spectra_db.scrapers.common.ndjson import json_dumps_compact, json_loads
 from spectra_db.scrapers.nist_asd.fetch_levels import run as run_levels
+from spectra_db.scrapers.nist_asd.fetch_lines import fetch_lines_raw
 from spectra_db.scrapers.nist_asd.fetch_lines import run as run_lines
-from spectra_db.scrapers.nist_asd.parse_lines import parse_lines_response
 
 
 @dataclass(frozen=True)
@@ -38,6 +49,9 @@ class BulkConfig:
     # safety
     max_splits: int  # maximum number of split operations per spectrum
 
+    # lines bins fetched ahead into the response cache by a thread pool (1 = strictly sequential)
+    concurrency: int = 1
+
 
 def _progress(i: int, n: int) -> str:
     pct = 100.0 * i / max(n, 1)
@@ -48,113 +62,186 @@ def _should_retry(status_code: int | None) -> bool:
     return status_code in {429, 502, 503, 504}
 
 
-def _sleep_backoff(attempt: int, base: float) -> None:
-    t = min(base * (2**attempt), 60.0)
-    time.sleep(t)
+def _sleep_backoff(attempt: int, base: float, retry_after: float | None = None) -> None:
+    time.sleep(backoff_delay(attempt, base, retry_after))
+
 
+def _iter_ok_checkpoint_records(path: Path, kind: str) -> Iterator[dict[str, Any]]:
+    """Yield successful `kind` records from a JSONL checkpoint.
 
-def _load_lines_checkpoint(path: Path) -> set[tuple[str, float, float, str, str]]:
-    """Load completed (spectrum, lo, hi, unit, wavelength_type) bins."""
-    done: set[tuple[str, float, float, str, str]] = set()
-    if not path.exists():
-        return done
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
+    The file is memory-mapped and each line is pre-filtered with byte searches for the quoted kind
+    and `true`, so only candidate lines pay for a full decode. The filter does not depend on separator
+    spacing, so older checkpoints (written with ", "/": ") load too. The parsed record is still
+    checked, so the prefilter can only skip work.
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    kind_b = f'"{kind}"'.encode()
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in iter(mm.readline, b""):
+            if kind_b not in line or b"true" not in line:
                 continue
             try:
-                obj = json.loads(line)
-                if obj.get("kind") != "lines" or obj.get("ok") is not True:
-                    continue
-                spec = str(obj["spectrum"])
-                lo = float(obj["lo"])
-                hi = float(obj["hi"])
-                unit = str(obj["unit"])
-                wtype = str(obj["wavelength_type"])
-                done.add((spec, lo, hi, unit, wtype))
+                obj = json_loads(line)
             except Exception:
                 continue
+            if obj.get("kind") == kind and obj.get("ok") is True:
+                yield obj
+
+
+def _load_lines_checkpoint(path: Path) -> set[int]:
+    """Load completed bins as _bin_hash keys of (spectrum, lo, hi, unit, wavelength_type)."""
+    done: set[int] = set()
+    for obj in _iter_ok_checkpoint_records(path, "lines"):
+        try:
+            done.add(_bin_hash(str(obj["spectrum"]), _canon_edge(float(obj["lo"])), _canon_edge(float(obj["hi"])), str(obj["unit"]), str(obj["wavelength_type"])))
+        except Exception:
+            continue
     return done
 
 
 def _load_levels_checkpoint(path: Path) -> set[str]:
     """Load completed spectra for levels."""
     done: set[str] = set()
-    if not path.exists():
-        return done
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-                if obj.get("kind") != "levels" or obj.get("ok") is not True:
-                    continue
-                done.add(str(obj["spectrum"]))
-            except Exception:
-                continue
+    for obj in _iter_ok_checkpoint_records(path, "levels"):
+        try:
+            done.add(str(obj["spectrum"]))
+        except Exception:
+            continue
     return done
 
 
-def _append_checkpoint(path: Path, obj: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+class CheckpointWriter:
+    """Append-only checkpoint stream with a large buffer, flushed every `flush_every` records.
 
+    A crash loses at most the unflushed tail; --resume then just re-runs those bins (usually
+    cache hits). `sync()` flushes and fsyncs, and is called at per-spectrum milestones. Writes are
+    serialized with a lock, since levels and lines of one spectrum may run on separate threads.
+    """
 
-def _derive_meta_path(raw_path: str | None) -> Path | None:
-    if not raw_path:
-        return None
-    p = Path(raw_path)
-    if p.suffix == ".body":
-        return p.with_suffix(".meta.json")
-    return None
+    def __init__(self, path: Path, *, flush_every: int = 50, buffer_size: int = 64 * 1024) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.fp = path.open("a", encoding="utf-8", buffering=buffer_size)
+        self.flush_every = flush_every
+        self._pending = 0
+        self._lock = threading.Lock()
 
+    def write(self, line: str) -> int:
+        with self._lock:
+            n = self.fp.write(line)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._flush()
+            return n
 
-def _read_page_size_from_meta(meta_path: Path | None) -> int | None:
-    if not meta_path or not meta_path.exists():
-        return None
-    try:
-        meta = json.loads(meta_path.read_text(encoding="utf-8"))
-        params = meta.get("params", {})
-        ps = params.get("page_size")
-        if ps is None:
-            return None
-        return int(str(ps))
-    except Exception:
-        return None
-
-
-def _count_lines_rows(raw_path: str | None) -> int | None:
-    """Parse the saved raw response and return number of line rows (best-effort)."""
-    if not raw_path:
-        return None
-    p = Path(raw_path)
-    if not p.exists():
-        return None
-    try:
-        df = parse_lines_response(p.read_bytes())
-        return int(df.shape[0])
-    except Exception:
-        return None
+    def _flush(self) -> None:
+        self.fp.flush()
+        self._pending = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._flush()
+            os.fsync(self.fp.fileno())
+
+    def close(self) -> None:
+        if not self.fp.closed:
+            self.sync()
+            self.fp.close()
+
+    def __enter__(self) -> CheckpointWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _append_checkpoint(ckpt: Path | TextIO | CheckpointWriter, obj: dict[str, Any]) -> None:
+    """Append one JSON record; `ckpt` is a path (opened per call), an open text stream or a CheckpointWriter."""
+    # Compact separators: checkpoints are append-only and grow with every bin of every run.
+    line = json_dumps_compact(obj) + "\n"
+    if not isinstance(ckpt, Path):
+        ckpt.write(line)
+        return
+    ckpt.parent.mkdir(parents=True, exist_ok=True)
+    with ckpt.open("a", encoding="utf-8") as f:
+        f.write(line)
 
 
 def _make_bins(wmin: float, wmax: float, width: float) -> list[tuple[float, float]]:
     n = int(math.ceil((wmax - wmin) / width))
-    out: list[tuple[float, float]] = []
-    for i in range(n):
-        lo = wmin + i * width
-        hi = min(wmax, lo + width)
-        out.append((lo, hi))
-    return out
+    # Same float64 arithmetic as the scalar form, so edges (and checkpoint keys) are unchanged.
+    los = wmin + np.arange(max(n, 0)) * width
+    his = np.minimum(wmax, los + width)
+    return list(zip(los.tolist(), his.tolist(), strict=True))
+
+
+def _canon_edge(x: float) -> float:
+    # Bin edges come from repeated halving, so 9 decimals is exact for them while absorbing float noise.
+    # Applied both when keys are built and when they are read back, so the two always agree.
+    return round(x, 9)
+
 
+def _bin_hash(spec: str, lo_k: float, hi_k: float, unit: str, wavelength_type: str) -> int:
+    """64-bit key for one canonical bin; a set of these is far smaller than one of 5-tuples on long resumes."""
+    blob = f"{spec}|{lo_k!r}|{hi_k!r}|{unit}|{wavelength_type}".encode()
+    return int.from_bytes(hashlib.blake2b(blob, digest_size=8).digest(), "big")
 
-def ingest_levels(spec: str, cfg: BulkConfig, ckpt: Path) -> tuple[bool, int, str]:
+
+def _bin_key(spec: str, lo: float, hi: float, cfg: BulkConfig) -> int:
+    return _bin_hash(spec, _canon_edge(lo), _canon_edge(hi), cfg.line_unit, cfg.wavelength_type)
+
+
+def _prefetch_bins(
+    pool: ThreadPoolExecutor,
+    pending: dict[tuple[float, float], Future],
+    bins: Iterable[tuple[float, float]],
+    spec: str,
+    cfg: BulkConfig,
+    done_bins: set[int],
+    pacer: AdaptivePacer | None = None,
+) -> None:
+    """Start cache-warming fetches for upcoming bins that are not already in flight or done.
+
+    Workers draw from `pacer` like the main loop does, so concurrency overlaps parsing with waiting
+    rather than multiplying the request rate.
+    """
+    for lo, hi in bins:
+        if (lo, hi) in pending or (cfg.resume and _bin_key(spec, lo, hi, cfg) in done_bins):
+            continue
+        pending[(lo, hi)] = pool.submit(
+            fetch_lines_raw,
+            spectrum=spec,
+            min_wav=lo,
+            max_wav=hi,
+            unit=cfg.line_unit,
+            wavelength_type=cfg.wavelength_type,
+            force=cfg.force,
+            throttle=pacer.wait if pacer is not None else None,
+            on_status=pacer.observe if pacer is not None else None,
+        )
+
+
+def ingest_levels(
+    spec: str,
+    cfg: BulkConfig,
+    ckpt: Path | TextIO | CheckpointWriter,
+    *,
+    pacer: AdaptivePacer | None = None,
+) -> tuple[bool, int, str]:
     """Fetch levels for a single spectrum with retry/backoff and checkpoint logging."""
     for attempt in range(cfg.max_retries + 1):
-        res = run_levels(spectrum=spec, units=cfg.units_levels, force=cfg.force)
+        res = run_levels(
+            spectrum=spec,
+            units=cfg.units_levels,
+            # Retries must bypass the cache, which would otherwise replay the failed response.
+            force=cfg.force or attempt > 0,
+            throttle=pacer.wait if pacer is not None else None,
+            on_status=pacer.observe if pacer is not None else None,
+        )
         if res.ok:
             _append_checkpoint(
                 ckpt,
@@ -188,7 +275,7 @@ def ingest_levels(spec: str, cfg: BulkConfig, ckpt: Path) -> tuple[bool, int, st
 
         if _should_retry(res.status_code) and attempt < cfg.max_retries:
             print(f"  levels RETRY {attempt + 1}/{cfg.max_retries}: {res.message}")
-            _sleep_backoff(attempt, cfg.backoff_base_s)
+            _sleep_backoff(attempt, cfg.backoff_base_s, res.retry_after_s)
             continue
 
         return False, 0, res.message
@@ -196,31 +283,75 @@ def ingest_levels(spec: str, cfg: BulkConfig, ckpt: Path) -> tuple[bool, int, st
     return False, 0, "Levels retries exceeded"
 
 
-def ingest_lines_adaptive(spec: str, cfg: BulkConfig, ckpt: Path, done_bins: set[tuple[str, float, float, str, str]]) -> tuple[bool, int, str]:
-    """Fetch lines for one spectrum with adaptive bin splitting until bins are not truncated."""
+def ingest_lines_adaptive(
+    spec: str,
+    cfg: BulkConfig,
+    ckpt: Path | TextIO | CheckpointWriter,
+    done_bins: set[int],
+    *,
+    pacer: AdaptivePacer | None = None,
+) -> tuple[bool, int, str]:
+    """Fetch lines for one spectrum with adaptive bin splitting until bins are not truncated.
+
+    `pacer` spaces network fetches and adapts to 429s; pass one in to keep its learned rate across
+    spectra (main() does), otherwise a fresh one is made from cfg.polite_sleep_s.
+    """
+    if pacer is None:
+        pacer = _make_pacer(cfg)
+    queue = deque(_make_bins(cfg.wav_min, cfg.wav_max, cfg.initial_bin))
+
+    # With concurrency > 1, a thread pool fetches the next bins into the on-disk response cache while
+    # this loop parses and writes the current one, so run_lines() below is usually a cache hit. The
+    # parse/write side stays sequential: it appends to shared NDJSON files with dedupe.
+    pool = ThreadPoolExecutor(max_workers=cfg.concurrency) if cfg.concurrency > 1 else None
+    pending: dict[tuple[float, float], Future] = {}
+    try:
+        return _drain_bins(spec, cfg, ckpt, done_bins, queue, pool, pending, pacer)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _drain_bins(
+    spec: str,
+    cfg: BulkConfig,
+    ckpt: Path | TextIO | CheckpointWriter,
+    done_bins: set[int],
+    queue: deque[tuple[float, float]],
+    pool: ThreadPoolExecutor | None,
+    pending: dict[tuple[float, float], Future],
+    pacer: AdaptivePacer | None,
+) -> tuple[bool, int, str]:
     total_written = 0
     splits_used = 0
-
-    queue = _make_bins(cfg.wav_min, cfg.wav_max, cfg.initial_bin)
+    # The pacer is fed from the fetch itself, so cache hits neither wait nor count as successes.
+    throttle = pacer.wait if pacer is not None else None
+    on_status = pacer.observe if pacer is not None else None
 
     while queue:
-        lo, hi = queue.pop(0)
+        if pool is not None:
+            _prefetch_bins(pool, pending, itertools.islice(queue, cfg.concurrency), spec, cfg, done_bins, pacer)
 
-        # normalize floats for checkpoint keys (avoid float noise)
-        lo_k = float(f"{lo:.12g}")
-        hi_k = float(f"{hi:.12g}")
-        key = (spec, lo_k, hi_k, cfg.line_unit, cfg.wavelength_type)
+        lo, hi = queue.popleft()
+        lo_k, hi_k = _canon_edge(lo), _canon_edge(hi)
+        key = _bin_hash(spec, lo_k, hi_k, cfg.line_unit, cfg.wavelength_type)
 
         if cfg.resume and key in done_bins:
             # already completed successfully
             continue
 
+        # A finished prefetch has already fetched this bin (through the pacer) into the cache.
+        fut = pending.pop((lo, hi), None)
+        prefetched = fut is not None and fut.exception() is None
+
         # Try the bin with retries
         bin_ok = False
         last_msg = ""
         last_status: int | None = None
         last_raw: str | None = None
         wrote_this = 0
+        parsed_rows = 0
+        page_size = 0
 
         for attempt in range(cfg.max_retries + 1):
             res = run_lines(
@@ -229,12 +360,17 @@ def ingest_lines_adaptive(spec: str, cfg: BulkConfig, ckpt: Path, done_bins: set
                 max_wav=hi,
                 unit=cfg.line_unit,
                 wavelength_type=cfg.wavelength_type,
-                force=cfg.force,
+                # Retries must bypass the cache, which would otherwise replay the failed response.
+                force=(cfg.force and not prefetched) or attempt > 0,
+                throttle=throttle,
+                on_status=on_status,
             )
             last_msg = res.message
             last_status = res.status_code
             last_raw = res.raw_path
             wrote_this = res.written
+            parsed_rows = res.parsed_rows
+            page_size = res.page_size
 
             if res.ok:
                 bin_ok = True
@@ -242,7 +378,7 @@ def ingest_lines_adaptive(spec: str, cfg: BulkConfig, ckpt: Path, done_bins: set
 
             if _should_retry(res.status_code) and attempt < cfg.max_retries:
                 print(f"    lines RETRY {attempt + 1}/{cfg.max_retries} bin [{lo:g},{hi:g}]: {res.message}")
-                _sleep_backoff(attempt, cfg.backoff_base_s)
+                _sleep_backoff(attempt, cfg.backoff_base_s, res.retry_after_s)
                 continue
 
             break
@@ -271,11 +407,6 @@ def ingest_lines_adaptive(spec: str, cfg: BulkConfig, ckpt: Path, done_bins: set
                 f"Lines failed in bin [{lo:g},{hi:g}] {cfg.line_unit}: {last_msg}",
             )
 
-        # Determine if the response likely hit the page_size cap → split
-        meta_path = _derive_meta_path(last_raw)
-        page_size = _read_page_size_from_meta(meta_path) or 0
-        parsed_rows = _count_lines_rows(last_raw) or 0
-
         total_written += wrote_this
 
         # Mark this bin as done (even if it was truncated; we’ll split to fill missing)
@@ -317,16 +448,101 @@ def ingest_lines_adaptive(spec: str, cfg: BulkConfig, ckpt: Path, done_bins: set
                 mid = (lo + hi) / 2.0
                 splits_used += 1
                 # Put smaller bins back on the queue
-                queue.insert(0, (mid, hi))
-                queue.insert(0, (lo, mid))
+                queue.appendleft((mid, hi))
+                queue.appendleft((lo, mid))
                 print(f"    SPLIT: bin full → splitting into [{lo:g},{mid:g}] and [{mid:g},{hi:g}]")
                 # Note: dedupe ensures repeated lines from overlapping bins are not duplicated.
 
-        time.sleep(cfg.polite_sleep_s)
-
     return True, total_written, "OK"
 
 
+def _make_pacer(cfg: BulkConfig) -> AdaptivePacer | None:
+    """Pacer starting at one request per polite_sleep_s; None disables pacing."""
+    return AdaptivePacer(1.0 / cfg.polite_sleep_s) if cfg.polite_sleep_s > 0 else None
+
+
+def _report_levels(spec: str, result: tuple[bool, int, str], done_levels: set[str]) -> bool:
+    ok, n, msg = result
+    if ok:
+        done_levels.add(spec)
+        print(f"  levels: +{n} (OK)")
+    else:
+        print(f"  levels: ERROR: {msg}")
+    return ok
+
+
+def _ingest_spectrum(
+    spec: str,
+    cfg: BulkConfig,
+    ckpt: Path | TextIO | CheckpointWriter,
+    done_levels: set[str],
+    done_bins: set[int],
+    *,
+    pacer: AdaptivePacer | None = None,
+    levels_pool: ThreadPoolExecutor | None = None,
+) -> bool:
+    """Run levels and/or lines for one spectrum; returns True if everything requested succeeded.
+
+    In "both" mode with a `levels_pool`, levels run on the pool while lines run here, since the two
+    endpoints are independent. A levels failure still fails the spectrum, but its lines are then
+    already ingested; without a pool, lines are skipped after a levels failure as before.
+    """
+    do_levels = cfg.mode in {"levels", "both"}
+    do_lines = cfg.mode in {"lines", "both"}
+    if do_levels and cfg.resume and spec in done_levels:
+        print("  levels: SKIP (already done)")
+        do_levels = False
+
+    if pacer is None:
+        pacer = _make_pacer(cfg)  # levels and lines draw from one request budget
+    levels_fut: Future[tuple[bool, int, str]] | None = None
+    if do_levels and do_lines and levels_pool is not None:
+        levels_fut = levels_pool.submit(ingest_levels, spec, cfg, ckpt, pacer=pacer)
+    elif do_levels and not _report_levels(spec, ingest_levels(spec, cfg, ckpt, pacer=pacer), done_levels):
+        return False
+
+    ok = True
+    if do_lines:
+        ok, n, msg = ingest_lines_adaptive(spec, cfg, ckpt, done_bins, pacer=pacer)
+        print(f"  lines: +{n} (OK)" if ok else f"  lines: ERROR: {msg}")
+
+    if levels_fut is not None:
+        ok = _report_levels(spec, levels_fut.result(), done_levels) and ok
+    return ok
+
+
+def _run_spectra(
+    spectra: list[str],
+    cfg: BulkConfig,
+    ckpt: CheckpointWriter,
+    done_levels: set[str],
+    done_bins: set[int],
+    *,
+    workers: int = 1,
+) -> tuple[int, int]:
+    """Ingest every spectrum, up to `workers` at a time; returns (ok, failed) counts.
+
+    Spectra are independent, so the only shared state is the pacer (one request budget for the
+    whole host), the checkpoint writer and the dedupe-appended NDJSON files, all of which lock.
+    """
+    workers = max(workers, 1)
+    pacer = _make_pacer(cfg)
+
+    with ThreadPoolExecutor(max_workers=workers) as levels_pool, ThreadPoolExecutor(max_workers=workers) as spec_pool:
+
+        def one(i: int, spec: str) -> bool:
+            print(f"\n{_progress(i, len(spectra))} {spec}")
+            ok = _ingest_spectrum(spec, cfg, ckpt, done_levels, done_bins, pacer=pacer, levels_pool=levels_pool)
+            ckpt.sync()
+            return ok
+
+        numbered = range(1, len(spectra) + 1)
+        results = list(map(one, numbered, spectra)) if workers == 1 else list(spec_pool.map(one, numbered, spectra))
+
+    ok_specs = sum(results)
+    return ok_specs, len(results) - ok_specs
+
+
 def _load_spectra_list(path: Path) -> list[str]:
     return [ln.strip() for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]
 
@@ -356,12 +572,14 @@ def main() -> None:
     )
     ap.add_argument("--min-bin", type=float, default=0.5, help="Smallest bin width allowed during splitting.")
 
-    ap.add_argument("--polite-sleep", type=float, default=0.2)
+    ap.add_argument("--polite-sleep", type=float, default=0.2, help="Initial seconds between lines requests; adapts to 429s (0 = no pacing).")
     ap.add_argument("--max-retries", type=int, default=3)
     ap.add_argument("--backoff-base", type=float, default=2.0)
     ap.add_argument("--force", action="store_true", help="Force refetch even if cached (not recommended).")
     ap.add_argument("--no-resume", action="store_true", help="Disable resume behavior.")
     ap.add_argument("--max-splits", type=int, default=2000, help="Max split operations per spectrum (safety).")
+    ap.add_argument("--concurrency", type=int, default=1, help="Lines bins fetched ahead in parallel (1 = sequential).")
+    ap.add_argument("--spectra-workers", type=int, default=1, help="Spectra ingested at once (1 = sequential); all share one pacer.")
 
     ap.add_argument(
         "--checkpoint",
@@ -386,6 +604,7 @@ def main() -> None:
         force=args.force,
         resume=not args.no_resume,
         max_splits=args.max_splits,
+        concurrency=args.concurrency,
     )
 
     spectra = _load_spectra_list(args.spectra_file)
@@ -396,37 +615,9 @@ def main() -> None:
     done_levels = _load_levels_checkpoint(ckpt) if cfg.resume else set()
     done_bins = _load_lines_checkpoint(ckpt) if cfg.resume else set()
 
-    ok_specs = 0
-    fail_specs = 0
-
-    for i, spec in enumerate(spectra, start=1):
-        print(f"\n{_progress(i, len(spectra))} {spec}")
-
-        # Levels
-        if cfg.mode in {"levels", "both"}:
-            if cfg.resume and spec in done_levels:
-                print("  levels: SKIP (already done)")
-            else:
-                ok, n, msg = ingest_levels(spec, cfg, ckpt)
-                if ok:
-                    done_levels.add(spec)
-                    print(f"  levels: +{n} (OK)")
-                else:
-                    fail_specs += 1
-                    print(f"  levels: ERROR: {msg}")
-                    continue  # skip lines if levels failed
-
-        # Lines
-        if cfg.mode in {"lines", "both"}:
-            ok, n, msg = ingest_lines_adaptive(spec, cfg, ckpt, done_bins)
-            if ok:
-                print(f"  lines: +{n} (OK)")
-            else:
-                fail_specs += 1
-                print(f"  lines: ERROR: {msg}")
-                continue
-
-        ok_specs += 1
+    # One buffered append handle for the whole run; closed (flushed + fsynced) on exit, including Ctrl-C.
+    with CheckpointWriter(ckpt) as ckpt_f:
+        ok_specs, fail_specs = _run_spectra(spectra, cfg, ckpt_f, done_levels, done_bins, workers=args.spectra_workers)
 
     print(f"\nDONE. Spectra OK: {ok_specs}, failed: {fail_specs}")
     print(f"Checkpoint: {ckpt} (resume={'on' if cfg.resume else 'off'})")
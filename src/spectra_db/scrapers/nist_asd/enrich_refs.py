@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
 import re
+import threading
 import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlencode
 
-from bs4 import BeautifulSoup
+import requests
 
-from spectra_db.scrapers.common.http import fetch_cached
+from spectra_db.scrapers.common.http import AdaptivePacer, backoff_delay, fetch_cached, parse_retry_after
+from spectra_db.scrapers.common.ndjson import file_stamp, json_loads
 from spectra_db.util.paths import get_paths
 
 DOI_RE = re.compile(r"\b10\.\d{4,9}/[-._;()/:A-Z0-9]+\b", re.IGNORECASE)
@@ -19,6 +25,9 @@ DOI_RE = re.compile(r"\b10\.\d{4,9}/[-._;()/:A-Z0-9]+\b", re.IGNORECASE)
 REF_KEY_RE = re.compile(r"^(?P<kind>[ELT]):(?P<code>.+)$")
 CODE_RE = re.compile(r"^[A-Za-z]+(?P<db_id>\d+)(?P<comment>[A-Za-z]\d+)?$")
 
+# Navigation lines on ASBib pages that never belong in a citation.
+_CITATION_SKIP_PREFIXES = ("search", "back", "home")
+
 
 def reconstruct_asbib_url(ref_key: str, *, element: str | None = None, spectr_charge: int | None = None) -> str | None:
     """
@@ -69,29 +78,51 @@ def _should_retry(code: int | None) -> bool:
     return code in {429, 502, 503, 504}
 
 
-def _backoff_sleep(attempt: int, base_s: float) -> None:
-    time.sleep(min(base_s * (2**attempt), 60.0))
+def _backoff_sleep(attempt: int, base_s: float, retry_after_s: float | None = None) -> None:
+    time.sleep(backoff_delay(attempt, base_s, retry_after_s))
+
 
+def _iter_text_lines(raw: bytes) -> Iterator[str]:
+    """Non-empty visible text lines in document order, produced lazily so callers can stop early."""
+    # lxml lives in the "scrape" extra; import on first use so the URL helpers work without it.
+    from lxml import etree
+    from lxml import html as lxml_html
 
-def _extract_citation_and_doi(html: str) -> tuple[str | None, str | None]:
-    soup = BeautifulSoup(html, "html.parser")
-    text = soup.get_text("\n")
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    if not raw.strip():
+        return
+    try:
+        root = lxml_html.fromstring(raw, parser=lxml_html.HTMLParser(encoding="utf-8"))
+    except (etree.ParserError, ValueError):
+        # No element at all (only a comment or an XML declaration): nothing to show.
+        return
+    etree.strip_elements(root, etree.Comment, "script", "style", with_tail=False)
+    for chunk in root.itertext():
+        for ln in chunk.splitlines():
+            ln = ln.strip()
+            if ln:
+                yield ln
 
-    doi = None
-    m = DOI_RE.search(text)
-    if m:
-        doi = m.group(0)
 
+def _extract_citation_and_doi(html: str | bytes) -> tuple[str | None, str | None]:
+    raw = html.encode("utf-8") if isinstance(html, str) else html
+    doi: str | None = None
+    # Cheap "no DOI anywhere" test: every DOI starts with "10", possibly written as character references.
+    want_doi = b"10" in raw or b"&#" in raw
+
+    # One parse: the DOI comes from the visible text (not hrefs or scripts) and the citation from
+    # its first lines, so the walk stops once both are settled.
     filtered = []
-    for ln in lines:
-        low = ln.lower()
-        if "standard reference" in low:
-            continue
-        if low.startswith(("search", "back", "home")):
-            continue
-        filtered.append(ln)
-        if len(filtered) >= 6:
+    for ln in _iter_text_lines(raw):
+        if want_doi:
+            m = DOI_RE.search(ln)
+            if m:
+                doi = m.group(0)
+                want_doi = False
+        if len(filtered) < 6:
+            low = ln.lower()
+            if "standard reference" not in low and not low.startswith(_CITATION_SKIP_PREFIXES):
+                filtered.append(ln)
+        if not want_doi and len(filtered) >= 6:
             break
 
     citation = " ".join(filtered).strip() if filtered else None
@@ -101,47 +132,183 @@ def _extract_citation_and_doi(html: str) -> tuple[str | None, str | None]:
     return citation, doi
 
 
-def _read_ndjson(path: Path) -> list[dict[str, Any]]:
+def _iter_ndjson(path: Path, *, skip: int = 0) -> Iterator[dict[str, Any]]:
+    """Yield records one at a time, after skipping the first `skip` of them."""
     if not path.exists():
-        return []
-    out: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
+        return
+    with path.open("rb") as f:
         for line in f:
-            line = line.strip()
-            if not line:
+            if line.isspace():
                 continue
-            out.append(json.loads(line))
-    return out
-
+            if skip:
+                skip -= 1
+                continue
+            yield json_loads(line)
 
-def _write_ndjson(path: Path, records: list[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-    tmp.replace(path)
 
+def _resume_partial(tmp: Path, source: Path, stamp_path: Path) -> int:
+    """Trim a crashed run's output to its last complete record and return how many records it holds.
 
-def enrich_one(url: str, cache_dir: Path, max_retries: int, backoff_base: float, force: bool) -> EnrichResult:
+    The output only lines up with `source` if it was produced from that exact file, so `stamp_path`
+    records the source's size and mtime; output from any other source is discarded (returns 0).
+    """
+    stamp = file_stamp(source)
+    if tmp.exists():
+        try:
+            prev = json.loads(stamp_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            prev = None
+        if prev != stamp:
+            print(f"Discarding {tmp}: it was not produced from the current {source.name}")
+            tmp.unlink()
+    if not tmp.exists():
+        stamp_path.write_text(json.dumps(stamp), encoding="utf-8")
+        return 0
+    data = tmp.read_bytes()
+    end = data.rfind(b"\n") + 1
+    if end < len(data):
+        with tmp.open("r+b") as f:
+            f.truncate(end)
+    return sum(1 for line in data[:end].splitlines() if line.strip())
+
+
+_tls = threading.local()
+
+
+def _thread_session() -> requests.Session:
+    """One keep-alive session per worker thread, so repeated ASBib requests reuse the connection."""
+    sess = getattr(_tls, "session", None)
+    if sess is None:
+        sess = _tls.session = requests.Session()
+    return sess
+
+
+def enrich_one(
+    url: str,
+    cache_dir: Path,
+    max_retries: int,
+    backoff_base: float,
+    force: bool,
+    *,
+    pacer: AdaptivePacer | None = None,
+    parse_pool: Executor | None = None,
+) -> EnrichResult:
     for attempt in range(max_retries + 1):
-        fr = fetch_cached(url=url, params={}, cache_dir=cache_dir, force=force, polite_delay_s=0.0)
+        fr = fetch_cached(
+            url=url,
+            params={},
+            cache_dir=cache_dir,
+            session=_thread_session(),
+            polite_delay_s=0.0,
+            # Retries must bypass the cache, which would otherwise replay the failed response.
+            force=force or attempt > 0,
+            throttle=pacer.wait if pacer is not None else None,
+            on_status=pacer.observe if pacer is not None else None,
+        )
         code = fr.status_code
 
         if code != 200:
             msg = f"HTTP {code} for {url}"
             if _should_retry(code) and attempt < max_retries:
-                _backoff_sleep(attempt, backoff_base)
+                _backoff_sleep(attempt, backoff_base, parse_retry_after(fr.retry_after))
                 continue
             return EnrichResult(False, code, msg)
 
-        html = fr.content_path.read_text(encoding="utf-8", errors="replace")
-        citation, doi = _extract_citation_and_doi(html)
+        raw = fr.content_path.read_bytes()
+        if parse_pool is not None:
+            # Only bytes cross the process boundary; this fetch thread just waits for the result.
+            citation, doi = parse_pool.submit(_extract_citation_and_doi, raw).result()
+        else:
+            citation, doi = _extract_citation_and_doi(raw)
         return EnrichResult(True, code, "OK", citation=citation, doi=doi)
 
     return EnrichResult(False, None, "Retries exceeded")
 
 
+def _apply_result(r: dict[str, Any], res: EnrichResult) -> bool:
+    if res.ok:
+        r["citation"] = res.citation
+        if res.doi:
+            r["doi"] = res.doi
+        return True
+    r["notes"] = f"{(r.get('notes') or '').strip()} | enrich_error: {res.message}".strip(" |")
+    return False
+
+
+def enrich_refs_file(
+    refs_path: Path,
+    cache_dir: Path,
+    *,
+    max_enrich: int | None = None,
+    max_retries: int = 3,
+    backoff_base: float = 2.0,
+    force: bool = False,
+    workers: int = 4,
+    rate_per_s: float = 5.0,
+    parse_workers: int = 0,
+) -> tuple[int, int]:
+    """Stream `refs_path` through enrichment into a side file, then swap it in; returns (total, updated).
+
+    Each record is written as soon as it is done, so memory stays flat. If a previous run died,
+    the records already in `<refs>.enriched.tmp` are kept and the same number of source records
+    is skipped (the source is only replaced at the very end, so its order is stable). A leftover
+    side file whose recorded source size/mtime no longer match `refs_path` is started over.
+
+    Fetches run on `workers` threads sharing one AdaptivePacer, starting at `rate_per_s` requests
+    per second across all of them and backing off on 429s; cache hits are free. Records are still written in source order, with at
+    most a few windows' worth held in memory. With `parse_workers` > 0 the HTML parsing moves to
+    that many processes, so it no longer competes with the fetch threads for the GIL.
+    """
+    tmp = refs_path.with_suffix(".enriched.tmp")
+    stamp_path = refs_path.with_suffix(".enriched.src.json")
+    done = _resume_partial(tmp, refs_path, stamp_path)
+    if done:
+        print(f"Resuming: {done} refs already processed in {tmp}")
+
+    pacer = AdaptivePacer(rate_per_s, burst=max(workers, 1))
+    window: deque[tuple[dict[str, Any], Future[EnrichResult] | None]] = deque()
+    max_pending = 4 * max(workers, 1)
+    total = done
+    attempted = 0
+    updated = 0
+
+    with contextlib.ExitStack() as stack:
+        out = stack.enter_context(tmp.open("a", encoding="utf-8"))
+        pool = stack.enter_context(ThreadPoolExecutor(max_workers=max(workers, 1)))
+        parse_pool = stack.enter_context(ProcessPoolExecutor(max_workers=parse_workers)) if parse_workers > 0 else None
+
+        def write_ready(limit: int) -> None:
+            nonlocal updated
+            # Write finished records from the head; block on the head only when the window is full.
+            while window and (len(window) > limit or window[0][1] is None or window[0][1].done()):
+                r, fut = window.popleft()
+                if fut is not None:
+                    ok = _apply_result(r, fut.result())
+                    updated += ok
+                    print(f"{r.get('ref_id')}: {'OK' if ok else r['notes']}")
+                out.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+        for r in _iter_ndjson(refs_path, skip=done):
+            total += 1
+            # Fill missing URL fields from ref_id encoding when possible
+            if not r.get("url") and r.get("ref_id"):
+                r["url"] = reconstruct_asbib_url(str(r["ref_id"]))
+
+            fut = None
+            url = r.get("url")
+            if url and not r.get("citation") and (max_enrich is None or attempted < max_enrich):
+                attempted += 1
+                fut = pool.submit(enrich_one, url, cache_dir, max_retries, backoff_base, force, pacer=pacer, parse_pool=parse_pool)
+            window.append((r, fut))
+            write_ready(max_pending)
+
+        write_ready(0)
+
+    tmp.replace(refs_path)
+    stamp_path.unlink(missing_ok=True)
+    return total, updated
+
+
 def main() -> None:
     paths = get_paths()
     ap = argparse.ArgumentParser(description="Enrich refs.ndjson by fetching ASBib popded URLs.")
@@ -149,55 +316,34 @@ def main() -> None:
     ap.add_argument("--max", type=int, default=None, help="Max refs to enrich (for testing).")
     ap.add_argument("--max-retries", type=int, default=3)
     ap.add_argument("--backoff-base", type=float, default=2.0)
-    ap.add_argument("--polite-sleep", type=float, default=0.2)
+    ap.add_argument("--workers", type=int, default=4, help="Concurrent ASBib fetches.")
+    ap.add_argument("--parse-workers", type=int, default=0, help="Processes for HTML parsing (0 = parse on the fetch threads).")
+    ap.add_argument("--rate", type=float, default=5.0, help="Initial ASBib requests per second across all workers (adapts to 429s).")
+    ap.add_argument("--polite-sleep", type=float, default=None, help="Deprecated: seconds between requests; use --rate (= 1/polite-sleep).")
     args = ap.parse_args()
+    if args.polite_sleep is not None:
+        print("WARNING: --polite-sleep is deprecated; use --rate (requests per second) instead.")
+        if args.polite_sleep > 0:
+            args.rate = 1.0 / args.polite_sleep
 
     refs_path = paths.normalized_dir / "refs.ndjson"
-    refs = _read_ndjson(refs_path)
-    if not refs:
+    if not refs_path.exists():
         print(f"No refs found at {refs_path}")
         return
 
     cache_dir = paths.raw_dir / "nist_asd" / "refs"
-
-    # Fill missing URL fields from ref_id encoding when possible
-    for r in refs:
-        if r.get("url"):
-            continue
-        rid = r.get("ref_id")
-        if not rid:
-            continue
-        r["url"] = reconstruct_asbib_url(str(rid))
-
-    todo = [r for r in refs if (not r.get("citation")) and r.get("url")]
-
-    if args.max is not None:
-        todo = todo[: args.max]
-
-    print(f"Refs total: {len(refs)} | To enrich: {len(todo)}")
-
-    updated = 0
-    for i, r in enumerate(todo, start=1):
-        ref_id = r.get("ref_id")
-        url = r.get("url")
-        if not url:
-            continue
-
-        print(f"[{i}/{len(todo)}] {ref_id}")
-        res = enrich_one(url, cache_dir, args.max_retries, args.backoff_base, args.force)
-
-        if res.ok:
-            r["citation"] = res.citation
-            if res.doi:
-                r["doi"] = res.doi
-            updated += 1
-        else:
-            r["notes"] = f"{(r.get('notes') or '').strip()} | enrich_error: {res.message}".strip(" |")
-
-        time.sleep(args.polite_sleep)
-
-    _write_ndjson(refs_path, refs)
-    print(f"Done. Updated {updated} refs. Wrote {refs_path}")
+    total, updated = enrich_refs_file(
+        refs_path,
+        cache_dir,
+        max_enrich=args.max,
+        max_retries=args.max_retries,
+        backoff_base=args.backoff_base,
+        force=args.force,
+        workers=args.workers,
+        rate_per_s=args.rate,
+        parse_workers=args.parse_workers,
+    )
+    print(f"Done. Refs total: {total} | Updated {updated} refs. Wrote {refs_path}")
 
 
 if __name__ == "__main__":
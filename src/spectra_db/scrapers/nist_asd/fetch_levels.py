@@ -1,16 +1,15 @@
 from __future__ import annotations
 
 import argparse
-import html as _html
 import json
 import re
+from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
 
 import pandas as pd
-from bs4 import BeautifulSoup
 
-from spectra_db.scrapers.common.http import fetch_cached
+from spectra_db.scrapers.common.http import fetch_cached, parse_retry_after
 from spectra_db.scrapers.common.ids import make_id
 from spectra_db.scrapers.common.ndjson import append_ndjson_dedupe
 from spectra_db.scrapers.nist_asd.asd_client import LEVELS_URL, LevelsQuery, build_levels_params
@@ -22,41 +21,24 @@ from spectra_db.scrapers.nist_asd.normalize_atomic import (
     species_id_for,
 )
 from spectra_db.scrapers.nist_asd.parse_levels import parse_levels_response
+from spectra_db.scrapers.nist_asd.table_cells import iter_rows, safe_float, safe_float_column
 from spectra_db.util.paths import get_paths
+from spectra_db.util.ref_url import extract_ref_urls
 
-_FLOAT_RE = re.compile(r"[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
-_POPDED_RE = re.compile(r"popded\('([^']+)'\)")
 _REF_SPLIT_RE = re.compile(r"\s*,\s*")
+# Brackets NIST puts around derived/questionable values, e.g. "[12 345.6]"; only stripped at the ends,
+# since interior ones carry an uncertainty ("123.4(5)") that must not merge into the digits.
+_EDGE_BRACKETS = "[]()"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FetchRunResult:
     ok: bool
     written: int
     status_code: int | None
     message: str
     raw_path: str | None = None
-
-
-def extract_ref_urls_from_html(raw_html: str) -> dict[str, str]:
-    """
-    Build a mapping from visible reference code text -> popded URL.
-    Works even when a table cell has multiple <a> tags (comma-separated).
-    """
-    soup = BeautifulSoup(raw_html, "html.parser")
-    out: dict[str, str] = {}
-    for a in soup.find_all("a"):
-        txt = (a.get_text() or "").strip()
-        onclick = (a.get("onclick") or "").strip()
-        if not txt or not onclick:
-            continue
-        m = _POPDED_RE.search(onclick)
-        if not m:
-            continue
-        url = _html.unescape(m.group(1)).strip()
-        # Keep last-seen; usually identical anyway.
-        out[txt] = url
-    return out
+    retry_after_s: float | None = None  # server-requested wait from Retry-After, on throttled responses
 
 
 def split_ref_codes(cell: object) -> list[str]:
@@ -86,12 +68,11 @@ def make_ref_key(kind: str, code: str) -> str:
 
 
 def _safe_float(x: object) -> float | None:
-    s = str(x).strip().strip("[]()")
-    if not s or s.lower() == "nan":
-        return None
-    s = s.replace(" ", "").replace(",", "")
-    m = _FLOAT_RE.search(s)
-    return float(m.group(0)) if m else None
+    return safe_float(x, edge_chars=_EDGE_BRACKETS)
+
+
+def _safe_float_column(col: pd.Series) -> list[float | None]:
+    return safe_float_column(col, edge_chars=_EDGE_BRACKETS)
 
 
 def _parse_j(x: object) -> float | None:
@@ -110,35 +91,53 @@ def _parse_j(x: object) -> float | None:
         return None
 
 
-def _col_exact(df: pd.DataFrame, name: str) -> str:
-    target = name.strip().lower()
+def _column_map(df: pd.DataFrame) -> dict[str, str]:
+    """Map stripped, lowercased column names to the original labels (first occurrence wins)."""
+    out: dict[str, str] = {}
     for c in df.columns:
-        if str(c).strip().lower() == target:
-            return c
-    raise KeyError(f"Missing required column: {name}. Columns={list(df.columns)}")
+        out.setdefault(str(c).strip().lower(), c)
+    return out
 
 
-def _find_col_contains(df: pd.DataFrame, *needles: str) -> str | None:
+def _col_exact(col_lc: dict[str, str], name: str) -> str:
+    target = name.strip().lower()
+    if target in col_lc:
+        return col_lc[target]
+    raise KeyError(f"Missing required column: {name}. Columns={list(col_lc.values())}")
+
+
+def _find_col_contains(col_lc: dict[str, str], *needles: str) -> str | None:
     needles_l = [n.lower() for n in needles]
-    for c in df.columns:
-        name = str(c).strip().lower()
+    for name, c in col_lc.items():
         if all(n in name for n in needles_l):
             return c
     return None
 
 
-def _find_level_col(df: pd.DataFrame) -> str:
-    for c in df.columns:
-        if "level" in str(c).strip().lower():
-            return c
-    raise KeyError(f"Missing Level column. Columns={list(df.columns)}")
+def _find_level_col(col_lc: dict[str, str]) -> str:
+    c = _find_col_contains(col_lc, "level")
+    if c is None:
+        raise KeyError(f"Missing Level column. Columns={list(col_lc.values())}")
+    return c
 
 
 def _normalize_missing_series(s: pd.Series) -> pd.Series:
     return s.replace({"": pd.NA, "nan": pd.NA, "NaN": pd.NA, "None": pd.NA})
 
 
-def run(*, spectrum: str, units: str = "cm-1", force: bool = False) -> FetchRunResult:
+def run(
+    *,
+    spectrum: str,
+    units: str = "cm-1",
+    force: bool = False,
+    throttle: Callable[[], object] | None = None,
+    on_status: Callable[[int], object] | None = None,
+) -> FetchRunResult:
+    """Fetch, parse and append the levels of one spectrum.
+
+    `throttle`/`on_status` are fetch_cached's pacing hooks; with a throttle the fixed post-fetch
+    polite sleep is skipped, as in fetch_lines.fetch_lines_raw().
+    """
     try:
         paths = get_paths()
         ps = parse_spectrum_label(spectrum)
@@ -150,11 +149,13 @@ def run(*, spectrum: str, units: str = "cm-1", force: bool = False) -> FetchRunR
         params = build_levels_params(q)
 
         raw_dir = paths.raw_dir / "nist_asd" / "levels"
-        fr = fetch_cached(url=LEVELS_URL, params=params, cache_dir=raw_dir, force=force)
+        if throttle is not None:
+            fr = fetch_cached(url=LEVELS_URL, params=params, cache_dir=raw_dir, polite_delay_s=0.0, force=force, throttle=throttle, on_status=on_status)
+        else:
+            fr = fetch_cached(url=LEVELS_URL, params=params, cache_dir=raw_dir, force=force, on_status=on_status)
 
         raw_bytes = fr.content_path.read_bytes()
-        raw_html = raw_bytes.decode("utf-8", errors="replace")
-        ref_url_map = extract_ref_urls_from_html(raw_html)
+        ref_url_map = extract_ref_urls(raw_bytes)
 
         if fr.status_code != 200:
             return FetchRunResult(
@@ -163,6 +164,7 @@ def run(*, spectrum: str, units: str = "cm-1", force: bool = False) -> FetchRunR
                 fr.status_code,
                 f"HTTP {fr.status_code} fetching levels for {ps.asd_label}",
                 str(fr.content_path),
+                parse_retry_after(fr.retry_after),
             )
 
         df = parse_levels_response(raw_bytes)
@@ -175,15 +177,16 @@ def run(*, spectrum: str, units: str = "cm-1", force: bool = False) -> FetchRunR
                 str(fr.content_path),
             )
 
-        cfg_col = _col_exact(df, "Configuration")
-        term_col = _col_exact(df, "Term")
-        j_col = _col_exact(df, "J")
-        level_col = _find_level_col(df)
-        unc_col = _find_col_contains(df, "unc")
-        ref_col = _find_col_contains(df, "ref")
+        col_lc = _column_map(df)
+        cfg_col = _col_exact(col_lc, "Configuration")
+        term_col = _col_exact(col_lc, "Term")
+        j_col = _col_exact(col_lc, "J")
+        level_col = _find_level_col(col_lc)
+        unc_col = _find_col_contains(col_lc, "unc")
+        ref_col = _find_col_contains(col_lc, "ref")
 
-        lande_col = _find_col_contains(df, "land", "g")  # "Landé g-factor" etc.
-        perc_col = _find_col_contains(df, "percent")  # "Leading Percentages"
+        lande_col = _find_col_contains(col_lc, "land", "g")  # "Landé g-factor" etc.
+        perc_col = _find_col_contains(col_lc, "percent")  # "Leading Percentages"
 
         # Forward-fill for continuation rows
         df[cfg_col] = _normalize_missing_series(df[cfg_col]).ffill()
@@ -198,8 +201,10 @@ def run(*, spectrum: str, units: str = "cm-1", force: bool = False) -> FetchRunR
         append_ndjson_dedupe(species_path, [make_species_record(ps)], "species_id")
         append_ndjson_dedupe(iso_path, [make_isotopologue_record(sid)], "iso_id")
 
-        ref_records: list[dict] = []
-        state_records: list[dict] = []
+        # Ordered set of every ref code cited by an emitted row; ref records are built once per code after the loop.
+        ref_codes_seen: dict[str, None] = {}
+        # Keyed by state_id so rows that hash to the same ID are only built once.
+        state_records: dict[str, dict] = {}
 
         handled_cols = {cfg_col, term_col, j_col, level_col}
         if unc_col:
@@ -211,7 +216,12 @@ def run(*, spectrum: str, units: str = "cm-1", force: bool = False) -> FetchRunR
         if perc_col:
             handled_cols.add(perc_col)
 
-        for _, row in df.iterrows():
+        # Numeric columns are converted up front, then read by row position.
+        energies = _safe_float_column(df[level_col])
+        uncs = _safe_float_column(df[unc_col]) if unc_col else None
+        lande_gs = _safe_float_column(df[lande_col]) if lande_col else None
+
+        for pos, row in enumerate(iter_rows(df)):
             cfg = str(row.get(cfg_col, "")).strip()
             term = str(row.get(term_col, "")).strip()
             j_raw = str(row.get(j_col, "")).strip()
@@ -221,11 +231,11 @@ def run(*, spectrum: str, units: str = "cm-1", force: bool = False) -> FetchRunR
             jv = _parse_j(j_raw)
             g = (2.0 * jv + 1.0) if jv is not None else None
 
-            energy = _safe_float(row.get(level_col))
+            energy = energies[pos]
             if energy is None:
                 continue
 
-            unc = _safe_float(row.get(unc_col)) if unc_col else None
+            unc = uncs[pos] if uncs is not None else None
 
             # ---- References (multi-ref aware) ----
             ref_cell = str(row.get(ref_col, "")).strip() if ref_col else ""
@@ -236,20 +246,9 @@ def run(*, spectrum: str, units: str = "cm-1", force: bool = False) -> FetchRunR
             # Back-compat singleton
             primary_ref_id = ref_keys[0] if ref_keys else None
 
-            # Emit one ref record per code/key (dedupe happens later)
-            for code in ref_codes:
-                rk = make_ref_key("E", code)
-                ref_records.append(
-                    {
-                        "ref_id": rk,
-                        "citation": None,
-                        "doi": None,
-                        "url": ref_url_map.get(code),
-                        "notes": f"ASD Energy Level ref code={code}; url extracted from popded(...) when available.",
-                    }
-                )
-
-            lande_g = _safe_float(row.get(lande_col)) if lande_col else None
+            ref_codes_seen.update(dict.fromkeys(ref_codes))
+
+            lande_g = lande_gs[pos] if lande_gs is not None else None
             leading_pct = None
             if perc_col:
                 val = row.get(perc_col)
@@ -281,35 +280,45 @@ def run(*, spectrum: str, units: str = "cm-1", force: bool = False) -> FetchRunR
             # Make ID stable and sensitive to the full ref list (prevents corruption collisions)
             refs_for_id = ",".join(ref_keys) if ref_keys else ""
             state_id = make_id("state", iso_id, cfg, term, j_raw, str(energy), refs_for_id)
+            if state_id in state_records:
+                continue
 
-            state_records.append(
-                {
-                    "state_id": state_id,
-                    "iso_id": iso_id,
-                    "state_type": "atomic",
-                    "electronic_label": f"{cfg} {term} J={j_raw}",
-                    "vibrational_json": None,
-                    "rotational_json": None,
-                    "parity": None,
-                    "configuration": cfg,
-                    "term": term,
-                    "j_value": jv,
-                    "f_value": None,
-                    "g_value": g,
-                    "lande_g": lande_g,
-                    "leading_percentages": leading_pct,
-                    "extra_json": extra_json,
-                    "energy_value": energy,
-                    "energy_unit": units,
-                    "energy_uncertainty": unc,
-                    # Back-compat singleton ref_id; full list is in extra_json
-                    "ref_id": primary_ref_id,
-                    "notes": f"NIST ASD energy levels for {ps.asd_label}",
-                }
-            )
-
+            state_records[state_id] = {
+                "state_id": state_id,
+                "iso_id": iso_id,
+                "state_type": "atomic",
+                "electronic_label": f"{cfg} {term} J={j_raw}",
+                "vibrational_json": None,
+                "rotational_json": None,
+                "parity": None,
+                "configuration": cfg,
+                "term": term,
+                "j_value": jv,
+                "f_value": None,
+                "g_value": g,
+                "lande_g": lande_g,
+                "leading_percentages": leading_pct,
+                "extra_json": extra_json,
+                "energy_value": energy,
+                "energy_unit": units,
+                "energy_uncertainty": unc,
+                # Back-compat singleton ref_id; full list is in extra_json
+                "ref_id": primary_ref_id,
+                "notes": f"NIST ASD energy levels for {ps.asd_label}",
+            }
+
+        ref_records = [
+            {
+                "ref_id": make_ref_key("E", code),
+                "citation": None,
+                "doi": None,
+                "url": ref_url_map.get(code),
+                "notes": f"ASD Energy Level ref code={code}; url extracted from popded(...) when available.",
+            }
+            for code in ref_codes_seen
+        ]
         append_ndjson_dedupe(refs_path, ref_records, "ref_id")
-        n = append_ndjson_dedupe(states_path, state_records, "state_id")
+        n = append_ndjson_dedupe(states_path, state_records.values(), "state_id")
 
         return FetchRunResult(True, n, fr.status_code, "OK", str(fr.content_path))
 
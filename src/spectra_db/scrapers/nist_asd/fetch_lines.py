@@ -1,15 +1,13 @@
 from __future__ import annotations
 
 import argparse
-import html as _html
 import json
 import re
+from collections.abc import Callable
 from dataclasses import dataclass
 from urllib.parse import urlencode
 
-from bs4 import BeautifulSoup
-
-from spectra_db.scrapers.common.http import fetch_cached
+from spectra_db.scrapers.common.http import FetchResult, fetch_cached, parse_retry_after
 from spectra_db.scrapers.common.ndjson import append_ndjson_dedupe
 from spectra_db.scrapers.nist_asd.asd_client import LINES_URL, LinesQuery, build_lines_params
 from spectra_db.scrapers.nist_asd.normalize_atomic import (
@@ -21,10 +19,10 @@ from spectra_db.scrapers.nist_asd.normalize_atomic import (
     species_id_for,
 )
 from spectra_db.scrapers.nist_asd.parse_lines import parse_lines_response
+from spectra_db.scrapers.nist_asd.table_cells import FLOAT_RE, iter_rows, safe_float_column
 from spectra_db.util.paths import get_paths
+from spectra_db.util.ref_url import extract_ref_urls
 
-_FLOAT_RE = re.compile(r"[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
-_POPDED_RE = re.compile(r"popded\('([^']+)'\)")
 _REF_SPLIT_RE = re.compile(r"\s*,\s*")
 CODE_RE = re.compile(r"^[A-Za-z]+(?P<db_id>\d+)(?P<comment>[A-Za-z]\d+)?$")
 
@@ -52,28 +50,16 @@ def reconstruct_asbib_url(kind: str, code: str, *, element: str | None = None, s
     return f"{base}?{urlencode(params)}"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FetchRunResult:
     ok: bool
     written: int
     status_code: int | None
     message: str
     raw_path: str | None = None
-
-
-def extract_ref_urls_from_html(raw_html: str) -> dict[str, str]:
-    soup = BeautifulSoup(raw_html, "html.parser")
-    out: dict[str, str] = {}
-    for a in soup.find_all("a"):
-        txt = (a.get_text() or "").strip()
-        onclick = (a.get("onclick") or "").strip()
-        if not txt or not onclick:
-            continue
-        m = _POPDED_RE.search(onclick)
-        if not m:
-            continue
-        out[txt] = _html.unescape(m.group(1)).strip()
-    return out
+    retry_after_s: float | None = None  # server-requested wait from Retry-After, on throttled responses
+    parsed_rows: int = 0  # table rows parsed from the response (before filtering), for truncation checks
+    page_size: int = 0  # page_size sent with the query (0 = unknown)
 
 
 def split_ref_codes(cell: object) -> list[str]:
@@ -91,15 +77,6 @@ def make_ref_key(kind: str, code: str) -> str:
     return f"{kind}:{code}"
 
 
-def _safe_float(x: object) -> float | None:
-    s = str(x).strip()
-    if not s or s.lower() == "nan":
-        return None
-    s = s.replace(" ", "").replace(",", "")
-    m = _FLOAT_RE.search(s)
-    return float(m.group(0)) if m else None
-
-
 def _find_cols(df, *needles: str) -> list[str]:
     needles_l = [n.lower() for n in needles]
     out: list[str] = []
@@ -135,7 +112,7 @@ def _parse_energy_range(val: object) -> tuple[float | None, float | None]:
     parts = re.split(r"\s*-\s*", s)
     nums: list[float] = []
     for p in parts:
-        m = _FLOAT_RE.search(p)
+        m = FLOAT_RE.search(p)
         if m:
             nums.append(float(m.group(0)))
     if len(nums) >= 2:
@@ -151,7 +128,7 @@ def _parse_two_energies(val: object) -> tuple[float | None, float | None]:
     if not s or s.lower() == "nan":
         return (None, None)
     s = s.replace(",", "").replace(" ", "")
-    nums = [float(m.group(0)) for m in _FLOAT_RE.finditer(s)]
+    nums = [float(m.group(0)) for m in FLOAT_RE.finditer(s)]
     if len(nums) >= 2:
         return nums[0], nums[1]
     if len(nums) == 1:
@@ -189,6 +166,41 @@ def _prune(obj: object) -> object:
     return obj
 
 
+def fetch_lines_raw(
+    *,
+    spectrum: str,
+    min_wav: float,
+    max_wav: float,
+    unit: str = "nm",
+    wavelength_type: str = "vacuum",
+    force: bool = False,
+    throttle: Callable[[], object] | None = None,
+    on_status: Callable[[int], object] | None = None,
+) -> FetchResult:
+    """Fetch (or reuse the cached) raw lines1.pl response for one wavelength bin, without parsing it.
+
+    run() goes through here too, so a bin fetched ahead of time is a cache hit for run(). `throttle`
+    is called before a network request (e.g. a shared AdaptivePacer.wait) and then replaces the
+    fixed post-fetch polite sleep; `on_status` gets the status of each network response.
+    """
+    ps = parse_spectrum_label(spectrum)
+    q = LinesQuery(
+        spectra=ps.asd_label,
+        low_w=min_wav,
+        upp_w=max_wav,
+        unit=unit,
+        wavelength_type=wavelength_type,
+        energy_level_unit="cm-1",
+        format_code=1,
+    )
+    params = build_lines_params(q)
+
+    raw_dir = get_paths().raw_dir / "nist_asd" / "lines"
+    if throttle is not None:
+        return fetch_cached(url=LINES_URL, params=params, cache_dir=raw_dir, polite_delay_s=0.0, force=force, throttle=throttle, on_status=on_status)
+    return fetch_cached(url=LINES_URL, params=params, cache_dir=raw_dir, force=force, on_status=on_status)
+
+
 def run(
     *,
     spectrum: str,
@@ -197,6 +209,8 @@ def run(
     unit: str = "nm",
     wavelength_type: str = "vacuum",
     force: bool = False,
+    throttle: Callable[[], object] | None = None,
+    on_status: Callable[[int], object] | None = None,
 ) -> FetchRunResult:
     try:
         paths = get_paths()
@@ -204,30 +218,26 @@ def run(
         sid = species_id_for(ps)
         iso_id = iso_id_for(sid)
 
-        q = LinesQuery(
-            spectra=ps.asd_label,
-            low_w=min_wav,
-            upp_w=max_wav,
-            unit=unit,
-            wavelength_type=wavelength_type,
-            energy_level_unit="cm-1",
-            format_code=1,
-        )
-        params = build_lines_params(q)
-
-        raw_dir = paths.raw_dir / "nist_asd" / "lines"
-        fr = fetch_cached(url=LINES_URL, params=params, cache_dir=raw_dir, force=force)
+        fr = fetch_lines_raw(spectrum=spectrum, min_wav=min_wav, max_wav=max_wav, unit=unit, wavelength_type=wavelength_type, force=force, throttle=throttle, on_status=on_status)
 
         raw_bytes = fr.content_path.read_bytes()
-        raw_html = raw_bytes.decode("utf-8", errors="replace")
-        ref_url_map = extract_ref_urls_from_html(raw_html)
+        ref_url_map = extract_ref_urls(raw_bytes)
 
         if fr.status_code != 200:
-            return FetchRunResult(False, 0, fr.status_code, f"HTTP {fr.status_code} fetching lines for {ps.asd_label}", str(fr.content_path))
+            return FetchRunResult(
+                False,
+                0,
+                fr.status_code,
+                f"HTTP {fr.status_code} fetching lines for {ps.asd_label}",
+                str(fr.content_path),
+                parse_retry_after(fr.retry_after),
+            )
 
         df = parse_lines_response(raw_bytes)
+        parsed_rows = int(df.shape[0])
+        page_size = int(str(fr.params.get("page_size") or 0))
         if df.empty:
-            return FetchRunResult(True, 0, fr.status_code, "OK (0 rows)", str(fr.content_path))
+            return FetchRunResult(True, 0, fr.status_code, "OK (0 rows)", str(fr.content_path), parsed_rows=parsed_rows, page_size=page_size)
 
         # Wavelengths
         obs_wl_col = _find_col(df, "observed", "wavelength")
@@ -315,15 +325,29 @@ def run(
         ref_records: list[dict] = []
         trans_records: list[dict] = []
 
-        for _, row in df.iterrows():
-            obs_wl = _safe_float(row.get(obs_wl_col)) if obs_wl_col else None
-            ritz_wl = _safe_float(row.get(ritz_wl_col)) if ritz_wl_col else None
+        # Numeric columns are converted up front and read by row position; rows are plain dicts, so the
+        # loop below does no per-cell pandas access.
+        n_rows = len(df)
+
+        def num_col(c: str | None) -> list[float | None]:
+            return safe_float_column(df[c]) if c else [None] * n_rows
+
+        obs_wls, ritz_wls = num_col(obs_wl_col), num_col(ritz_wl_col)
+        obs_uncs, ritz_uncs = num_col(obs_unc_col), num_col(ritz_unc_col)
+        eis, eks = num_col(ei_col), num_col(ek_col)
+        relints, akis = num_col(relint_col), num_col(aki_col)
+        loggfs, fs = num_col(loggf_col), num_col(f_col)
+        extra_cols = [c for c in df.columns if c not in handled_cols]
+
+        for pos, row in enumerate(iter_rows(df)):
+            obs_wl = obs_wls[pos]
+            ritz_wl = ritz_wls[pos]
             wav = obs_wl if obs_wl is not None else ritz_wl
             if wav is None:
                 continue
 
-            obs_unc = _safe_float(row.get(obs_unc_col)) if obs_unc_col else None
-            ritz_unc = _safe_float(row.get(ritz_unc_col)) if ritz_unc_col else None
+            obs_unc = obs_uncs[pos]
+            ritz_unc = ritz_uncs[pos]
             chosen_unc = obs_unc if (obs_wl is not None) else ritz_unc
 
             # ---- refs (comma-separated supported; store as keys) ----
@@ -370,8 +394,8 @@ def run(
                 )
 
             # ---- Ei/Ek robust ----
-            ei = _safe_float(row.get(ei_col)) if ei_col else None
-            ek = _safe_float(row.get(ek_col)) if ek_col else None
+            ei = eis[pos]
+            ek = eks[pos]
 
             # If packed into same column, parse two numbers even without dash
             if ei_col and ek_col and ei_col == ek_col:
@@ -441,8 +465,8 @@ def run(
                 "wavelength_medium_inferred": _infer_medium_from_header(str(obs_wl_col) if obs_wl_col else None),
                 "observed_wavelength_header": obs_wl_col,
                 "ritz_wavelength_header": ritz_wl_col,
-                "relative_intensity": _safe_float(row.get(relint_col)) if relint_col else None,
-                "Aki_s-1": _safe_float(row.get(aki_col)) if aki_col else None,
+                "relative_intensity": relints[pos],
+                "Aki_s-1": akis[pos],
                 "accuracy_code": str(row.get(acc_col)).strip() if acc_col else None,
                 "Ei_cm-1": ei,
                 "Ek_cm-1": ek,
@@ -459,8 +483,8 @@ def run(
                 "line_ref_keys": line_ref_keys,
                 "tp_ref_urls": tp_ref_urls,
                 "line_ref_urls": line_ref_urls,
-                "log_gf": _safe_float(row.get(loggf_col)) if loggf_col else None,
-                "f": _safe_float(row.get(f_col)) if f_col else None,
+                "log_gf": loggfs[pos],
+                "f": fs[pos],
             }
 
             payload = _prune(payload)  # type: ignore[assignment]
@@ -468,9 +492,7 @@ def run(
 
             # extras
             extras: dict[str, object] = {}
-            for c in df.columns:
-                if c in handled_cols:
-                    continue
+            for c in extra_cols:
                 v = row.get(c)
                 if v is None:
                     continue
@@ -498,7 +520,7 @@ def run(
         append_ndjson_dedupe(refs_path, ref_records, "ref_id")
         n = append_ndjson_dedupe(trans_path, trans_records, "transition_id")
 
-        return FetchRunResult(True, n, fr.status_code, "OK", str(fr.content_path))
+        return FetchRunResult(True, n, fr.status_code, "OK", str(fr.content_path), parsed_rows=parsed_rows, page_size=page_size)
 
     except Exception as e:
         return FetchRunResult(False, 0, None, f"Exception: {type(e).__name__}: {e}", None)
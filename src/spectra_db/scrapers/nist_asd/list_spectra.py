@@ -6,7 +6,14 @@ from pathlib import Path
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401  # optional: C parser, much faster than html.parser on the holdings pages
+except Exception:  # pragma: no cover
+    _BS4_PARSER = "html.parser"
+else:
+    _BS4_PARSER = "lxml"
 
 LEVELS_PT = "https://physics.nist.gov/cgi-bin/ASD/levels_pt.pl"
 LINES_PT = "https://physics.nist.gov/cgi-bin/ASD/lines_pt.pl"
@@ -28,10 +35,11 @@ def _get(url: str, timeout_s: float = 60.0) -> str:
 
 
 def _extract_hold_links(html: str, base_url: str) -> list[str]:
-    soup = BeautifulSoup(html, "html.parser")
+    # Only <a href> elements are kept; the rest of the periodic-table page is never built into the tree.
+    soup = BeautifulSoup(html, _BS4_PARSER, parse_only=SoupStrainer("a", href=True))
     links: list[str] = []
     for a in soup.find_all("a"):
-        href = a.get("href") or ""
+        href = a["href"]
         if HOLD_RE.search(href):
             links.append(urljoin(base_url, href))
     # de-dupe preserve order
@@ -47,7 +55,7 @@ def _extract_hold_links(html: str, base_url: str) -> list[str]:
 def _extract_spectra_from_hold_page(html: str) -> list[str]:
     """Extract spectrum labels like 'Ca I' from a holdings page."""
     # We intentionally regex-scan the text to avoid depending on table structure.
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, _BS4_PARSER)
     text = soup.get_text("\n")
     found = []
     for m in SPEC_RE.finditer(text):
@@ -90,7 +98,7 @@ def fetch_spectra_list(kind: str) -> list[str]:
         # If the periodic table page doesn’t expose hold links directly,
         # fall back to constructing them by element symbols found in the page text.
         if not hold_links:
-            soup = BeautifulSoup(pt_html, "html.parser")
+            soup = BeautifulSoup(pt_html, _BS4_PARSER)
             text = soup.get_text(" ")
             elems = sorted(set(re.findall(r"\b([A-Z][a-z]?)\b", text)))
             # filter to plausible element symbols (1-2 chars)
@@ -10,7 +10,7 @@ from spectra_db.scrapers.common.ids import make_id
 _ROMAN_VALUES = {"I": 1, "V": 5, "X": 10, "L": 50, "C": 100, "D": 500, "M": 1000}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ParsedSpectrum:
     """Parsed atomic spectrum designation.
 
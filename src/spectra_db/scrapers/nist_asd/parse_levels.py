@@ -5,6 +5,25 @@ import re
 
 import pandas as pd
 
+_PRE_RE = re.compile(r"<pre>(.*)</pre>", flags=re.DOTALL | re.IGNORECASE)
+_LEVEL_TABLE_COLS = frozenset({"configuration", "term", "j"})
+
+
+def _read_html_tables(html: str) -> list[pd.DataFrame]:
+    """pandas.read_html via lxml (libxml2, C) first; bs4/html5lib only if lxml rejects the markup."""
+    for flavor in ("lxml", "bs4"):
+        try:
+            return pd.read_html(io.StringIO(html), flavor=flavor)
+        except Exception:
+            continue
+    return []
+
+
+def _level_table_score(df: pd.DataFrame) -> int:
+    """Prefer tables that carry the Configuration/Term/J columns, then the longer one."""
+    cols = {str(c).strip().lower() for c in df.columns}
+    return len(_LEVEL_TABLE_COLS & cols) * 100 + df.shape[0]
+
 
 def parse_levels_response(content: bytes) -> pd.DataFrame:
     """Parse NIST ASD energy1.pl output into a DataFrame.
@@ -25,26 +44,17 @@ def parse_levels_response(content: bytes) -> pd.DataFrame:
     html = content.decode("utf-8", errors="replace")
 
     # 1) Primary: parse HTML tables and pick the most "level-like" one.
-    try:
-        tables = pd.read_html(io.StringIO(html))
-    except Exception:
-        tables = []
+    tables = _read_html_tables(html)
 
     if tables:
-        # Prefer tables that contain these columns.
-        def score(df: pd.DataFrame) -> int:
-            cols = {str(c).strip().lower() for c in df.columns}
-            want = {"configuration", "term", "j"}
-            return int(len(want.intersection(cols)) * 100 + df.shape[0])
-
-        tables.sort(key=score, reverse=True)
-        best = tables[0]
+        # Single pass for the best-scoring table; no need to sort them all.
+        best = max(tables, key=_level_table_score)
         # Basic sanity: should have at least a few rows and at least one of the main columns
         if best.shape[0] > 0:
             return best
 
     # 2) Fallback: try fixed-width parsing from <pre> if present
-    pre = re.search(r"<pre>(.*)</pre>", html, flags=re.DOTALL | re.IGNORECASE)
+    pre = _PRE_RE.search(html)
     if pre:
         pre_text = pre.group(1)
         try:
@@ -6,6 +6,8 @@ import re
 import pandas as pd
 
 _PRE_RE = re.compile(r"<pre>(.*)</pre>", flags=re.DOTALL | re.IGNORECASE)
+# Deletes every character a separator line may contain; anything left over means "not a separator".
+_SEPARATOR_CHARS_TABLE = str.maketrans("", "", "-|+ ")
 
 
 def _extract_pre(text: str) -> str:
@@ -17,36 +19,30 @@ def _is_separator(line: str) -> bool:
     """
     NIST ASD ASCII table separators are long runs of '-' (sometimes with + or |).
     """
-    s = line.rstrip("\n")
-    t = s.strip()
-    if not t:
-        return False
+    t = line.strip()
     # Allow '-', '|', '+', and spaces; require lots of '-' to avoid false positives.
-    allowed = set("-|+ ")
-    return (t.count("-") > 10) and (set(t) <= allowed)
+    return t.count("-") > 10 and not t.translate(_SEPARATOR_CHARS_TABLE)
 
 
 def _pipe_positions(template_line: str) -> list[int]:
     return [i for i, ch in enumerate(template_line) if ch == "|"]
 
 
-def _split_fixed_width(line: str, pipe_pos: list[int]) -> list[str]:
+def _slice_bounds(pipe_pos: list[int]) -> list[tuple[int, int | None]]:
+    """Cell (start, end) slices between pipe positions; computed once per table, reused for every row."""
+    starts = [0] + [p + 1 for p in pipe_pos]
+    ends: list[int | None] = [*pipe_pos, None]
+    return list(zip(starts, ends, strict=True))
+
+
+def _split_by_bounds(line: str, bounds: list[tuple[int, int | None]]) -> list[str]:
     """
     Split a fixed-width ASCII row by slicing between pipe positions.
     This remains aligned even when some header rows omit internal pipes
-    (spanning group headers).
+    (spanning group headers). Slicing past the end of a short line yields "",
+    same as padding it with spaces first.
     """
-    if not pipe_pos:
-        return [line.strip()]
-
-    # Ensure the line is long enough for slicing.
-    need_len = pipe_pos[-1] + 1
-    if len(line) < need_len:
-        line = line + (" " * (need_len - len(line)))
-
-    starts = [0] + [p + 1 for p in pipe_pos]
-    ends = pipe_pos + [len(line)]
-    return [line[s:e].strip() for s, e in zip(starts, ends, strict=False)]
+    return [line[s:e].strip() for s, e in bounds]
 
 
 def _normalize_header_cell(s: str) -> str:
@@ -95,7 +91,8 @@ def _build_headers(header_lines: list[str], pipe_pos: list[int]) -> list[str]:
     if not header_lines:
         return []
 
-    hdr_rows = [_split_fixed_width(ln, pipe_pos) for ln in header_lines]
+    bounds = _slice_bounds(pipe_pos)
+    hdr_rows = [_split_by_bounds(ln, bounds) for ln in header_lines]
     ncols = max(len(r) for r in hdr_rows)
     hdr_rows = [r + [""] * (ncols - len(r)) for r in hdr_rows]
 
@@ -106,7 +103,7 @@ def _build_headers(header_lines: list[str], pipe_pos: list[int]) -> list[str]:
 
     # Use the most pipe-rich header row as the “detail row” for structure detection
     detail_row_line = max(header_lines, key=lambda s: s.count("|")) if header_lines else ""
-    detail_cells = _split_fixed_width(detail_row_line, pipe_pos)
+    detail_cells = _split_by_bounds(detail_row_line, bounds)
     detail_cells = detail_cells + [""] * (ncols - len(detail_cells))
 
     names = [m if m else f"col_{i}" for i, m in enumerate(merged)]
@@ -204,29 +201,17 @@ def parse_lines_response(content: bytes) -> pd.DataFrame:
     headers = _build_headers(header_lines, pipe_pos)
     ncols = len(headers)
 
-    rows: list[list[str]] = []
-    for ln in data_lines:
-        if _is_separator(ln):
-            continue
-        if "|" not in ln:
-            continue
-        cells = _split_fixed_width(ln, pipe_pos)
-        if len(cells) < ncols:
-            cells = cells + [""] * (ncols - len(cells))
-        else:
-            cells = cells[:ncols]
-        if not any(c.strip() for c in cells):
-            continue
-        rows.append(cells)
+    candidates = [ln for ln in data_lines if "|" in ln and not _is_separator(ln)]
+    pad = [""] * ncols
+    bounds = _slice_bounds(pipe_pos)
+    # Cells come back stripped, so blank rows (e.g. spacer lines made only of pipes) are dropped here
+    # rather than with a per-cell pass over the finished DataFrame.
+    rows = [row for row in ((cells + pad)[:ncols] for cells in (_split_by_bounds(ln, bounds) for ln in candidates)) if any(row)]
 
     df = pd.DataFrame(rows, columns=headers)
 
     # Drop fully-empty trailing “col_*” columns if they exist
-    drop_cols = []
-    for c in df.columns:
-        if str(c).startswith("col_"):
-            if df[c].astype(str).str.strip().eq("").all():
-                drop_cols.append(c)
+    drop_cols = [c for c in df.columns if str(c).startswith("col_") and df[c].eq("").all()]
     if drop_cols:
         df = df.drop(columns=drop_cols)
 
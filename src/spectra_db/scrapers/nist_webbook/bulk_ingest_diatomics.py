@@ -10,8 +10,8 @@ from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
+import requests
 from bs4 import BeautifulSoup
 
 from spectra_db.scrapers.nist_webbook.fetch_webbook import run as fetch_webbook_run
@@ -154,14 +154,18 @@ def ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
+# Shared across discovery requests so the TCP/TLS connection to webbook.nist.gov is kept alive.
+_SESSION = requests.Session()
+
+
 def http_get(url: str, *, user_agent: str, timeout_s: float) -> tuple[str, bytes]:
-    req = Request(
+    resp = _SESSION.get(
         url,
         headers={"User-Agent": user_agent, "Accept": "text/html,application/xhtml+xml"},
-        method="GET",
+        timeout=timeout_s,
     )
-    with urlopen(req, timeout=timeout_s) as resp:
-        return resp.geturl(), resp.read()
+    resp.raise_for_status()
+    return resp.url, resp.content
 
 
 def parse_html(body: bytes) -> BeautifulSoup:
@@ -11,7 +11,7 @@ from spectra_db.util.paths import get_paths
 WEBBOOK_CBOOK_URL = "https://webbook.nist.gov/cgi/cbook.cgi"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FetchRunResult:
     ok: bool
     status_code: int | None
@@ -36,6 +36,11 @@ def run(*, webbook_id: str, mask: int = 1000, force: bool = False, timeout_s: fl
     if res.status_code != 200:
         return FetchRunResult(ok=False, status_code=res.status_code, message=f"HTTP {res.status_code}", raw_path=str(res.content_path), meta_path=str(res.meta_path))
 
+    # Zero-byte <key>.mask<N> marker lets normalize_cache filter by mask from a directory listing
+    # without opening the meta JSON.
+    key = res.content_path.name[: -len(".body")]
+    res.content_path.with_name(f"{key}.mask{mask}").touch(exist_ok=True)
+
     return FetchRunResult(
         ok=True,
         status_code=res.status_code,
@@ -3,16 +3,32 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import re
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-from spectra_db.scrapers.common.ndjson import append_ndjson_dedupe
-from spectra_db.scrapers.nist_webbook.normalize_diatomic_constants import run as normalize_diatomic
+from spectra_db.scrapers.common.ndjson import append_ndjson_dedupe, file_stamp
+from spectra_db.scrapers.nist_webbook.normalize_diatomic_constants import build_records, write_records
 from spectra_db.util.paths import get_paths
 
+# Fast path for pulling cache_key out of an ingest-log line without a full json.loads.
+_CACHE_KEY_RE = re.compile(rb'"cache_key"\s*:\s*"([^"\\]+)"')
 
-@dataclass(frozen=True)
+# Cheap pre-check on raw meta bytes: anything that does not record a 200 is skipped without json.loads.
+_STATUS_200_RE = re.compile(rb'"status_code"\s*:\s*200\b')
+
+# Zero-byte "<key>.mask<N>" markers written by fetch_webbook for successful fetches.
+_MASK_MARKER_RE = re.compile(r"^(.+)\.mask(\d+)$")
+
+# Ingest-log rows are buffered and written in batches of this size.
+_LOG_FLUSH_EVERY = 512
+
+
+@dataclass(frozen=True, slots=True)
 class NormalizeCacheResult:
     ok: bool
     scanned: int
@@ -28,28 +44,98 @@ class NormalizeCacheResult:
 
 
 def _read_ingest_log_keys(path: Path) -> set[str]:
-    if not path.exists():
-        return set()
     keys: set[str] = set()
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            obj = json.loads(line)
-        except Exception:
-            continue
-        k = obj.get("cache_key")
-        if isinstance(k, str) and k:
-            keys.add(k)
+    # Binary mode: lines stay bytes (no per-line decode/strip); only matched keys are decoded.
+    try:
+        f = path.open("rb", buffering=1 << 20)
+    except FileNotFoundError:
+        return keys
+    with f:
+        for line in f:
+            # Blank lines ("\n" / "\r\n") and rows without the field are rejected with a memchr-level scan.
+            if len(line) <= 2 or b'"cache_key"' not in line:
+                continue
+            m = _CACHE_KEY_RE.search(line)
+            if m:
+                keys.add(m.group(1).decode("utf-8"))
+                continue
+            # Escaped or otherwise unusual value: fall back to a real JSON parse.
+            try:
+                obj = json.loads(line)
+            except Exception:
+                continue
+            k = obj.get("cache_key") if isinstance(obj, dict) else None
+            if isinstance(k, str) and k:
+                keys.add(k)
     return keys
 
 
-def _load_meta(meta_path: Path) -> dict[str, Any] | None:
+def _keys_stamp_path(keys_path: Path) -> Path:
+    return keys_path.with_suffix(".keys.src.json")
+
+
+def _write_keys_stamp(ingest_log: Path, keys_path: Path) -> None:
+    _keys_stamp_path(keys_path).write_text(json.dumps(file_stamp(ingest_log)), encoding="utf-8")
+
+
+def _keys_sidecar_current(ingest_log: Path, keys_path: Path) -> bool:
+    try:
+        stamp = json.loads(_keys_stamp_path(keys_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return stamp == file_stamp(ingest_log)
+
+
+def _load_ingested_keys(ingest_log: Path, keys_path: Path) -> set[str]:
+    """
+    Load the set of already-ingested cache keys.
+
+    The sidecar <ingest_log stem>.keys holds one cache_key per line and is much cheaper to read than the
+    NDJSON log. It is only trusted while <stem>.keys.src.json still records the log's current size and
+    mtime; otherwise (older data dirs, a crash between the two appends, an edited log) it is rebuilt
+    from the log.
+    """
+    if not ingest_log.exists():
+        # Keys of a deleted log must not survive into the new one via the appends.
+        keys_path.unlink(missing_ok=True)
+        return set()
+    if keys_path.exists() and _keys_sidecar_current(ingest_log, keys_path):
+        return {k for k in keys_path.read_text(encoding="utf-8").splitlines() if k}
+
+    keys = _read_ingest_log_keys(ingest_log)
+    keys_path.write_text("".join(f"{k}\n" for k in sorted(keys)), encoding="utf-8")
+    _write_keys_stamp(ingest_log, keys_path)
+    return keys
+
+
+def _append_ingested_keys(keys_path: Path, keys: list[str]) -> None:
+    with keys_path.open("a", encoding="utf-8") as f:
+        f.writelines(f"{k}\n" for k in keys)
+
+
+def _flush_ingest_log(ingest_log: Path, keys_path: Path, pending: list[dict[str, Any]]) -> None:
+    if not pending:
+        return
+    append_ndjson_dedupe(ingest_log, pending, "cache_key")
+    _append_ingested_keys(keys_path, [r["cache_key"] for r in pending])
+    # Last, so a crash before this point leaves a stale stamp and the sidecar is rebuilt next run.
+    _write_keys_stamp(ingest_log, keys_path)
+    pending.clear()
+
+
+def _read_meta_bytes(meta_path: Path) -> bytes | None:
     try:
-        return json.loads(meta_path.read_text(encoding="utf-8"))
+        return meta_path.read_bytes()
+    except OSError:
+        return None
+
+
+def _parse_meta(raw: bytes) -> dict[str, Any] | None:
+    try:
+        obj = json.loads(raw)
     except Exception:
         return None
+    return obj if isinstance(obj, dict) else None
 
 
 def _is_expected_no_data(message: str) -> bool:
@@ -63,18 +149,40 @@ def _is_expected_no_data(message: str) -> bool:
     return "no 'diatomic constants" in (message or "").lower()
 
 
-def run(*, cache_dir: Path | None = None) -> NormalizeCacheResult:
+def _build_entry(job: tuple[str, Path]) -> tuple[dict[str, list[dict[str, Any]]] | None, str, bool]:
+    """Worker: parse one cached page. Returns (records, message, failed)."""
+    webbook_id, body_path = job
+    try:
+        records, message = build_records(webbook_id=webbook_id, body_path=body_path)
+    except Exception as e:
+        return None, f"Exception: {type(e).__name__}: {e}", True
+    return records, message, False
+
+
+def _iter_built(jobs: list[tuple[str, Path]], workers: int) -> Iterator[tuple[dict[str, list[dict[str, Any]]] | None, str, bool]]:
+    """Parse jobs in order, fanning out to a process pool when there is more than one job and worker."""
+    if workers <= 1 or len(jobs) < 2:
+        yield from map(_build_entry, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+        yield from ex.map(_build_entry, jobs, chunksize=16)
+
+
+def run(*, cache_dir: Path | None = None, workers: int = 1) -> NormalizeCacheResult:
     """
     Scan the WebBook cache directory and normalize all *new* diatomic-constants pages (Mask=1000)
     into molecular NDJSON.
 
     Dedupe:
-      - Per-cache-entry: ingestion log keyed by cache_key (<basename> of <key>.meta.json)
+      - Per-cache-entry: ingestion log keyed by cache_key (<basename> of <key>.meta.json),
+        mirrored in a plain-text webbook_ingested.keys sidecar for fast startup
       - Per-row: append_ndjson_dedupe() in the underlying normalizer
 
     Notes:
       - Some discovered pages are legitimate "no data" cases (no diatomic constants table).
         These are logged as ingested with no_data=true and do not count as errors.
+      - HTML parsing runs in up to `workers` processes (default 1: serial, no pool); NDJSON and
+        ingest-log writes stay in this process, in cache-key order.
     """
     paths = get_paths()
     cache_dir = cache_dir or (paths.raw_dir / "nist_webbook" / "cbook")
@@ -82,7 +190,10 @@ def run(*, cache_dir: Path | None = None) -> NormalizeCacheResult:
     out_norm.mkdir(parents=True, exist_ok=True)
 
     ingest_log = out_norm / "webbook_ingested.ndjson"
-    already = _read_ingest_log_keys(ingest_log)
+    ingest_keys = out_norm / "webbook_ingested.keys"
+    # Read-only for the whole run: cache keys are unique file names, so keys ingested during this
+    # run never need to be checked again and only go to the pending log batch.
+    previously_ingested = frozenset(_load_ingested_keys(ingest_log, ingest_keys))
 
     scanned = 0
     eligible = 0
@@ -109,28 +220,50 @@ def run(*, cache_dir: Path | None = None) -> NormalizeCacheResult:
             message=f"Cache directory not found: {cache_dir}",
         )
 
-    metas = sorted(cache_dir.glob("*.meta.json"))
-    for meta_path in metas:
+    # One directory listing; meta/body pairing is then checked in memory instead of a stat per entry.
+    with os.scandir(cache_dir) as it:
+        names = {e.name for e in it if e.is_file()}
+    meta_names = sorted(n for n in names if n.endswith(".meta.json"))
+    marker_masks = {m.group(1): m.group(2) for m in map(_MASK_MARKER_RE.match, names) if m}
+
+    # Pass 1: cheap metadata checks, collecting the entries that need an HTML parse.
+    jobs: list[tuple[str, str, str, dict[str, Any], Path, Path]] = []
+    for name in meta_names:
         scanned += 1
 
         # meta files are named <key>.meta.json
         # cache_key should be <key>
-        name = meta_path.name
-        if not name.endswith(".meta.json"):
-            continue
         cache_key = name[: -len(".meta.json")]
 
-        if cache_key in already:
+        if cache_key in previously_ingested:
             skipped_already += 1
             continue
 
         # Pair correctly: <key>.body
-        body_path = meta_path.with_name(f"{cache_key}.body")
-        if not body_path.exists():
+        body_name = f"{cache_key}.body"
+        if body_name not in names:
             skipped_pair += 1
             continue
 
-        meta = _load_meta(meta_path)
+        # Entries with a mask marker can be ruled out without reading the meta file;
+        # legacy entries (no marker) fall through to the meta check below.
+        marker_mask = marker_masks.get(cache_key)
+        if marker_mask is not None and marker_mask != "1000":
+            skipped_mask += 1
+            continue
+
+        meta_path = cache_dir / name
+        body_path = cache_dir / body_name
+
+        raw_meta = _read_meta_bytes(meta_path)
+        if raw_meta is None:
+            errors += 1
+            continue
+        if not _STATUS_200_RE.search(raw_meta):
+            skipped_non200 += 1
+            continue
+
+        meta = _parse_meta(raw_meta)
         if not meta:
             errors += 1
             continue
@@ -154,54 +287,54 @@ def run(*, cache_dir: Path | None = None) -> NormalizeCacheResult:
             continue
 
         eligible += 1
+        jobs.append((cache_key, webbook_id, str(mask), meta, meta_path, body_path))
 
-        try:
-            rr = normalize_diatomic(webbook_id=webbook_id, body_path=body_path)
-        except Exception:
-            errors += 1
-            continue
-
-        if rr.ok:
-            processed += 1
-            already.add(cache_key)
-            log_row = {
-                "cache_key": cache_key,
-                "source": "nist_webbook",
-                "webbook_id": webbook_id,
-                "mask": str(mask),
-                "retrieved_utc": meta.get("retrieved_utc"),
-                "content_sha256": meta.get("content_sha256"),
-                "body_filename": body_path.name,
-                "meta_filename": meta_path.name,
-                "normalize_ok": True,
-                "no_data": False,
-                "normalize_message": rr.message,
-            }
-            append_ndjson_dedupe(ingest_log, [log_row], "cache_key")
-            continue
+    # Pass 2: parse (possibly in parallel), then write serially in job order.
+    built = _iter_built([(job[1], job[5]) for job in jobs], workers)
 
-        # Expected: discovered page with no diatomic constants table
-        if _is_expected_no_data(rr.message):
-            skipped_no_table += 1
-            already.add(cache_key)
-            log_row = {
-                "cache_key": cache_key,
-                "source": "nist_webbook",
-                "webbook_id": webbook_id,
-                "mask": str(mask),
-                "retrieved_utc": meta.get("retrieved_utc"),
-                "content_sha256": meta.get("content_sha256"),
-                "body_filename": body_path.name,
-                "meta_filename": meta_path.name,
-                "normalize_ok": False,
-                "no_data": True,
-                "normalize_message": rr.message,
-            }
-            append_ndjson_dedupe(ingest_log, [log_row], "cache_key")
-            continue
-
-        # Unexpected failure: count as error and do not mark ingested.
-        errors += 1
+    pending: list[dict[str, Any]] = []
+    try:
+        for (cache_key, webbook_id, mask, meta, meta_path, body_path), (records, message, failed) in zip(jobs, built, strict=True):
+            if failed:
+                errors += 1
+                continue
+
+            if records is not None:
+                try:
+                    write_records(records)
+                except Exception:
+                    errors += 1
+                    continue
+                processed += 1
+                normalize_ok, no_data = True, False
+            elif _is_expected_no_data(message):
+                # Expected: discovered page with no diatomic constants table
+                skipped_no_table += 1
+                normalize_ok, no_data = False, True
+            else:
+                # Unexpected failure: count as error and do not mark ingested.
+                errors += 1
+                continue
+
+            pending.append(
+                {
+                    "cache_key": cache_key,
+                    "source": "nist_webbook",
+                    "webbook_id": webbook_id,
+                    "mask": mask,
+                    "retrieved_utc": meta.get("retrieved_utc"),
+                    "content_sha256": meta.get("content_sha256"),
+                    "body_filename": body_path.name,
+                    "meta_filename": meta_path.name,
+                    "normalize_ok": normalize_ok,
+                    "no_data": no_data,
+                    "normalize_message": message,
+                }
+            )
+            if len(pending) >= _LOG_FLUSH_EVERY:
+                _flush_ingest_log(ingest_log, ingest_keys, pending)
+    finally:
+        _flush_ingest_log(ingest_log, ingest_keys, pending)
 
     ok = errors == 0
     msg = "ok" if ok else f"completed with {errors} errors"
@@ -228,8 +361,9 @@ def main() -> None:
         default=None,
         help="Override cache directory. Default: data/raw/nist_webbook/cbook",
     )
+    ap.add_argument("--workers", type=int, default=1, help="Parser processes (1 = serial; 0 = CPU count).")
     args = ap.parse_args()
-    rr = run(cache_dir=args.cache_dir)
+    rr = run(cache_dir=args.cache_dir, workers=args.workers or (os.cpu_count() or 1))
     print(rr)
 
 
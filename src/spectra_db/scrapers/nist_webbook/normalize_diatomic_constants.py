@@ -408,13 +408,13 @@ def _extract_references_from_ref_spans(soup: BeautifulSoup, *, webbook_id: str)
     return refs
 
 
-def run(*, webbook_id: str, body_path: Path | None = None) -> NormalizeResult:
-    paths = get_paths()
-    outdir = _out_dir(paths)
-
-    if body_path is None:
-        return NormalizeResult(ok=False, written={}, message="body_path is required (point to the cached .body file)")
+def build_records(*, webbook_id: str, body_path: Path) -> tuple[dict[str, list[dict[str, Any]]] | None, str]:
+    """
+    Parse a cached WebBook page into NDJSON records without touching the output directory.
 
+    Returns (records_by_table, message); records_by_table is None when the page has no diatomic constants.
+    Pure function of its inputs, so it can run in worker processes.
+    """
     html = body_path.read_text(encoding="utf-8", errors="replace")
     soup = BeautifulSoup(html, "lxml")
 
@@ -453,7 +453,7 @@ def run(*, webbook_id: str, body_path: Path | None = None) -> NormalizeResult:
 
     diatomic_tables = _find_diatomic_tables(soup)
     if not diatomic_tables:
-        return NormalizeResult(ok=False, written={}, message="No 'Diatomic constants for ...' tables found in HTML.")
+        return None, "No 'Diatomic constants for ...' tables found in HTML."
 
     names = ["Te", "we", "wexe", "weye", "Be", "ae", "ge", "De", "be", "re", "Trans", "nu00"]
 
@@ -623,16 +623,45 @@ def run(*, webbook_id: str, body_path: Path | None = None) -> NormalizeResult:
                     }
                 )
 
+    records = {
+        "species": [species_rec],
+        "isotopologues": iso_recs,
+        "refs": refs_recs,
+        "states": state_recs,
+        "parameters": param_recs,
+    }
+    return records, "ok"
+
+
+_ID_FIELD_BY_TABLE = {
+    "species": "species_id",
+    "isotopologues": "iso_id",
+    "refs": "ref_id",
+    "states": "state_id",
+    "parameters": "param_id",
+}
+
+
+def write_records(records: dict[str, list[dict[str, Any]]]) -> dict[str, int]:
+    """Append records from build_records() to the molecular NDJSON tables (deduped by ID)."""
+    outdir = _out_dir(get_paths())
     outdir.mkdir(parents=True, exist_ok=True)
 
     written: dict[str, int] = {}
-    written["species"] = append_ndjson_dedupe(outdir / "species.ndjson", [species_rec], "species_id")
-    written["isotopologues"] = append_ndjson_dedupe(outdir / "isotopologues.ndjson", iso_recs, "iso_id")
-    written["refs"] = append_ndjson_dedupe(outdir / "refs.ndjson", refs_recs, "ref_id")
-    written["states"] = append_ndjson_dedupe(outdir / "states.ndjson", state_recs, "state_id")
-    written["parameters"] = append_ndjson_dedupe(outdir / "parameters.ndjson", param_recs, "param_id")
+    for table, id_field in _ID_FIELD_BY_TABLE.items():
+        written[table] = append_ndjson_dedupe(outdir / f"{table}.ndjson", records.get(table, []), id_field)
+    return written
+
+
+def run(*, webbook_id: str, body_path: Path | None = None) -> NormalizeResult:
+    if body_path is None:
+        return NormalizeResult(ok=False, written={}, message="body_path is required (point to the cached .body file)")
+
+    records, message = build_records(webbook_id=webbook_id, body_path=body_path)
+    if records is None:
+        return NormalizeResult(ok=False, written={}, message=message)
 
-    return NormalizeResult(ok=True, written=written, message="ok")
+    return NormalizeResult(ok=True, written=write_records(records), message="ok")
 
 
 def main() -> None:
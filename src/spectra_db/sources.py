@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import filecmp
 import os
 import shutil
 import tempfile
 from importlib import resources
+from importlib.resources.abc import Traversable
 from pathlib import Path
 
-from spectra_db.util.paths import RepoPaths, get_paths, get_user_paths
+from spectra_db.util.paths import RepoPaths, get_install_paths
 
 SOURCES_PKG = "spectra_db_sources"
 
@@ -29,14 +31,19 @@ _EXPECTED_BY_PROFILE: dict[str, list[str]] = {
 }
 
 
-def _copy_file_atomic(src: Path, dst: Path) -> None:
+def _copy_file_atomic(src: Traversable | Path, dst: Path) -> None:
     dst.parent.mkdir(parents=True, exist_ok=True)
-    fd, tmp_name = tempfile.mkstemp(prefix=dst.name + ".", suffix=".tmp", dir=str(dst.parent))
+    fd, tmp_name = tempfile.mkstemp(prefix=dst.name + ".", suffix=".tmp", dir=os.fspath(dst.parent))
     try:
-        tmp_path = Path(tmp_name)
-        with src.open("rb") as fsrc, os.fdopen(fd, "wb") as fdst:
-            shutil.copyfileobj(fsrc, fdst, length=16 * 1024 * 1024)
-        tmp_path.replace(dst)
+        if isinstance(src, Path):
+            os.close(fd)
+            # copyfile uses the platform's in-kernel fast path (sendfile / copy_file_range / fcopyfile) where available.
+            shutil.copyfile(src, tmp_name)
+        else:
+            # Non-filesystem resource (e.g. zipped package): stream it.
+            with os.fdopen(fd, "wb") as fdst, src.open("rb") as fsrc:
+                shutil.copyfileobj(fsrc, fdst, length=16 * 1024 * 1024)
+        os.replace(tmp_name, dst)
     except Exception:
         try:
             Path(tmp_name).unlink(missing_ok=True)
@@ -45,11 +52,25 @@ def _copy_file_atomic(src: Path, dst: Path) -> None:
         raise
 
 
-def _resolve_install_paths(*, prefer_env: bool = True) -> RepoPaths:
-    p = get_paths()
-    if prefer_env and p.source == "env":
-        return p
-    return get_user_paths()
+def _dir_names(d: Path) -> set[str]:
+    """Names of the entries in d from a single directory read (empty if d does not exist)."""
+    try:
+        with os.scandir(d) as it:
+            return {e.name for e in it}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+
+def _same_content(src: Traversable | Path, dst: Path) -> bool:
+    """True if dst already holds exactly the bytes of src (size check first, then a byte compare)."""
+    if not isinstance(src, Path):
+        return False
+    try:
+        if src.stat().st_size != dst.stat().st_size:
+            return False
+    except FileNotFoundError:
+        return False
+    return filecmp.cmp(src, dst, shallow=False)
 
 
 def _ndjson_dir(paths: RepoPaths, profile: str) -> Path:
@@ -84,29 +105,28 @@ def ensure_sources_available(*, profile: str, force: bool = False) -> Path | Non
     if not src_dir.exists():
         return None
 
-    paths = _resolve_install_paths(prefer_env=True)
+    paths = get_install_paths(prefer_env=True)
     dst_dir = _ndjson_dir(paths, profile)
     dst_dir.mkdir(parents=True, exist_ok=True)
+    existing = _dir_names(dst_dir)
 
     for fname in _EXPECTED_BY_PROFILE[profile]:
         src = src_dir / fname
         if not src.exists():
             continue
         dst = dst_dir / fname
-        if dst.exists() and not force:
+        if fname in existing and not force:
             continue
-        _copy_file_atomic(Path(str(src)), dst)
+        if force and _same_content(src, dst):
+            continue
+        _copy_file_atomic(src, dst)
 
     return dst_dir
 
 
 def ndjson_has_core_files(ndjson_dir: Path, profile: str) -> bool:
-    # consider "present" if at least core identity files exist
-    core = ["species.ndjson", "isotopologues.ndjson", "refs.ndjson"]
-    for f in core:
-        if not (ndjson_dir / f).exists():
-            return False
-    # plus one profile-specific table
-    if profile == "atomic":
-        return (ndjson_dir / "states.ndjson").exists() and (ndjson_dir / "transitions.ndjson").exists()
-    return (ndjson_dir / "states.ndjson").exists() and (ndjson_dir / "parameters.ndjson").exists()
+    # consider "present" if core identity files exist plus the profile-specific tables
+    names = _dir_names(ndjson_dir)
+    core = {"species.ndjson", "isotopologues.ndjson", "refs.ndjson", "states.ndjson"}
+    core.add("transitions.ndjson" if profile == "atomic" else "parameters.ndjson")
+    return core <= names
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable
 from dataclasses import dataclass
+from functools import lru_cache
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ParsedSpectrum:
     element: str
     charge: int
@@ -20,17 +22,25 @@ _ROMAN_VALUES = {
     "D": 500,
     "M": 1000,
 }
+_ROMAN_SET = frozenset(_ROMAN_VALUES)
 
+# "\s" also matches U+00A0, so a single sub collapses NBSPs and runs of whitespace.
+_WS_RE = re.compile(r"\s+")
+_RE_CHARGE = re.compile(r"^([A-Za-z]{1,2})\s+(\d+)\+$")
+_RE_ROMAN = re.compile(r"^([A-Za-z]{1,2})\s+([IVXLCDM]+)$")
 
+
+@lru_cache(maxsize=256)
 def roman_to_int(s: str) -> int:
     """Convert a Roman numeral (up to reasonably large values) to an integer.
 
     Supports forms used by NIST ASD (e.g., XXI, XXXVII, LXVII, etc.).
     """
     s = s.strip().upper()
-    if not s or any(ch not in _ROMAN_VALUES for ch in s):
+    if not s or not set(s) <= _ROMAN_SET:
         raise ValueError(f"Unsupported roman numeral: {s!r}")
 
+    # Right-to-left subtractive scan, so non-canonical forms (IC, IIX) keep their historical values.
     total = 0
     prev = 0
     for ch in reversed(s):
@@ -43,19 +53,23 @@ def roman_to_int(s: str) -> int:
     return total
 
 
+@lru_cache(maxsize=4096)
 def parse_spectrum_label(label: str) -> ParsedSpectrum:
-    """Parse labels like 'Fe I', 'Fe II', 'Po LXVII', 'Ar 15+' into element + charge."""
-    s = " ".join(label.strip().split()).replace("\u00a0", " ")
+    """Parse labels like 'Fe I', 'Fe II', 'Po LXVII', 'Ar 15+' into element + charge.
+
+    Memoized: ingest runs see the same few hundred labels over and over, and ParsedSpectrum is frozen.
+    """
+    s = _WS_RE.sub(" ", label.strip())
 
     # Ar 15+
-    m = re.match(r"^([A-Za-z]{1,2})\s+(\d+)\+$", s)
+    m = _RE_CHARGE.match(s)
     if m:
         el = m.group(1).capitalize()
         ch = int(m.group(2))
         return ParsedSpectrum(element=el, charge=ch, asd_label=f"{el} {ch}+")
 
     # Fe II / Po LXVII
-    m = re.match(r"^([A-Za-z]{1,2})\s+([IVXLCDM]+)$", s)
+    m = _RE_ROMAN.match(s)
     if m:
         el = m.group(1).capitalize()
         stage = roman_to_int(m.group(2))
@@ -63,3 +77,13 @@ def parse_spectrum_label(label: str) -> ParsedSpectrum:
         return ParsedSpectrum(element=el, charge=charge, asd_label=f"{el} {m.group(2).upper()}")
 
     raise ValueError(f"Unrecognized spectrum label format: {label!r}")
+
+
+def parse_spectrum_labels(labels: Iterable[str]) -> list[ParsedSpectrum]:
+    """Parse many labels at once (e.g. a whole column); each distinct label is parsed only once.
+
+    Raises ValueError on the first unrecognized label, like parse_spectrum_label.
+    """
+    labels = list(labels)
+    parsed = {label: parse_spectrum_label(label) for label in dict.fromkeys(labels)}
+    return [parsed[label] for label in labels]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
 
 try:
@@ -19,47 +20,54 @@ class RepoPaths:
       - "repo": running from a repo checkout (pyproject.toml discovered upward from CWD)
       - "env":  user explicitly set SPECTRA_DB_DATA_DIR (data directory root)
       - "user": installed usage with no repo checkout; use per-user data directory
+
+    Derived directories are cached_property: computed once per instance (cached_property writes
+    to the instance __dict__ directly, so it works on a frozen dataclass).
     """
 
     repo_root: Path
     data_root: Path | None = None
     source: str = "repo"  # "repo" | "env" | "user"
 
-    @property
+    @cached_property
     def data_dir(self) -> Path:
         return self.data_root if self.data_root is not None else (self.repo_root / "data")
 
-    @property
+    @cached_property
     def raw_dir(self) -> Path:
         return self.data_dir / "raw"
 
-    @property
+    @cached_property
     def normalized_dir(self) -> Path:
         return self.data_dir / "normalized"
 
-    @property
+    @cached_property
     def normalized_molecular_dir(self) -> Path:
         return self.data_dir / "normalized_molecular"
 
-    @property
+    @cached_property
     def db_dir(self) -> Path:
         return self.data_dir / "db"
 
-    @property
+    @cached_property
     def default_duckdb_path(self) -> Path:
         return self.db_dir / "spectra.duckdb"
 
-    @property
+    @cached_property
     def default_molecular_duckdb_path(self) -> Path:
         return self.db_dir / "spectra_molecular.duckdb"
 
 
-def get_repo_root() -> Path:
-    here = Path.cwd().resolve()
-    for p in [here, *here.parents]:
+@lru_cache(maxsize=8)
+def _repo_root_for(cwd: Path) -> Path:
+    for p in [cwd, *cwd.parents]:
         if (p / "pyproject.toml").exists():
             return p
-    return here
+    return cwd
+
+
+def get_repo_root() -> Path:
+    return _repo_root_for(Path(os.getcwd()).resolve())
 
 
 def _default_user_data_dir() -> Path:
@@ -68,6 +76,7 @@ def _default_user_data_dir() -> Path:
     return (Path.home() / ".local" / "share" / "spectra-db").resolve()
 
 
+@lru_cache(maxsize=1)
 def get_user_paths() -> RepoPaths:
     """
     Always return per-user install paths, ignoring repo checkout detection.
@@ -77,6 +86,19 @@ def get_user_paths() -> RepoPaths:
     return RepoPaths(repo_root=data_root, data_root=data_root, source="user")
 
 
+@lru_cache(maxsize=8)
+def _resolve_paths(env: str | None, cwd: str) -> RepoPaths:
+    if env:
+        data_root = Path(env).expanduser().resolve()
+        return RepoPaths(repo_root=data_root, data_root=data_root, source="env")
+
+    repo_root = _repo_root_for(Path(cwd).resolve())
+    if (repo_root / "pyproject.toml").exists():
+        return RepoPaths(repo_root=repo_root, data_root=None, source="repo")
+
+    return get_user_paths()
+
+
 def get_paths() -> RepoPaths:
     """
     Return the active path policy:
@@ -84,14 +106,29 @@ def get_paths() -> RepoPaths:
     1) If SPECTRA_DB_DATA_DIR is set: use that as the *data directory* root (source="env")
     2) Else if repo root discoverable: use <repo_root>/data (source="repo")
     3) Else: use per-user data dir (source="user")
+
+    Results are memoized per (SPECTRA_DB_DATA_DIR, CWD); call clear_paths_cache() after
+    creating or removing a pyproject.toml mid-process. The cache key is the raw os.getcwd()
+    string, so a hit costs one getcwd() and no Path.resolve() walk.
     """
-    env = os.environ.get("SPECTRA_DB_DATA_DIR")
-    if env:
-        data_root = Path(env).expanduser().resolve()
-        return RepoPaths(repo_root=data_root, data_root=data_root, source="env")
+    return _resolve_paths(os.environ.get("SPECTRA_DB_DATA_DIR"), os.getcwd())
 
-    repo_root = get_repo_root()
-    if (repo_root / "pyproject.toml").exists():
-        return RepoPaths(repo_root=repo_root, data_root=None, source="repo")
 
+def get_install_paths(*, prefer_env: bool = True) -> RepoPaths:
+    """
+    Where to install packaged assets/sources:
+
+    - If SPECTRA_DB_DATA_DIR is set and prefer_env=True -> install there (user explicitly requested).
+    - Otherwise -> install into per-user data dir.
+    """
+    p = get_paths()
+    if prefer_env and p.source == "env":
+        return p
     return get_user_paths()
+
+
+def clear_paths_cache() -> None:
+    """Drop memoized repo-root / path-policy lookups (mainly for tests)."""
+    _repo_root_for.cache_clear()
+    _resolve_paths.cache_clear()
+    get_user_paths.cache_clear()
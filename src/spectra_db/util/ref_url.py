@@ -0,0 +1,37 @@
+# src/spectra_db/util/ref_url.py
+from __future__ import annotations
+
+import html as _html
+import re
+
+# One <a ...onclick="...popded('URL')...">LABEL</a> element. ASD double-quotes the onclick attribute
+# because popded() takes a single-quoted argument; the mirrored single-quoted form is accepted too.
+_POPDED_ANCHOR_PATTERN = r"""<a\b[^>]*?\bonclick\s*=\s*(?:"[^"]*?popded\('([^']+)'\)[^"]*"|'[^']*?popded\("([^"]+)"\)[^']*')[^>]*>(.*?)</a\s*>"""
+_POPDED_ANCHOR_RE = re.compile(_POPDED_ANCHOR_PATTERN, re.IGNORECASE | re.DOTALL)
+# Same scan over raw response bytes, so only the matched anchors are ever decoded.
+_POPDED_ANCHOR_RE_B = re.compile(_POPDED_ANCHOR_PATTERN.encode(), re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def extract_ref_urls(raw_html: str | bytes) -> dict[str, str]:
+    """
+    Build a mapping from visible reference code text -> popded URL.
+
+    A single regex pass over the page; works when a table cell holds several comma-separated <a> tags.
+    """
+    if isinstance(raw_html, bytes):
+        matches = ((u.decode("utf-8", errors="replace") for u in m) for m in _POPDED_ANCHOR_RE_B.findall(raw_html))
+    else:
+        matches = _POPDED_ANCHOR_RE.findall(raw_html)
+
+    out: dict[str, str] = {}
+    for url_dq, url_sq, label in matches:
+        txt = _html.unescape(_TAG_RE.sub("", label)).strip()
+        if not txt:
+            continue
+        # Keep last-seen; usually identical anyway.
+        out[txt] = _html.unescape(url_dq or url_sq).strip()
+    return out
+
+
+__all__ = ["extract_ref_urls"]
@@ -0,0 +1,40 @@
+"""Shared stand-ins for scraper result objects, and small file helpers, used across test modules."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class FakeFetchResult:
+    """Minimal `fetch_cached` result: just what the fetch_* runners read."""
+
+    status_code: int
+    content_path: Path
+    retry_after: str | None = None
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class FakeRes:
+    """Mirror of `FetchRunResult` as returned by the fetch_* `run()` functions."""
+
+    ok: bool
+    written: int
+    status_code: int
+    message: str
+    raw_path: str
+    retry_after_s: float | None = None
+    parsed_rows: int = 0
+    page_size: int = 0
+
+
+def read_ndjson(path: Path) -> list[dict]:
+    """Rows of an NDJSON file ([] if it does not exist), streamed from binary lines."""
+    if not path.exists():
+        return []
+    with path.open("rb") as f:
+        return [json.loads(line) for line in f if not line.isspace()]
@@ -3,6 +3,8 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 
 def pytest_sessionstart(session) -> None:
     """Ensure repo root and src/ are on sys.path so tests can import local modules."""
@@ -14,3 +16,13 @@ def pytest_sessionstart(session) -> None:
         ps = str(p)
         if ps not in sys.path:
             sys.path.insert(0, ps)
+
+
+@pytest.fixture(scope="session")
+def atomic_schema_template(tmp_path_factory) -> Path:
+    """Empty atomic-profile DuckDB built once per session; copy it instead of re-running the schema DDL."""
+    from spectra_db.db.duckdb_store import DuckDBStore
+
+    p = tmp_path_factory.mktemp("schema_template") / "atomic.duckdb"
+    DuckDBStore(p).init_schema()
+    return p
@@ -15,3 +15,39 @@ def test_parse_spectrum_label_large_roman(label: str, element: str, charge: int)
     ps = parse_spectrum_label(label)
     assert ps.element == element
     assert ps.charge == charge
+
+
+def test_parsed_spectrum_is_slotted_and_picklable() -> None:
+    import pickle
+
+    ps = parse_spectrum_label("Fe II")
+    assert not hasattr(ps, "__dict__")
+    assert pickle.loads(pickle.dumps(ps)) == ps
+
+
+def test_parse_spectrum_labels_matches_single_parser() -> None:
+    from spectra_db.util.asd_spectrum import parse_spectrum_labels
+
+    labels = ["Fe II", "Ar 15+", "Fe II", "Po LXVII"]
+    assert parse_spectrum_labels(labels) == [parse_spectrum_label(s) for s in labels]
+
+    with pytest.raises(ValueError):
+        parse_spectrum_labels(["Fe II", "not a label"])
+
+
+@pytest.mark.parametrize(
+    "numeral, value",
+    [
+        ("XXI", 21),
+        ("LXVII", 67),
+        ("XCIX", 99),
+        ("IC", 99),
+        ("IL", 49),
+        ("VX", 5),
+        ("IIX", 8),
+    ],
+)
+def test_roman_to_int_keeps_subtractive_semantics(numeral: str, value: int) -> None:
+    from spectra_db.util.asd_spectrum import roman_to_int
+
+    assert roman_to_int(numeral) == value
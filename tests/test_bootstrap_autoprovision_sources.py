@@ -1,32 +1,33 @@
 from __future__ import annotations
 
 import json
-import sys
 from pathlib import Path
 
 import pytest
 
 import spectra_db.cli as cli
 
+# DuckDB-heavy bootstrap tests share one xdist worker to limit memory pressure.
+pytestmark = pytest.mark.xdist_group(name="duckdb_bootstrap")
+
+
+def _write_ndjson(path: Path, rows: list[dict]) -> None:
+    # One serialize-and-join pass and a single write per file.
+    path.write_bytes("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode("utf-8"))
+
 
 def _write_atomic_minimal_ndjson(norm_dir: Path) -> None:
     norm_dir.mkdir(parents=True, exist_ok=True)
+    if (norm_dir / "species.ndjson").exists():
+        return  # already provisioned; keep this idempotent
 
     # Minimal rows required for bootstrap to load something meaningful.
-    (norm_dir / "species.ndjson").write_text(
-        json.dumps({"species_id": "ASD:H:+0", "formula": "H", "name": "H I", "tags": "atomic"}) + "\n",
-        encoding="utf-8",
-    )
-    (norm_dir / "isotopologues.ndjson").write_text(
-        json.dumps({"iso_id": "ASD:H:+0/main", "species_id": "ASD:H:+0"}) + "\n",
-        encoding="utf-8",
-    )
-    (norm_dir / "refs.ndjson").write_text(
-        json.dumps({"ref_id": "L1", "url": "https://example.com"}) + "\n",
-        encoding="utf-8",
-    )
-    (norm_dir / "states.ndjson").write_text(
-        json.dumps(
+    _write_ndjson(norm_dir / "species.ndjson", [{"species_id": "ASD:H:+0", "formula": "H", "name": "H I", "tags": "atomic"}])
+    _write_ndjson(norm_dir / "isotopologues.ndjson", [{"iso_id": "ASD:H:+0/main", "species_id": "ASD:H:+0"}])
+    _write_ndjson(norm_dir / "refs.ndjson", [{"ref_id": "L1", "url": "https://example.com"}])
+    _write_ndjson(
+        norm_dir / "states.ndjson",
+        [
             {
                 "state_id": "S1",
                 "iso_id": "ASD:H:+0/main",
@@ -38,12 +39,11 @@ def _write_atomic_minimal_ndjson(norm_dir: Path) -> None:
                 "energy_unit": "cm-1",
                 "ref_id": "L1",
             }
-        )
-        + "\n",
-        encoding="utf-8",
+        ],
     )
-    (norm_dir / "transitions.ndjson").write_text(
-        json.dumps(
+    _write_ndjson(
+        norm_dir / "transitions.ndjson",
+        [
             {
                 "transition_id": "T1",
                 "iso_id": "ASD:H:+0/main",
@@ -52,12 +52,10 @@ def _write_atomic_minimal_ndjson(norm_dir: Path) -> None:
                 "selection_rules": "E1",
                 "ref_id": "L1",
             }
-        )
-        + "\n",
-        encoding="utf-8",
+        ],
     )
     # parameters.ndjson may or may not be used in atomic; include empty file for safety
-    (norm_dir / "parameters.ndjson").write_text("", encoding="utf-8")
+    _write_ndjson(norm_dir / "parameters.ndjson", [])
 
 
 @pytest.mark.usefixtures("monkeypatch")
@@ -68,7 +66,10 @@ def test_cli_bootstrap_autoprovisions_sources(monkeypatch, tmp_path: Path) -> No
     # Monkeypatch sources provisioning to drop minimal NDJSON into the expected location.
     import spectra_db.sources as sources
 
+    calls: list[tuple[str, bool]] = []
+
     def _fake_ensure_sources_available(profile: str, force: bool = False):
+        calls.append((profile, force))
         norm_dir = (data_dir / "normalized") if profile == "atomic" else (data_dir / "normalized_molecular")
         _write_atomic_minimal_ndjson(norm_dir) if profile == "atomic" else norm_dir.mkdir(parents=True, exist_ok=True)
         return norm_dir
@@ -76,8 +77,9 @@ def test_cli_bootstrap_autoprovisions_sources(monkeypatch, tmp_path: Path) -> No
     monkeypatch.setattr(sources, "ensure_sources_available", _fake_ensure_sources_available)
 
     # Run bootstrap through CLI
-    monkeypatch.setattr(sys, "argv", ["spectra-db", "--profile", "atomic", "bootstrap", "--truncate-all"])
-    cli.main()
+    cli.main(["--profile", "atomic", "bootstrap", "--truncate-all"])
 
     db_path = data_dir / "db" / "spectra.duckdb"
     assert db_path.exists()
+    # Bootstrap provisions the profile's sources exactly once.
+    assert calls == [("atomic", False)]
@@ -1,41 +1,32 @@
+import io
 import json
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import spectra_db.scrapers.nist_asd.bulk_ingest as bi
+from tests._fakes import FakeRes
 
 
-@dataclass
-class FakeRes:
-    ok: bool
-    written: int
-    status_code: int
-    message: str
-    raw_path: str
-
-
-def _write_fake_response(tmp: Path, key: str, nrows: int, page_size: int) -> str:
-    """Write a fake .body/.meta.json that parse_lines_response can read."""
-    body = tmp / f"{key}.body"
-    meta = tmp / f"{key}.meta.json"
-
-    # Build a <pre> table with nrows data lines
-    header = (
-        "------------------------------------------------------------------------------------------------\n"
-        "| Observed Wavelength Vac (nm) | Unc. (nm) | Ritz Wavelength (nm) |\n"
-        "------------------------------------------------------------------------------------------------\n"
-    )
-    rows = []
-    for i in range(nrows):
-        rows.append(f"| {500 + i}.0 | 0.1 | {500 + i}.0 |\n")
-    footer = "------------------------------------------------------------------------------------------------\n"
-    body.write_bytes(("<pre>\n" + header + "".join(rows) + footer + "</pre>\n").encode("utf-8"))
-
-    meta.write_text(
-        json.dumps({"params": {"page_size": str(page_size)}}, indent=2),
-        encoding="utf-8",
+def _cfg(**overrides) -> bi.BulkConfig:
+    """A lines-only, unpaced, no-retry config over one 1 nm bin; tests override only what they vary."""
+    base: dict = dict(
+        mode="lines",
+        units_levels="cm-1",
+        line_unit="nm",
+        wavelength_type="vacuum",
+        wav_min=0.0,
+        wav_max=1.0,
+        initial_bin=1.0,
+        min_bin=0.5,
+        polite_sleep_s=0.0,
+        max_retries=0,
+        backoff_base_s=0.0,
+        force=False,
+        resume=False,
+        max_splits=100,
     )
-    return str(body)
+    return bi.BulkConfig(**(base | overrides))
 
 
 def test_adaptive_split_triggers(monkeypatch, tmp_path: Path) -> None:
@@ -43,36 +34,203 @@ def test_adaptive_split_triggers(monkeypatch, tmp_path: Path) -> None:
     # For the first call on a bin, it returns "full", forcing split until min_bin.
     calls = {"n": 0}
 
-    def fake_run_lines(*, spectrum, min_wav, max_wav, unit, wavelength_type, force):
+    def fake_run_lines(*, spectrum, min_wav, max_wav, unit, wavelength_type, force, throttle=None, on_status=None):
         calls["n"] += 1
-        key = f"{min_wav:.3f}_{max_wav:.3f}_{calls['n']}"
-        raw = _write_fake_response(tmp_path, key, nrows=2, page_size=2)  # full
-        return FakeRes(True, written=2, status_code=200, message="OK", raw_path=raw)
+        # full: parsed_rows == page_size
+        return FakeRes(True, written=2, status_code=200, message="OK", raw_path="x.body", parsed_rows=2, page_size=2)
 
     monkeypatch.setattr(bi, "run_lines", fake_run_lines)
 
-    cfg = bi.BulkConfig(
-        mode="lines",
-        units_levels="cm-1",
-        line_unit="nm",
-        wavelength_type="vacuum",
-        wav_min=0.0,
+    cfg = _cfg(
         wav_max=2.0,
         initial_bin=2.0,  # one bin initially
         min_bin=0.5,  # will split until width <= 0.5
-        polite_sleep_s=0.0,
-        max_retries=0,
-        backoff_base_s=0.0,
-        force=False,
-        resume=False,
-        max_splits=100,
     )
 
-    ckpt = tmp_path / "ckpt.jsonl"
+    # In-memory checkpoint stream: no per-bin open() of a file.
+    ckpt = io.StringIO()
     done_bins = set()
 
     ok, written, msg = bi.ingest_lines_adaptive("H I", cfg, ckpt, done_bins)
     assert ok is True
     # should have made multiple calls due to splits
     assert calls["n"] > 1
-    assert ckpt.exists()
+    records = [json.loads(line) for line in ckpt.getvalue().splitlines()]
+    assert len(records) == calls["n"]
+    assert all(r["kind"] == "lines" and r["ok"] is True for r in records)
+
+
+def test_lines_bins_prefetched_concurrently_then_read_from_cache(monkeypatch, tmp_path: Path) -> None:
+    prefetched: list[tuple[float, float]] = []
+    run_calls: list[tuple[float, float, bool]] = []
+
+    def fake_fetch_lines_raw(*, spectrum, min_wav, max_wav, unit, wavelength_type, force, throttle=None, on_status=None):
+        prefetched.append((min_wav, max_wav))
+
+    def fake_run_lines(*, spectrum, min_wav, max_wav, unit, wavelength_type, force, throttle=None, on_status=None):
+        run_calls.append((min_wav, max_wav, force))
+        # not full
+        return FakeRes(True, written=1, status_code=200, message="OK", raw_path="x.body", parsed_rows=1, page_size=10)
+
+    monkeypatch.setattr(bi, "fetch_lines_raw", fake_fetch_lines_raw)
+    monkeypatch.setattr(bi, "run_lines", fake_run_lines)
+
+    cfg = _cfg(wav_max=4.0, force=True, concurrency=3)
+
+    ok, written, _ = bi.ingest_lines_adaptive("H I", cfg, io.StringIO(), set())
+    assert ok is True and written == 4
+    assert sorted(prefetched) == [(0.0, 1.0), (1.0, 2.0), (2.0, 3.0), (3.0, 4.0)]
+    # Bins are still processed in order, and a prefetched bin is not force-refetched by run_lines.
+    assert run_calls == [(0.0, 1.0, False), (1.0, 2.0, False), (2.0, 3.0, False), (3.0, 4.0, False)]
+
+
+def test_prefetch_workers_share_the_pacer_budget(monkeypatch, tmp_path: Path) -> None:
+    clock = {"t": 0.0}
+    grants: list[float] = []
+    lock = threading.Lock()
+
+    def fake_sleep(s: float) -> None:
+        clock["t"] += s
+
+    monkeypatch.setattr(bi.time, "monotonic", lambda: clock["t"])
+    monkeypatch.setattr(bi.time, "sleep", fake_sleep)
+
+    def fake_fetch_lines_raw(*, spectrum, min_wav, max_wav, unit, wavelength_type, force, throttle=None, on_status=None):
+        # Serialised so each grant is read at the fake time it was made.
+        with lock:
+            if throttle is not None:
+                throttle()
+            grants.append(clock["t"])
+
+    def fake_run_lines(*, spectrum, min_wav, max_wav, unit, wavelength_type, force, throttle=None, on_status=None):
+        assert throttle is not None
+        return FakeRes(True, written=1, status_code=200, message="OK", raw_path="x.body", parsed_rows=1, page_size=10)
+
+    monkeypatch.setattr(bi, "fetch_lines_raw", fake_fetch_lines_raw)
+    monkeypatch.setattr(bi, "run_lines", fake_run_lines)
+
+    cfg = _cfg(wav_max=4.0, polite_sleep_s=0.5, concurrency=4)
+
+    ok, written, _ = bi.ingest_lines_adaptive("H I", cfg, io.StringIO(), set())
+    assert ok is True and written == 4
+    # Four workers, one budget: requests go out one per 1/rate seconds, not all at once.
+    grants.sort()
+    assert len(grants) == 4
+    assert all(b - a >= 0.5 - 1e-9 for a, b in zip(grants, grants[1:], strict=False))
+
+
+def test_prefetch_responses_feed_the_pacer(monkeypatch, tmp_path: Path) -> None:
+    def fake_fetch_lines_raw(*, spectrum, min_wav, max_wav, unit, wavelength_type, force, throttle=None, on_status=None):
+        # Stands in for fetch_cached: the network response is reported where it was received.
+        on_status(429)
+
+    def fake_run_lines(*, spectrum, min_wav, max_wav, unit, wavelength_type, force, throttle=None, on_status=None):
+        # Cache hit for a prefetched bin: no request, so no feedback.
+        return FakeRes(True, written=1, status_code=200, message="OK", raw_path="x.body", parsed_rows=1, page_size=10)
+
+    monkeypatch.setattr(bi, "fetch_lines_raw", fake_fetch_lines_raw)
+    monkeypatch.setattr(bi, "run_lines", fake_run_lines)
+
+    cfg = _cfg(wav_max=3.0, polite_sleep_s=0.5, concurrency=3)
+    pacer = bi.AdaptivePacer(2.0)
+
+    ok, _, _ = bi.ingest_lines_adaptive("H I", cfg, io.StringIO(), set(), pacer=pacer)
+    assert ok is True
+    # Each prefetched 429 halved the rate, even though the loop itself only saw cache hits.
+    assert pacer.rate == 0.25
+
+
+def test_checkpoint_loaders_keep_only_successful_records(tmp_path: Path) -> None:
+    ckpt = tmp_path / "ckpt.jsonl"
+    ckpt.touch()
+    assert bi._load_lines_checkpoint(ckpt) == set()
+
+    bin_rec = {"spectrum": "H I", "lo": 0.0, "hi": 1.0, "unit": "nm", "wavelength_type": "vacuum"}
+    bi._append_checkpoint(ckpt, {"kind": "lines", "ok": True, **bin_rec})
+    bi._append_checkpoint(ckpt, {"kind": "lines", "ok": False, **bin_rec, "lo": 1.0, "hi": 2.0})
+    bi._append_checkpoint(ckpt, {"kind": "levels", "ok": True, "spectrum": "Fe II"})
+    bi._append_checkpoint(ckpt, {"kind": "levels", "ok": False, "spectrum": "He I"})
+    with ckpt.open("a", encoding="utf-8") as f:
+        # A record in the older spaced layout still counts.
+        f.write('{"kind": "levels", "ok": true, "spectrum": "Ne I"}\n')
+        f.write('{"kind": "lines", "ok": true, truncated by a crash\n')
+
+    assert b'{"kind":"lines","ok":true,' in ckpt.read_bytes()
+    assert bi._load_lines_checkpoint(ckpt) == {bi._bin_hash("H I", 0.0, 1.0, "nm", "vacuum")}
+    assert bi._load_levels_checkpoint(ckpt) == {"Fe II", "Ne I"}
+
+
+def test_checkpoint_writer_flushes_every_n_records(tmp_path: Path) -> None:
+    ckpt = tmp_path / "nested" / "ckpt.jsonl"
+    with bi.CheckpointWriter(ckpt, flush_every=2) as w:
+        bi._append_checkpoint(w, {"kind": "levels", "ok": True, "spectrum": "Fe II"})
+        assert ckpt.read_text(encoding="utf-8") == ""  # still buffered
+        bi._append_checkpoint(w, {"kind": "levels", "ok": True, "spectrum": "He I"})
+        assert bi._load_levels_checkpoint(ckpt) == {"Fe II", "He I"}
+        bi._append_checkpoint(w, {"kind": "levels", "ok": True, "spectrum": "H I"})
+    # Closing flushes the tail.
+    assert bi._load_levels_checkpoint(ckpt) == {"Fe II", "He I", "H I"}
+
+
+def test_split_bin_keys_round_trip_through_checkpoint(tmp_path: Path) -> None:
+    cfg = _cfg(wav_min=199000.0, wav_max=200000.0, initial_bin=1000.0, resume=True)
+    # A deeply split edge with more than 12 significant figures.
+    lo = 199000.0
+    hi = lo + 1000.0 / 2**11
+    rec = {"spectrum": "H I", "lo": bi._canon_edge(lo), "hi": bi._canon_edge(hi), "unit": "nm", "wavelength_type": "vacuum"}
+
+    ckpt = tmp_path / "ckpt.jsonl"
+    bi._append_checkpoint(ckpt, {"kind": "lines", "ok": True, **rec})
+    done = bi._load_lines_checkpoint(ckpt)
+    assert done == {bi._bin_key("H I", lo, hi, cfg)}
+    assert all(type(k) is int and k.bit_length() <= 64 for k in done)
+    # Any field that differs gives a different key.
+    assert bi._bin_key("H I", lo, hi, cfg) != bi._bin_key("H II", lo, hi, cfg)
+    assert bi._bin_key("H I", lo, hi, cfg) != bi._bin_key("H I", hi, lo, cfg)
+
+
+def test_make_bins_matches_scalar_edges() -> None:
+    bins = bi._make_bins(0.1, 2.35, 0.7)
+    assert bins == [(0.1 + i * 0.7, min(2.35, 0.1 + i * 0.7 + 0.7)) for i in range(4)]
+    assert all(type(x) is float for pair in bins for x in pair)
+    assert bi._make_bins(5.0, 5.0, 1.0) == []
+
+
+def test_both_mode_runs_levels_alongside_lines(monkeypatch) -> None:
+    levels_started = threading.Event()
+    threads: dict[str, str] = {}
+
+    def fake_levels(spec, cfg, ckpt, *, pacer=None):
+        threads["levels"] = threading.current_thread().name
+        levels_started.set()
+        return False, 0, "HTTP 500"
+
+    def fake_lines(spec, cfg, ckpt, done_bins, *, pacer=None):
+        # Lines do not wait for levels to finish (or even to succeed).
+        assert levels_started.wait(5)
+        threads["lines"] = threading.current_thread().name
+        return True, 3, "OK"
+
+    monkeypatch.setattr(bi, "ingest_levels", fake_levels)
+    monkeypatch.setattr(bi, "ingest_lines_adaptive", fake_lines)
+    cfg = _cfg(mode="both", resume=True, max_splits=1)
+    done_levels: set[str] = set()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        ok = bi._ingest_spectrum("H I", cfg, io.StringIO(), done_levels, set(), levels_pool=pool)
+
+    assert ok is False  # the levels failure still fails the spectrum
+    assert done_levels == set()
+    assert threads["levels"] != threads["lines"]
+
+
+def test_run_spectra_fans_out_across_workers(monkeypatch, tmp_path: Path) -> None:
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_lines(spec, cfg, ckpt, done_bins, *, pacer=None):
+        barrier.wait()  # only returns once three spectra are in flight together
+        return spec != "bad", 1, "OK"
+
+    monkeypatch.setattr(bi, "ingest_lines_adaptive", fake_lines)
+    cfg = _cfg(max_splits=1)
+    with bi.CheckpointWriter(tmp_path / "ckpt.jsonl") as ckpt:
+        assert bi._run_spectra(["H I", "bad", "Fe II"], cfg, ckpt, set(), set(), workers=3) == (2, 1)
@@ -1,35 +1,19 @@
 from __future__ import annotations
 
 import json
-import sys
+import shutil
 from pathlib import Path
 
+import pytest
+
 import spectra_db.cli as cli
 from spectra_db.db.duckdb_store import DuckDBStore
 from spectra_db.query.api import QueryAPI
 
 
-def _install_minimal_fixture_db(tmp_path: Path) -> QueryAPI:
-    db_path = tmp_path / "t.duckdb"
+def _install_minimal_fixture_db(db_path: Path) -> None:
+    """Populate an already-initialized (atomic schema) DB with one row per table."""
     store = DuckDBStore(db_path)
-    store.init_schema()
-
-    con = store.connect()
-    con.execute("INSERT INTO refs(ref_id, citation, doi, url, notes) VALUES ('L1','c',NULL,'https://example.com/ref','n')")
-    con.execute("INSERT INTO species(species_id, formula, name, charge, multiplicity, inchi_key, tags, notes) VALUES ('ASD:H:+0','H','H I',0,NULL,NULL,'atomic',NULL)")
-    con.execute(
-        "INSERT INTO isotopologues(iso_id, species_id, label, composition_json, nuclear_spins_json, mass_amu, abundance, notes) VALUES ('ASD:H:+0/main','ASD:H:+0',NULL,NULL,NULL,NULL,NULL,NULL)"
-    )
-
-    con.execute(
-        "INSERT INTO states(state_id, iso_id, state_type, electronic_label, vibrational_json, rotational_json, parity,"
-        "configuration, term, j_value, f_value, g_value, lande_g, leading_percentages, extra_json,"
-        "energy_value, energy_unit, energy_uncertainty, ref_id, notes) VALUES "
-        "('S1','ASD:H:+0/main','atomic','2p 2P° J=1/2',NULL,NULL,NULL,"
-        "'2p','2P°',0.5,NULL,2.0,1.002,NULL,?,"
-        "82258.919,'cm-1',0.001,'L1',NULL)",
-        [json.dumps({"ref_urls": ["https://example.com/ref", "https://example.com/ref2"]})],
-    )
 
     payload = {
         "observed_wavelength": 656.28,
@@ -44,43 +28,94 @@ def _install_minimal_fixture_db(tmp_path: Path) -> QueryAPI:
         "tp_ref_urls": ["https://example.com/tp"],
         "line_ref_urls": ["https://example.com/line"],
     }
-    con.execute(
-        "INSERT INTO transitions(transition_id, iso_id, upper_state_id, lower_state_id, quantity_value, quantity_unit,"
-        "quantity_uncertainty, intensity_json, extra_json, selection_rules, ref_id, source, notes) VALUES "
-        "(?,?,?,?,?,?,?,?,?,?,?,?,?)",
-        [
-            "T1",
-            "ASD:H:+0/main",
-            None,
-            None,
-            656.28,
-            "nm",
-            0.001,
-            json.dumps(payload),
-            None,
-            "E1",
-            "L1",
-            "NIST_ASD_LINES",
-            None,
-        ],
-    )
-
-    return QueryAPI(con=con)
+
+    # One parametrized statement per table, all inside a single transaction.
+    rows_by_insert: list[tuple[str, list[tuple]]] = [
+        (
+            "INSERT INTO refs(ref_id, citation, doi, url, notes) VALUES (?,?,?,?,?)",
+            [("L1", "c", None, "https://example.com/ref", "n")],
+        ),
+        (
+            "INSERT INTO species(species_id, formula, name, charge, multiplicity, inchi_key, tags, notes) VALUES (?,?,?,?,?,?,?,?)",
+            [("ASD:H:+0", "H", "H I", 0, None, None, "atomic", None)],
+        ),
+        (
+            "INSERT INTO isotopologues(iso_id, species_id, label, composition_json, nuclear_spins_json, mass_amu, abundance, notes) VALUES (?,?,?,?,?,?,?,?)",
+            [("ASD:H:+0/main", "ASD:H:+0", None, None, None, None, None, None)],
+        ),
+        (
+            "INSERT INTO states(state_id, iso_id, state_type, electronic_label, vibrational_json, rotational_json, parity,"
+            "configuration, term, j_value, f_value, g_value, lande_g, leading_percentages, extra_json,"
+            "energy_value, energy_unit, energy_uncertainty, ref_id, notes) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            [
+                (
+                    "S1",
+                    "ASD:H:+0/main",
+                    "atomic",
+                    "2p 2P° J=1/2",
+                    None,
+                    None,
+                    None,
+                    "2p",
+                    "2P°",
+                    0.5,
+                    None,
+                    2.0,
+                    1.002,
+                    None,
+                    json.dumps({"ref_urls": ["https://example.com/ref", "https://example.com/ref2"]}),
+                    82258.919,
+                    "cm-1",
+                    0.001,
+                    "L1",
+                    None,
+                )
+            ],
+        ),
+        (
+            "INSERT INTO transitions(transition_id, iso_id, upper_state_id, lower_state_id, quantity_value, quantity_unit,"
+            "quantity_uncertainty, intensity_json, extra_json, selection_rules, ref_id, source, notes) VALUES "
+            "(?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            [("T1", "ASD:H:+0/main", None, None, 656.28, "nm", 0.001, json.dumps(payload), None, "E1", "L1", "NIST_ASD_LINES", None)],
+        ),
+    ]
+
+    con = store.connect()
+    con.execute("BEGIN")
+    for sql, rows in rows_by_insert:
+        con.executemany(sql, rows)
+    con.execute("COMMIT")
+    con.close()
+
+
+@pytest.fixture(scope="module")
+def fixture_db_path(tmp_path_factory, atomic_schema_template: Path) -> Path:
+    """Build the fixture DB once per module; tests only read from it."""
+    db_path = tmp_path_factory.mktemp("query_flags") / "t.duckdb"
+    shutil.copyfile(atomic_schema_template, db_path)
+    _install_minimal_fixture_db(db_path)
+    return db_path
+
+
+@pytest.fixture
+def api(fixture_db_path: Path):
+    a = QueryAPI(con=DuckDBStore(fixture_db_path).connect())
+    yield a
+    a.con.close()
 
 
 def _parse_header_cols(line: str) -> list[str]:
-    # Robust against substring collisions ("g" in "Energy")
-    parts = [p.strip() for p in line.split("|")]
+    # Robust against substring collisions ("g" in "Energy"); slice by pipe positions, as parse_lines does.
+    positions = [i for i, c in enumerate(line) if c == "|"]
+    parts = [line[a + 1 : b].strip() for a, b in zip([-1, *positions], [*positions, len(line)], strict=True)]
     return [p for p in parts if p]
 
 
-def test_cli_levels_flags(monkeypatch, tmp_path: Path, capsys) -> None:
-    api = _install_minimal_fixture_db(tmp_path)
+def test_cli_levels_flags(monkeypatch, api: QueryAPI, capsys) -> None:
     monkeypatch.setattr(cli, "open_default_api", lambda *args, **kwargs: api)
 
     # Default: references are hidden unless explicitly requested
-    monkeypatch.setattr(sys, "argv", ["query.py", "levels", "H I", "--limit", "5"])
-    cli.main()
+    cli.main(["levels", "H I", "--limit", "5"])
     out = capsys.readouterr().out
     assert "Ref URL" not in out
     assert "Energy" in out
@@ -88,14 +123,12 @@ def test_cli_levels_flags(monkeypatch, tmp_path: Path, capsys) -> None:
     assert "g" in out
 
     # Explicit opt-in: references shown
-    monkeypatch.setattr(sys, "argv", ["query.py", "levels", "H I", "--limit", "5", "--references"])
-    cli.main()
+    cli.main(["levels", "H I", "--limit", "5", "--references"])
     out_refs = capsys.readouterr().out
     assert "Ref URL" in out_refs
 
     # --columns overrides all default hiding behavior
-    monkeypatch.setattr(sys, "argv", ["query.py", "levels", "H I", "--columns", "Energy,J,g,RefURL"])
-    cli.main()
+    cli.main(["levels", "H I", "--columns", "Energy,J,g,RefURL"])
     out2 = capsys.readouterr().out
 
     header_line = next(line for line in out2.splitlines() if "Energy" in line and "Ref URL" in line)
@@ -103,28 +136,24 @@ def test_cli_levels_flags(monkeypatch, tmp_path: Path, capsys) -> None:
     assert cols[:4] == ["Energy", "J", "g", "Ref URL"]
 
 
-def test_cli_lines_flags(monkeypatch, tmp_path: Path, capsys) -> None:
-    api = _install_minimal_fixture_db(tmp_path)
+def test_cli_lines_flags(monkeypatch, api: QueryAPI, capsys) -> None:
     monkeypatch.setattr(cli, "open_default_api", lambda *args, **kwargs: api)
 
     # Default: references are hidden unless explicitly requested
-    monkeypatch.setattr(sys, "argv", ["query.py", "lines", "H I", "--limit", "5"])
-    cli.main()
+    cli.main(["lines", "H I", "--limit", "5"])
     out = capsys.readouterr().out
     assert "TP Ref URL" not in out
     assert "Line Ref URL" not in out
     assert "Observed λ" in out
 
     # Explicit opt-in: references shown
-    monkeypatch.setattr(sys, "argv", ["query.py", "lines", "H I", "--limit", "5", "--references"])
-    cli.main()
+    cli.main(["lines", "H I", "--limit", "5", "--references"])
     out_refs = capsys.readouterr().out
     assert "TP Ref URL" in out_refs
     assert "Line Ref URL" in out_refs
 
     # --columns overrides all default hiding behavior
-    monkeypatch.setattr(sys, "argv", ["query.py", "lines", "H I", "--columns", "Obs,Lower,Upper,Type,LineRefURL"])
-    cli.main()
+    cli.main(["lines", "H I", "--columns", "Obs,Lower,Upper,Type,LineRefURL"])
     out2 = capsys.readouterr().out
     header_line = next(line for line in out2.splitlines() if "Observed" in line and "Line Ref URL" in line)
     assert header_line.index("Observed") < header_line.index("Lower") < header_line.index("Upper") < header_line.index("Type") < header_line.index("Line Ref URL")
@@ -2,17 +2,23 @@
 from __future__ import annotations
 
 import json
+import shutil
 from pathlib import Path
 
+import pytest
+
 from spectra_db.db.duckdb_store import DuckDBStore
 
+# DuckDB-heavy bootstrap tests share one xdist worker to limit memory pressure.
+pytestmark = pytest.mark.xdist_group(name="duckdb_bootstrap")
+
 
 def _write_ndjson(path: Path, rows: list[dict]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in rows) + "\n", encoding="utf-8")
+    path.write_bytes("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode("utf-8"))
 
 
-def test_bootstrap_truncate_all_is_idempotent_and_aligns_columns(tmp_path: Path) -> None:
+def test_bootstrap_truncate_all_is_idempotent_and_aligns_columns(tmp_path: Path, atomic_schema_template: Path) -> None:
     normalized = tmp_path / "normalized"
 
     # Include extra columns in NDJSON to ensure loader drops unknown fields (alignment behavior).
@@ -96,8 +102,8 @@ def test_bootstrap_truncate_all_is_idempotent_and_aligns_columns(tmp_path: Path)
     )
 
     db_path = tmp_path / "spectra.duckdb"
+    shutil.copyfile(atomic_schema_template, db_path)
     store = DuckDBStore(db_path)
-    store.init_schema()
 
     # First bootstrap
     counts1 = store.bootstrap_from_normalized_dir(normalized, truncate_all=True)
@@ -112,13 +118,10 @@ def test_bootstrap_truncate_all_is_idempotent_and_aligns_columns(tmp_path: Path)
     counts2 = store.bootstrap_from_normalized_dir(normalized, truncate_all=True)
     assert counts2 == counts1
 
-    with store.connect() as con:
-        assert con.execute("SELECT COUNT(*) FROM refs").fetchone()[0] == 1
-        assert con.execute("SELECT COUNT(*) FROM species").fetchone()[0] == 1
-        assert con.execute("SELECT COUNT(*) FROM isotopologues").fetchone()[0] == 1
-        assert con.execute("SELECT COUNT(*) FROM states").fetchone()[0] == 1
-        assert con.execute("SELECT COUNT(*) FROM transitions").fetchone()[0] == 1
-        assert con.execute("SELECT COUNT(*) FROM spectroscopic_parameters").fetchone()[0] == 1
+    tables = ("refs", "species", "isotopologues", "states", "transitions", "spectroscopic_parameters")
+    with store.connect(read_only=True) as con:
+        counts_sql = "SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {t})" for t in tables)
+        assert con.execute(counts_sql).fetchone() == (1,) * len(tables)
 
 
 def test_bootstrap_molecular_refs_allows_missing_ref_type_via_default(tmp_path: Path) -> None:
@@ -188,3 +191,23 @@ def test_bootstrap_molecular_refs_allows_missing_ref_type_via_default(tmp_path:
         # The default should have filled ref_type
         ref_type = con.execute("SELECT ref_type FROM refs WHERE ref_id = ?", ["WB:C630080:Dia53"]).fetchone()[0]
         assert ref_type == "unknown"
+
+
+def test_bootstrap_failed_load_rolls_back_earlier_tables(tmp_path: Path, atomic_schema_template: Path) -> None:
+    normalized = tmp_path / "normalized"
+    _write_ndjson(
+        normalized / "species.ndjson",
+        [{"species_id": "ASD:H:+0", "formula": "H", "name": "H I", "charge": 0, "multiplicity": None, "inchi_key": None, "tags": "atomic", "notes": None}],
+    )
+    # No column in common with the transitions table, so this load raises after species was inserted.
+    _write_ndjson(normalized / "transitions.ndjson", [{"not_a_column": 1}])
+
+    db_path = tmp_path / "spectra.duckdb"
+    shutil.copyfile(atomic_schema_template, db_path)
+    store = DuckDBStore(db_path)
+
+    with pytest.raises(ValueError, match="No matching columns"):
+        store.bootstrap_from_normalized_dir(normalized)
+
+    with store.connect(read_only=True) as con:
+        assert con.execute("SELECT COUNT(*) FROM species").fetchone() == (0,)
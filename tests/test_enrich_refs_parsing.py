@@ -1,4 +1,11 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from spectra_db.scrapers.common.ndjson import file_stamp
+from spectra_db.scrapers.nist_asd import enrich_refs
 from spectra_db.scrapers.nist_asd.enrich_refs import _extract_citation_and_doi  # type: ignore
+from tests._fakes import FakeFetchResult
 
 
 def test_extract_citation_and_doi() -> None:
@@ -11,3 +18,119 @@ def test_extract_citation_and_doi() -> None:
     citation, doi = _extract_citation_and_doi(html)
     assert citation is not None and "Journal of Testing" in citation
     assert doi == "10.1234/ABC.DEF.5678"
+
+
+def test_extract_citation_and_doi_from_raw_bytes() -> None:
+    html = b"<html><body><p>A. Author (2001). J. Test 1, 2.</p><p>doi 10&#46;5555/xyz.1</p></body></html>"
+    citation, doi = _extract_citation_and_doi(html)
+    assert citation is not None and "J. Test" in citation
+    # Only findable after entity decoding, i.e. in the parsed text.
+    assert doi == "10.5555/xyz.1"
+
+
+def test_extract_citation_skips_scripts_comments_and_nav_lines() -> None:
+    html = b"""<html><head><script>var x = 1;</script><style>p {}</style></head><body>
+    <!-- hidden -->Search the database<br>Back
+    <p>B. Writer, <i>Phys. Rev.</i> 9, 1 (1970)</p>
+    </body></html>"""
+    citation, doi = _extract_citation_and_doi(html)
+    assert citation == "B. Writer, Phys. Rev. 9, 1 (1970)"
+    assert doi is None
+
+
+def test_extract_citation_and_doi_from_bodies_without_elements() -> None:
+    for body in (b"", b"  \n", b"<!-- only a comment -->", b"<?xml version='1.0'?>"):
+        assert _extract_citation_and_doi(body) == (None, None)
+
+
+def test_extract_doi_prefers_visible_text_over_links_and_scripts() -> None:
+    html = b"""<html><head><script>var d = "10.8888/from.script";</script></head><body>
+    <a href="https://doi.org/10.9999/nav.link">Publisher</a>
+    <p>C. Author (2010). J. Real 3, 4. doi:10.1111/real.1</p>
+    </body></html>"""
+    citation, doi = _extract_citation_and_doi(html)
+    assert doi == "10.1111/real.1"
+    assert citation is not None and "J. Real" in citation
+
+
+def test_enrich_refs_file_streams_and_resumes_partial_output(monkeypatch, tmp_path: Path) -> None:
+    refs = tmp_path / "refs.ndjson"
+    rows = [
+        {"ref_id": "L:L1", "citation": None},
+        {"ref_id": "L:L2", "citation": None},
+        {"ref_id": "X", "citation": None},  # no reconstructable URL: copied through untouched
+        {"ref_id": "L:L3", "citation": "already"},
+    ]
+    refs.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    # A previous run finished the first record, then died mid-write of the second.
+    tmp = tmp_path / "refs.enriched.tmp"
+    tmp.write_text(json.dumps({"ref_id": "L:L1", "citation": "from earlier run"}) + '\n{"ref_id": "L:', encoding="utf-8")
+    stamp = tmp_path / "refs.enriched.src.json"
+    stamp.write_text(json.dumps(file_stamp(refs)), encoding="utf-8")
+
+    fetched: list[str] = []
+
+    def fake_enrich_one(url, cache_dir, max_retries, backoff_base, force, *, pacer=None, parse_pool=None):
+        fetched.append(url)
+        return enrich_refs.EnrichResult(True, 200, "OK", citation="Cited", doi="10.1/x")
+
+    monkeypatch.setattr(enrich_refs, "enrich_one", fake_enrich_one)
+    total, updated = enrich_refs.enrich_refs_file(refs, tmp_path / "cache", workers=2)
+
+    assert (total, updated) == (4, 1)
+    assert len(fetched) == 1 and "db_id=2" in fetched[0]
+    out = [json.loads(line) for line in refs.read_text(encoding="utf-8").splitlines()]
+    assert [r["citation"] for r in out] == ["from earlier run", "Cited", None, "already"]
+    assert out[1]["doi"] == "10.1/x"
+    assert not tmp.exists() and not stamp.exists()
+
+
+def test_enrich_refs_file_discards_partial_output_from_another_source(monkeypatch, tmp_path: Path) -> None:
+    refs = tmp_path / "refs.ndjson"
+    refs.write_text(json.dumps({"ref_id": "L:L1", "citation": None}) + "\n", encoding="utf-8")
+    # Left over from a run over a different refs.ndjson: no matching source stamp.
+    tmp = tmp_path / "refs.enriched.tmp"
+    tmp.write_text(json.dumps({"ref_id": "OTHER", "citation": "stale"}) + "\n", encoding="utf-8")
+    (tmp_path / "refs.enriched.src.json").write_text(json.dumps({"size": 1, "mtime_ns": 1}), encoding="utf-8")
+
+    def fake_enrich_one(url, cache_dir, max_retries, backoff_base, force, *, pacer=None, parse_pool=None):
+        return enrich_refs.EnrichResult(True, 200, "OK", citation="Cited", doi=None)
+
+    monkeypatch.setattr(enrich_refs, "enrich_one", fake_enrich_one)
+    total, updated = enrich_refs.enrich_refs_file(refs, tmp_path / "cache", workers=1)
+
+    assert (total, updated) == (1, 1)
+    out = [json.loads(line) for line in refs.read_text(encoding="utf-8").splitlines()]
+    assert [(r["ref_id"], r["citation"]) for r in out] == [("L:L1", "Cited")]
+
+
+def test_enrich_one_parses_in_process_pool(monkeypatch, tmp_path: Path) -> None:
+    body = tmp_path / "ref.body"
+    body.write_bytes(b"<html><body><p>C. Person (2010). J. Spec. 3, 4. doi:10.4242/q.7</p></body></html>")
+    monkeypatch.setattr(enrich_refs, "fetch_cached", lambda **kw: FakeFetchResult(status_code=200, content_path=body))
+
+    with ProcessPoolExecutor(max_workers=1) as parse_pool:
+        res = enrich_refs.enrich_one("https://example.invalid/ref", tmp_path, 0, 0.0, False, parse_pool=parse_pool)
+
+    assert res.ok is True
+    assert res.doi == "10.4242/q.7"
+    assert res.citation is not None and "J. Spec." in res.citation
+
+
+def test_main_maps_deprecated_polite_sleep_to_rate(monkeypatch, tmp_path: Path, capsys) -> None:
+    monkeypatch.setenv("SPECTRA_DB_DATA_DIR", str(tmp_path))
+    refs = enrich_refs.get_paths().normalized_dir / "refs.ndjson"
+    refs.parent.mkdir(parents=True, exist_ok=True)
+    refs.write_text("", encoding="utf-8")
+    seen: dict[str, float] = {}
+
+    def fake_enrich_refs_file(refs_path, cache_dir, **kw):
+        seen["rate"] = kw["rate_per_s"]
+        return 0, 0
+
+    monkeypatch.setattr(enrich_refs, "enrich_refs_file", fake_enrich_refs_file)
+    monkeypatch.setattr("sys.argv", ["enrich_refs", "--polite-sleep", "0.5"])
+    enrich_refs.main()
+
+    assert seen["rate"] == 2.0
+    assert "--polite-sleep is deprecated" in capsys.readouterr().out
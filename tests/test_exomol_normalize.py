@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import bz2
+import json
+import math
+import types
+from pathlib import Path
+
+from spectra_db.scrapers.common.ndjson import json_dumps_compact, json_loads, ndjson_writer
+from spectra_db.scrapers.exomol import normalize_exomol
+from spectra_db.util.paths import RepoPaths
+from tests._fakes import read_ndjson
+
+
+def test_exomol_run_batches_states_and_transitions(monkeypatch, tmp_path: Path) -> None:
+    paths = RepoPaths(repo_root=tmp_path / "repo")
+    monkeypatch.setattr(normalize_exomol, "get_paths", lambda: paths)
+    # Tiny batches so the flush-on-full and flush-at-end paths both run.
+    monkeypatch.setattr(normalize_exomol, "_BATCH_ROWS", 2)
+
+    states = tmp_path / "12C-16O__Li2015.states.bz2"
+    states.write_bytes(bz2.compress(b"# i E gtot J\n1 0.000000 1 0 + X\n2 3.845033 3 1 - X\n3 11.535050 5 2 + X\n"))
+    trans = tmp_path / "12C-16O__Li2015.trans"
+    # Last line has no nu and an unknown upper state, so it cannot be derived and is skipped.
+    trans.write_text("2 1 7.5e-08 3.845033\n3 2 7.2e-07 7.690017\n3 1 1.0e-09\n9 1 1.0e-09\n", encoding="utf-8")
+
+    rr = normalize_exomol.run(
+        formula="CO",
+        isotopologue_label="12C-16O",
+        states_path=states,
+        trans_paths=[trans],
+        ref_id="EXOMOL:CO:Li2015",
+        max_transitions=None,
+    )
+    assert rr.ok is True
+    assert rr.states_written == 3
+    assert rr.transitions_written == 3
+
+    state_rows = read_ndjson(paths.normalized_dir / "states.ndjson")
+    assert [r["energy_value"] for r in state_rows] == [0.0, 3.845033, 11.53505]
+    assert json.loads(state_rows[2]["vibrational_json"])["exomol"]["extra_cols"] == ["+", "X"]
+
+    trans_rows = read_ndjson(paths.normalized_dir / "transitions.ndjson")
+    assert [r["quantity_value"] for r in trans_rows] == [3.845033, 7.690017, 11.53505]
+    assert trans_rows[0]["upper_state_id"] == state_rows[1]["state_id"]
+    assert trans_rows[0]["lower_state_id"] == state_rows[0]["state_id"]
+    # The third line carries no nu: it is derived from the state energies, and flagged as such.
+    assert [json.loads(r["extra_json"])["nu_derived"] for r in trans_rows] == [False, False, True]
+
+    # Rows are emitted from templates; they must be byte-identical to json.dumps of the parsed record.
+    for name in ("states.ndjson", "transitions.ndjson"):
+        for line in (paths.normalized_dir / name).read_text(encoding="utf-8").splitlines():
+            assert line == json.dumps(json.loads(line), ensure_ascii=False)
+
+    # max_transitions stops early but still flushes what it buffered.
+    rr2 = normalize_exomol.run(
+        formula="CO",
+        isotopologue_label="12C-16O",
+        states_path=states,
+        trans_paths=[trans],
+        ref_id="EXOMOL:CO:Li2015",
+        max_transitions=1,
+    )
+    assert rr2.transitions_written == 1
+    assert len(read_ndjson(paths.normalized_dir / "transitions.ndjson")) == 4
+
+
+def test_exomol_ragged_states_and_wide_trans_rows_keep_source_lines(monkeypatch, tmp_path: Path) -> None:
+    paths = RepoPaths(repo_root=tmp_path / "repo")
+    monkeypatch.setattr(normalize_exomol, "get_paths", lambda: paths)
+
+    states = tmp_path / "x.states"
+    # Later rows are wider than the first; spacing and a "#" inside a data line are part of the source text.
+    states.write_text("  1   0.000000  1  0\n2 3.845033 3 1 - X #v=0\n3\t11.535050 5 2 + X a b\n", encoding="utf-8")
+    trans = tmp_path / "x.trans"
+    # Extra columns after nu are ignored except in exomol_raw.
+    trans.write_text("2  1  7.5e-08  3.845033  0.1  x\n3 1 1.0e-09\n", encoding="utf-8")
+
+    rr = normalize_exomol.run(
+        formula="CO",
+        isotopologue_label="12C-16O",
+        states_path=states,
+        trans_paths=[trans],
+        ref_id="EXOMOL:CO:Li2015",
+        max_transitions=None,
+    )
+    assert (rr.states_written, rr.transitions_written) == (3, 2)
+
+    exomol = [json.loads(r["vibrational_json"])["exomol"] for r in read_ndjson(paths.normalized_dir / "states.ndjson")]
+    assert [e["extra_cols"] for e in exomol] == [[], ["-", "X", "#v=0"], ["+", "X", "a", "b"]]
+    assert [e["raw"] for e in exomol] == ["1   0.000000  1  0", "2 3.845033 3 1 - X #v=0", "3\t11.535050 5 2 + X a b"]
+
+    trans_rows = read_ndjson(paths.normalized_dir / "transitions.ndjson")
+    assert [r["quantity_value"] for r in trans_rows] == [3.845033, 11.53505]
+    assert [json.loads(r["intensity_json"])["Afi_s-1"] for r in trans_rows] == [7.5e-08, 1.0e-09]
+    assert json.loads(trans_rows[0]["extra_json"])["exomol_raw"] == "2  1  7.5e-08  3.845033  0.1  x"
+
+
+def test_exomol_bz2_uses_parallel_decoder_when_available(monkeypatch, tmp_path: Path) -> None:
+    opened: list[tuple[str, int]] = []
+
+    def _open(path: str, parallelization: int):
+        opened.append((path, parallelization))
+        return bz2.open(path, "rb")
+
+    monkeypatch.setattr(normalize_exomol, "indexed_bzip2", types.SimpleNamespace(open=_open))
+
+    states = tmp_path / "x.states.bz2"
+    states.write_bytes(bz2.compress(b"1 0.0 1 0\n2 1.5 3 1\n"))
+    frames = list(normalize_exomol._iter_lines(states))
+
+    assert opened and opened[0][0] == str(states)
+    assert sum(len(f) for f in frames) == 2
+
+
+def test_ndjson_writer_appends_batches_through_one_handle(tmp_path: Path) -> None:
+    out = tmp_path / "nested" / "rows.ndjson"
+    with ndjson_writer(out) as write_rows:
+        assert write_rows([]) == 0
+        assert not out.exists()  # nothing written yet, so no empty file is left behind
+        assert write_rows([{"a": 1}, {"a": 2}]) == 2
+        assert write_rows(iter([{"a": "é"}])) == 1
+    assert read_ndjson(out) == [{"a": 1}, {"a": 2}, {"a": "é"}]
+
+
+def test_exomol_parallel_trans_files_match_sequential(monkeypatch, tmp_path: Path) -> None:
+    states = tmp_path / "x.states"
+    states.write_text("1 0.0 1 0\n2 3.845033 3 1\n3 11.535050 5 2\n", encoding="utf-8")
+    trans = [tmp_path / "a.trans", tmp_path / "b.trans"]
+    trans[0].write_text("2 1 7.5e-08 3.845033\n", encoding="utf-8")
+    trans[1].write_text("3 2 7.2e-07 7.690017\n3 1 1.0e-09\n", encoding="utf-8")
+
+    outputs = []
+    for workers in (1, 2):
+        paths = RepoPaths(repo_root=tmp_path / f"repo{workers}")
+        monkeypatch.setattr(normalize_exomol, "get_paths", lambda paths=paths: paths)
+        rr = normalize_exomol.run(
+            formula="CO",
+            isotopologue_label="12C-16O",
+            states_path=states,
+            trans_paths=trans,
+            ref_id="EXOMOL:CO:Li2015",
+            max_transitions=None,
+            workers=workers,
+        )
+        assert rr.transitions_written == 3
+        outputs.append((paths.normalized_dir / "transitions.ndjson").read_bytes())
+        # Shard scratch space is cleaned up.
+        assert [p.name for p in paths.normalized_dir.iterdir() if p.name.startswith(".")] == []
+
+    assert outputs[0] == outputs[1]
+
+
+def test_ndjson_json_helpers_round_trip_non_finite_and_unicode() -> None:
+    # NaN is what json.dumps writes for missing ExoMol values; it must decode with or without orjson.
+    assert math.isnan(json_loads(b'{"x": NaN}')["x"])
+    assert json_loads('{"a": "é"}') == {"a": "é"}
+    assert json_dumps_compact({"a": "é", "b": [1, True]}) == '{"a":"é","b":[1,true]}'
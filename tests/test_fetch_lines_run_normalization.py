@@ -2,56 +2,32 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
 from pathlib import Path
 from textwrap import dedent
 
+import pandas as pd
 import pytest
 
 import spectra_db.scrapers.nist_asd.fetch_lines as fetch_lines
+from spectra_db.scrapers.nist_asd.table_cells import safe_float, safe_float_column
 from spectra_db.util.paths import RepoPaths
+from tests._fakes import FakeFetchResult, read_ndjson
 
+_WIDTHS = [18, 8, 18, 8, 18, 22, 12, 10, 6, 12, 10, 6, 6, 10, 10, 12]
 
-@dataclass
-class _FakeFetchResult:
-    status_code: int
-    content_path: Path
+# "{:<w.w}" pads AND truncates each cell to exactly w chars.
+# IMPORTANT: header strings must not overflow into neighboring columns, because
+# parse_lines_response() slices header lines by fixed pipe positions.
+_ROW_FMT = " | ".join(f"{{:<{w}.{w}}}" for w in _WIDTHS) + " |"
 
 
-def _read_ndjson(path: Path) -> list[dict]:
-    assert path.exists(), f"Missing NDJSON: {path}"
-    out: list[dict] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        out.append(json.loads(line))
-    return out
+def _make_fixed_width_row(cells: list[str]) -> str:
+    return _ROW_FMT.format(*cells)
 
 
-def _fit_cell(value: str, width: int) -> str:
-    """
-    IMPORTANT: header strings must not overflow into neighboring columns, because
-    parse_lines_response() slices header lines by fixed pipe positions.
-    """
-    s = str(value)
-    if len(s) > width:
-        s = s[:width]
-    return s.ljust(width)
-
-
-def _make_fixed_width_row(cells: list[str], widths: list[int]) -> str:
-    parts = [_fit_cell(c, w) for c, w in zip(cells, widths, strict=True)]
-    return " | ".join(parts) + " |"
-
-
-def test_fetch_lines_run_packed_energies_term_spaces_url_reconstruction_and_dedupe(monkeypatch, tmp_path: Path) -> None:
-    repo_root = tmp_path / "repo_root"
-    paths = RepoPaths(repo_root=repo_root)
-    monkeypatch.setattr(fetch_lines, "get_paths", lambda: paths)
-
-    widths = [18, 8, 18, 8, 18, 22, 12, 10, 6, 12, 10, 6, 6, 10, 10, 12]
-
+@pytest.fixture(scope="module")
+def fake_lines_html_bytes() -> bytes:
+    """Fake lines1.pl response (fixed-width <pre> table), assembled once per module."""
     # Keep headers SHORT so they fit within widths (no overflow -> no mislabeling)
     header_detail = _make_fixed_width_row(
         [
@@ -71,11 +47,10 @@ def test_fetch_lines_run_packed_energies_term_spaces_url_reconstruction_and_dedu
             "TP Ref",
             "Line Ref",
             "ExtraCol",
-        ],
-        widths,
+        ]
     )
 
-    header_2 = _make_fixed_width_row([""] * len(widths), widths)
+    header_2 = _make_fixed_width_row([""] * len(_WIDTHS))
 
     data = _make_fixed_width_row(
         [
@@ -95,13 +70,12 @@ def test_fetch_lines_run_packed_energies_term_spaces_url_reconstruction_and_dedu
             "T7771",
             "L8672c99",
             "hello",
-        ],
-        widths,
+        ]
     )
 
     sep = "-" * len(header_detail)
 
-    html = dedent(
+    return dedent(
         f"""\
         <html><body><pre>
         {sep}
@@ -114,13 +88,25 @@ def test_fetch_lines_run_packed_energies_term_spaces_url_reconstruction_and_dedu
         """
     ).encode("utf-8")
 
-    raw_dir = paths.raw_dir / "nist_asd" / "lines"
-    raw_dir.mkdir(parents=True, exist_ok=True)
-    body_path = raw_dir / "fake.body"
-    body_path.write_bytes(html)
+
+@pytest.fixture(scope="module")
+def lines_body_path(tmp_path_factory, fake_lines_html_bytes: bytes) -> Path:
+    """Cached body file shared by both runs of the dedupe test."""
+    body_path = tmp_path_factory.mktemp("lines_raw") / "fake.body"
+    body_path.write_bytes(fake_lines_html_bytes)
+    return body_path
+
+
+def test_fetch_lines_run_packed_energies_term_spaces_url_reconstruction_and_dedupe(monkeypatch, tmp_path: Path, lines_body_path: Path) -> None:
+    repo_root = tmp_path / "repo_root"
+    paths = RepoPaths(repo_root=repo_root)
+    monkeypatch.setattr(fetch_lines, "get_paths", lambda: paths)
+
+    params_seen: list[dict] = []
 
     def _fake_fetch_cached(*, url, params, cache_dir, force, **kwargs):
-        return _FakeFetchResult(status_code=200, content_path=body_path)
+        params_seen.append(params)
+        return FakeFetchResult(status_code=200, content_path=lines_body_path, params=params)
 
     monkeypatch.setattr(fetch_lines, "fetch_cached", _fake_fetch_cached)
 
@@ -134,12 +120,15 @@ def test_fetch_lines_run_packed_energies_term_spaces_url_reconstruction_and_dedu
     )
     assert res1.ok is True
     assert res1.written == 1
+    # Truncation signals come back with the result, so bulk ingest never re-parses the body.
+    assert res1.parsed_rows >= 1
+    assert res1.page_size == int(params_seen[0]["page_size"])
 
     trans_path = paths.normalized_dir / "transitions.ndjson"
     refs_path = paths.normalized_dir / "refs.ndjson"
 
-    trans = _read_ndjson(trans_path)
-    refs = _read_ndjson(refs_path)
+    trans = read_ndjson(trans_path)
+    refs = read_ndjson(refs_path)
 
     assert len(trans) == 1
     t0 = trans[0]
@@ -185,4 +174,10 @@ def test_fetch_lines_run_packed_energies_term_spaces_url_reconstruction_and_dedu
     )
     assert res2.ok is True
     assert res2.written == 0
-    assert len(_read_ndjson(trans_path)) == 1
+    assert len(read_ndjson(trans_path)) == 1
+
+
+@pytest.mark.parametrize("edge_chars", ["", "[]()"])
+def test_safe_float_column_matches_scalar_parser(edge_chars: str) -> None:
+    cells = pd.Series(["656.279 1", "1,234.5e3", None, "nan", "", "abc", "-0.5?", "[12.5]", "123.4(5)", float("nan"), 3.25])
+    assert safe_float_column(cells, edge_chars=edge_chars) == [safe_float(c, edge_chars=edge_chars) for c in cells]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from spectra_db.scrapers.common import http
+from spectra_db.scrapers.common.http import AdaptivePacer, TokenBucket, backoff_delay, parse_retry_after
+
+
+def test_parse_retry_after_seconds_and_http_date() -> None:
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(" 2.5 ") == 2.5
+    # A date in the past means "retry now", not a negative wait.
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_backoff_delay_jitter_cap_and_retry_after_floor(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(http.random, "uniform", lambda a, b: b)  # worst-case jitter
+    assert backoff_delay(0, 1.0) == 2.0
+    assert backoff_delay(3, 1.0) == 9.0
+    assert backoff_delay(10, 1.0) == 61.0  # exponential part capped at 60s
+    assert backoff_delay(0, 1.0, retry_after_s=30.0) == 30.0
+
+    monkeypatch.setattr(http.random, "uniform", lambda a, b: a)
+    assert backoff_delay(2, 0.5) == 2.0
+
+
+def test_token_bucket_allows_burst_then_waits_for_refill(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = {"t": 0.0}
+    slept: list[float] = []
+
+    def fake_sleep(s: float) -> None:
+        slept.append(s)
+        clock["t"] += s
+
+    monkeypatch.setattr(http.time, "monotonic", lambda: clock["t"])
+    monkeypatch.setattr(http.time, "sleep", fake_sleep)
+
+    bucket = TokenBucket(rate=5.0, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    assert slept == []  # the burst is free
+    bucket.acquire()
+    assert slept == [pytest.approx(0.2)]  # then one token per 1/rate seconds
+
+
+def test_adaptive_pacer_halves_on_429_and_climbs_on_success_streaks() -> None:
+    pacer = AdaptivePacer(4.0, step=0.5, increase_every=2, max_rate=4.5, min_rate=1.5)
+    pacer.on_429()
+    assert pacer.rate == 2.0
+    pacer.on_429()
+    assert pacer.rate == 1.5  # floored at min_rate
+    pacer.on_success()
+    assert pacer.rate == 1.5  # needs a full streak
+    pacer.on_success()
+    assert pacer.rate == 2.0
+    for _ in range(20):
+        pacer.on_success()
+    assert pacer.rate == 4.5  # capped at max_rate
+
+
+def test_fetch_cached_does_not_replay_retry_after_on_cache_hit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Resp:
+        status_code = 429
+        content = b"slow down"
+        headers = {"Retry-After": "120"}
+
+    class _Session:
+        def get(self, url, params=None, headers=None, timeout=None):
+            return _Resp()
+
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
+    fresh = http.fetch_cached(url="https://example.test/x", params={}, cache_dir=tmp_path, session=_Session())
+    assert not fresh.from_cache and fresh.retry_after == "120"
+
+    cached = http.fetch_cached(url="https://example.test/x", params={}, cache_dir=tmp_path, session=_Session())
+    assert cached.from_cache and cached.status_code == 429
+    assert cached.retry_after is None
+
+
+def test_fetch_cached_reports_status_only_for_network_responses(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Resp:
+        status_code = 429
+        content = b""
+        headers: dict[str, str] = {}
+
+    class _Session:
+        def get(self, url, params=None, headers=None, timeout=None):
+            return _Resp()
+
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
+    pacer = AdaptivePacer(4.0)
+    for _ in range(2):
+        http.fetch_cached(url="https://example.test/y", params={}, cache_dir=tmp_path, session=_Session(), on_status=pacer.observe)
+    assert pacer.rate == 2.0  # the second call was a cache hit and did not count
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from spectra_db.scrapers.common.ids import id_maker, make_id, short_hash
+
+
+def test_make_id_is_stable() -> None:
+    # IDs are persisted in NDJSON and DuckDB; these values must never change.
+    assert make_id("state", "ASD:He:0/main", "1s2", "1S", "0", "0.0") == "state_28e9824ac1bcf8ec"
+    assert make_id("trans", "MOL:CO:+0/12C-16O", "2", "1", "3.845033", "7.5e-08") == "trans_24fd3e6d24e78937"
+    assert make_id("x") == "x_a10629cfa782abfe"
+
+
+def test_short_hash_odd_length() -> None:
+    assert short_hash("abc", 7) == "ba7816b"
+
+
+def test_id_maker_matches_make_id() -> None:
+    make_trans = id_maker("trans", "MOL:CO:+0/12C-16O")
+    assert make_trans("2", "1", "3.845033", "7.5e-08") == "trans_24fd3e6d24e78937"
+    assert id_maker("state")("ASD:He:0/main", "1s2", "1S", "0", "0.0") == "state_28e9824ac1bcf8ec"
+    assert id_maker("state", "ASD:He:0/main", "1s2")() == make_id("state", "ASD:He:0/main", "1s2")
+    assert id_maker("x")() == "x_a10629cfa782abfe"
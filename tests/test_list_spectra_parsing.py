@@ -0,0 +1,9 @@
+from spectra_db.scrapers.nist_asd import list_spectra
+
+
+def test_hold_links_and_spectra_labels_are_extracted_in_order() -> None:
+    pt = '<table><tr><td><a href="levels_hold.pl?el=Ca">Ca</a></td><td><a href="/cgi-bin/ASD/levels_hold.pl?el=Ca">Ca</a></td><td><a href="other.pl">x</a></td></tr></table>'
+    assert list_spectra._extract_hold_links(pt, list_spectra.LEVELS_PT) == ["https://physics.nist.gov/cgi-bin/ASD/levels_hold.pl?el=Ca"]
+
+    hold = "<table><tr><td>Ca I</td><td>Ca II</td></tr><tr><td>Ca I</td><td>Ca III</td></tr></table>"
+    assert list_spectra._extract_spectra_from_hold_page(hold) == ["Ca I", "Ca II", "Ca III"]
@@ -1,4 +1,6 @@
-from spectra_db.scrapers.nist_asd.fetch_levels import _safe_float  # type: ignore
+import pandas as pd
+
+from spectra_db.scrapers.nist_asd.fetch_levels import _safe_float, _safe_float_column  # type: ignore
 from spectra_db.scrapers.nist_asd.parse_levels import parse_levels_response
 
 
@@ -28,3 +30,29 @@ def test_parse_levels_selects_levels_table() -> None:
     level_col = [c for c in df.columns if "Level" in str(c)][0]
     assert _safe_float(df.iloc[0][level_col]) == 82258.9191133
     assert _safe_float(df.iloc[1][level_col]) == 82259.2850014
+
+
+def test_safe_float_column_matches_scalar_parser() -> None:
+    cells = pd.Series(["82 258.9191133", "[12 345.6]", None, "nan", "", "abc", "1,234.5e3", "-0.5?", float("nan"), 3.25])
+    assert _safe_float_column(cells) == [_safe_float(c) for c in cells]
+
+
+def test_safe_float_strips_brackets_only_at_the_edges() -> None:
+    # An interior "(5)" is an uncertainty in the last digit, not more digits of the value.
+    cells = pd.Series(["123.4(5)", "2.5 (3)", "[12 345.6]", "(7.5)", " [1.25] "])
+    expected = [123.4, 2.5, 12345.6, 7.5, 1.25]
+    assert [_safe_float(c) for c in cells] == expected
+    assert _safe_float_column(cells) == expected
+
+
+def test_safe_float_fast_path_for_numeric_cells() -> None:
+    for x in (3.25, -0.5, 1e-07, 1.5e20):
+        assert _safe_float(x) == _safe_float(str(x))
+    assert _safe_float(float("nan")) is None
+    assert _safe_float(float("inf")) is None
+
+
+def test_safe_float_column_numeric_dtypes_skip_text_parsing() -> None:
+    for cells in (pd.Series([1.5, float("nan"), -2.0]), pd.Series([3, -4]), pd.Series([1, None], dtype="Int64")):
+        assert _safe_float_column(cells) == [_safe_float(str(c)) for c in cells]
+    assert _safe_float(True) is None  # bools are not treated as numbers
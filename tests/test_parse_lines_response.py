@@ -1,9 +1,10 @@
-from spectra_db.scrapers.nist_asd.parse_lines import parse_lines_response
+import pandas as pd
+import pytest
 
+from spectra_db.scrapers.nist_asd.parse_lines import parse_lines_response
 
-def test_parse_lines_multiline_header_pre() -> None:
-    # Fixed-width columns so '|' positions align across header + data
-    html = b"""
+# Fixed-width columns so '|' positions align across header + data
+_HTML = b"""
     <html><body><pre>
 ------------------------------------------------------------------------------------------------
 | Observed             | Unc.   | Ritz                 | Wavenumber     | Ei        | Ek        | Type | Ref   |
@@ -14,14 +15,42 @@ def test_parse_lines_multiline_header_pre() -> None:
 ------------------------------------------------------------------------------------------------
     </pre></body></html>
     """
-    df = parse_lines_response(html)
-    assert df.shape[0] == 2
 
+
+@pytest.fixture(scope="module")
+def lines_df() -> pd.DataFrame:
+    """Parse the multiline-header <pre> table once; the tests below only read it."""
+    return parse_lines_response(_HTML)
+
+
+def test_parse_lines_multiline_header_pre_rows(lines_df: pd.DataFrame) -> None:
+    assert lines_df.shape[0] == 2
+
+
+def test_parse_lines_multiline_header_pre_merged_headers(lines_df: pd.DataFrame) -> None:
     # Column names should include merged multiline headers.
     # Your parser may canonicalize the exact names; this checks the intent.
-    assert any("Observed" in c and "Wavelength" in c for c in df.columns)
-    assert any("Wavenumber" in c for c in df.columns)
+    assert any("Observed" in c and "Wavelength" in c for c in lines_df.columns)
+    assert any("Wavenumber" in c for c in lines_df.columns)
+
 
-    # Optional: ensure data landed in the correct columns (more meaningful than header text)
-    obs_col = next(c for c in df.columns if "Observed" in c)
-    assert df.iloc[0][obs_col].strip() == "656.2800"
+def test_parse_lines_multiline_header_pre_data_alignment(lines_df: pd.DataFrame) -> None:
+    # Ensure data landed in the correct columns (more meaningful than header text)
+    obs_col = next(c for c in lines_df.columns if "Observed" in c)
+    assert lines_df.iloc[0][obs_col].strip() == "656.2800"
+
+
+def test_parse_lines_drops_spacer_rows_and_empty_unnamed_columns() -> None:
+    html = b"""<pre>
+------------------------------------------------
+| Observed   | Unc.   |       | Ref   |
+| Wavelength | (nm)   |       |       |
+------------------------------------------------
+| 656.2800   | 0.001  |       | L1    |
+|            |        |       |       |
+| 486.1330   | 0.002  |       | L2    |
+------------------------------------------------
+</pre>"""
+    df = parse_lines_response(html)
+    assert df["Observed Wavelength"].tolist() == ["656.2800", "486.1330"]
+    assert not any(str(c).startswith("col_") for c in df.columns)
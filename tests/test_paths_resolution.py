@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from spectra_db.util.paths import get_paths
+from spectra_db.util.paths import clear_paths_cache, get_paths
 
 
 def test_paths_env_override(monkeypatch, tmp_path: Path) -> None:
@@ -12,3 +12,34 @@ def test_paths_env_override(monkeypatch, tmp_path: Path) -> None:
     assert p.source == "env"
     assert p.data_dir == d
     assert p.db_dir == d / "db"
+
+
+def test_paths_memoized_per_cwd(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.delenv("SPECTRA_DB_DATA_DIR", raising=False)
+    repo = tmp_path / "repo"
+    (repo / "sub").mkdir(parents=True)
+    monkeypatch.chdir(repo / "sub")
+
+    clear_paths_cache()
+    first = get_paths()
+    assert first is get_paths()
+
+    # A pyproject.toml appearing mid-process is only seen after the cache is cleared.
+    (repo / "pyproject.toml").write_text("[project]\nname='x'\n", encoding="utf-8")
+    clear_paths_cache()
+    p = get_paths()
+    assert p.source == "repo"
+    assert p.repo_root == repo.resolve()
+
+
+def test_paths_cache_hit_skips_resolve(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.delenv("SPECTRA_DB_DATA_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+    clear_paths_cache()
+    first = get_paths()
+
+    def _no_resolve(self, strict=False):
+        raise AssertionError("cached get_paths() should not resolve the CWD again")
+
+    monkeypatch.setattr(Path, "resolve", _no_resolve)
+    assert get_paths() is first
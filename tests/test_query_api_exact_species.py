@@ -52,6 +52,10 @@ def test_find_species_exact_matches_reversed_formula(tmp_path: Path) -> None:
     rows2 = api.find_species_exact("HF", by=("formula",), limit=10, include_formula_reversal=False)
     assert rows2 == []
 
+    # Formula matching is case-insensitive (lower(formula) on both sides).
+    rows3 = api.find_species_exact("fh", by=("formula",), limit=10, include_formula_reversal=False)
+    assert [r["species_id"] for r in rows3] == ["MOL:HF:+0"]
+
 
 def test_resolve_species_id_prefers_exact_over_fuzzy(tmp_path: Path) -> None:
     api = _init_molecular_db(tmp_path)
@@ -75,3 +79,20 @@ def test_resolve_species_id_prefers_exact_over_fuzzy(tmp_path: Path) -> None:
     # Exact-first should still resolve HF correctly (via reversal)
     sid = api.resolve_species_id("HF", exact_first=True, fuzzy_fallback=True, fuzzy_limit=10, include_formula_reversal=True)
     assert sid == "MOL:HF:+0"
+
+
+def test_resolve_species_id_exact_mode_priority(tmp_path: Path) -> None:
+    api = _init_molecular_db(tmp_path)
+
+    insert = "INSERT INTO species(species_id, formula, name, charge, multiplicity, inchi_key, tags, notes, extra_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    # "NO" matches one species by name and another by formula; formula outranks name.
+    api.con.execute(insert, ["MOL:X:+0", "X", "NO", 0, None, None, "webbook", None, None])
+    api.con.execute(insert, ["MOL:NO:+0", "NO", "Nitric oxide", 0, None, None, "webbook", None, None])
+    assert api.resolve_species_id("NO", fuzzy_fallback=False) == "MOL:NO:+0"
+
+    # An exact species_id outranks both.
+    api.con.execute(insert, ["NO", "N2O", "Nitrous oxide", 0, None, None, "webbook", None, None])
+    assert api.resolve_species_id("NO", fuzzy_fallback=False) == "NO"
+
+    assert api.resolve_species_id("Nitric oxide", fuzzy_fallback=False) == "MOL:NO:+0"
+    assert api.resolve_species_id("nothing like this", fuzzy_fallback=False) is None
@@ -11,6 +11,8 @@ def test_query_api_levels_and_lines(tmp_path: Path) -> None:
     store.init_schema()
 
     with store.connect() as con:
+        # One explicit transaction for the setup INSERTs (a single commit instead of one per statement).
+        con.begin()
         # Minimal refs/species/iso
         con.execute("INSERT INTO refs(ref_id, citation, doi, url, notes) VALUES ('L1','c',NULL,'https://example.com/ref','n')")
         con.execute("INSERT INTO species(species_id, formula, name, charge, multiplicity, inchi_key, tags, notes) VALUES ('ASD:H:+0','H','H I',0,NULL,NULL,'atomic',NULL)")
@@ -47,6 +49,7 @@ def test_query_api_levels_and_lines(tmp_path: Path) -> None:
                 None,
             ],
         )
+        con.commit()
 
         api = QueryAPI(con=con)
 
@@ -65,3 +68,16 @@ def test_query_api_levels_and_lines(tmp_path: Path) -> None:
         assert payload_out["wavenumber_cm-1"] == 15233.0
 
         assert lines[0]["extra_json"] is not None
+
+        frame = api.lines("ASD:H:+0/main", unit="nm", min_wav=650, max_wav=660, limit=10, as_frame=True)
+        assert list(frame["wavelength"]) == [656.28]
+        assert frame["ref_url"].iloc[0] == "https://example.com/ref"
+        assert json.loads(frame["intensity_json"].iloc[0]) == payload
+
+        levels_frame = api.atomic_levels("ASD:H:+0/main", limit=10, as_frame=True)
+        assert levels_frame.to_dict("records")[0]["lande_g"] == levels[0]["lande_g"]
+        assert list(levels_frame.columns) == list(levels[0])
+
+        # Ei_cm-1 filtering happens in SQL; the line's Ei is 0.0.
+        assert len(api.lines("ASD:H:+0/main", unit="nm", max_lower_energy=0.0, limit=10)) == 1
+        assert api.lines("ASD:H:+0/main", unit="nm", max_lower_energy=-1.0, limit=10) == []
@@ -1,5 +1,4 @@
-from spectra_db.scrapers.nist_asd.fetch_levels import extract_ref_urls_from_html as extract_levels
-from spectra_db.scrapers.nist_asd.fetch_lines import extract_ref_urls_from_html as extract_lines
+from spectra_db.util.ref_url import extract_ref_urls
 
 
 def test_extract_ref_urls_from_html_popded() -> None:
@@ -12,8 +11,25 @@ def test_extract_ref_urls_from_html_popded() -> None:
       </a>
     </body></html>
     """
-    m1 = extract_levels(html)
-    m2 = extract_lines(html)
+    m1 = extract_ref_urls(html)
+    m2 = extract_ref_urls(html.encode("utf-8"))
     assert m1["L8672c99"].startswith("https://physics.nist.gov/cgi-bin/ASBib1/get_ASBib_ref.cgi?")
     assert "comment_code=c99" in m1["L8672c99"]
     assert m1 == m2
+
+
+def test_extract_ref_urls_multiple_anchors_in_cell() -> None:
+    html = (
+        "<td>"
+        '<a class="bib" onclick="popded(\'u?db_id=1&amp;type=T\');return false"><span>T1</span></a>, '
+        '<a class="bib" onclick="popded(\'u?db_id=2&amp;type=T\');return false">T2</a>, '
+        '<a href="/plain">not a ref</a>'
+        "</td>"
+    )
+    assert extract_ref_urls(html) == {"T1": "u?db_id=1&type=T", "T2": "u?db_id=2&type=T"}
+
+
+def test_extract_ref_urls_single_quoted_onclick_and_bytes() -> None:
+    html = "<a onclick='popded(\"u?db_id=3&amp;type=L\")'>L3 é</a>"
+    assert extract_ref_urls(html) == {"L3 é": "u?db_id=3&type=L"}
+    assert extract_ref_urls(html.encode("utf-8")) == {"L3 é": "u?db_id=3&type=L"}
@@ -3,22 +3,20 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import pytest
+
 from spectra_db.scrapers.nist_webbook import normalize_cache
 from spectra_db.util.paths import RepoPaths
+from tests._fakes import read_ndjson
 
 
-def _read_ndjson(path: Path) -> list[dict]:
-    if not path.exists():
-        return []
-    out = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if line:
-            out.append(json.loads(line))
-    return out
-
+@pytest.mark.parametrize("workers", [None, 2])
+def test_normalize_cache_dir_ingests_once_and_is_idempotent(monkeypatch, tmp_path: Path, workers: int | None) -> None:
+    run_kw = {} if workers is None else {"workers": workers}
+    if workers is None:
+        # The library default is serial: no process pool started behind the caller's back.
+        monkeypatch.setattr(normalize_cache, "ProcessPoolExecutor", None)
 
-def test_normalize_cache_dir_ingests_once_and_is_idempotent(monkeypatch, tmp_path: Path) -> None:
     # Fake repo layout
     repo_root = tmp_path / "repo"
     repo_root.mkdir(parents=True, exist_ok=True)
@@ -84,7 +82,7 @@ def test_normalize_cache_dir_ingests_once_and_is_idempotent(monkeypatch, tmp_pat
     write_cache("bbb222", "C1333740")
 
     # Run 1: should process both
-    rr1 = normalize_cache.run(cache_dir=cache_dir)
+    rr1 = normalize_cache.run(cache_dir=cache_dir, **run_kw)
     assert rr1.ok is True
     assert rr1.eligible == 2
     assert rr1.processed == 2
@@ -95,17 +93,79 @@ def test_normalize_cache_dir_ingests_once_and_is_idempotent(monkeypatch, tmp_pat
     # Ensure molecular NDJSON written
     params_path = paths.normalized_molecular_dir / "parameters.ndjson"
     assert params_path.exists()
-    params = _read_ndjson(params_path)
+    params = read_ndjson(params_path)
     assert any(p["name"] == "we" for p in params)
 
     # Ensure ingest log created with both cache keys
     log_path = paths.normalized_molecular_dir / "webbook_ingested.ndjson"
-    log = _read_ndjson(log_path)
+    log = read_ndjson(log_path)
     keys = {r["cache_key"] for r in log}
     assert keys == {"aaa111", "bbb222"}
 
+    sidecar = paths.normalized_molecular_dir / "webbook_ingested.keys"
+    assert set(sidecar.read_text(encoding="utf-8").split()) == keys
+
     # Run 2: should skip both as already ingested
-    rr2 = normalize_cache.run(cache_dir=cache_dir)
+    rr2 = normalize_cache.run(cache_dir=cache_dir, **run_kw)
     assert rr2.ok is True
     assert rr2.processed == 0
     assert rr2.skipped_already_ingested == 2
+
+
+def test_normalize_cache_rebuilds_missing_keys_sidecar(monkeypatch, tmp_path: Path) -> None:
+    paths = RepoPaths(repo_root=tmp_path / "repo")
+    cache_dir = paths.raw_dir / "nist_webbook" / "cbook"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    paths.normalized_molecular_dir.mkdir(parents=True, exist_ok=True)
+    monkeypatch.setattr(normalize_cache, "get_paths", lambda: paths)
+
+    # Ingest log from an older run, before the sidecar existed.
+    log_path = paths.normalized_molecular_dir / "webbook_ingested.ndjson"
+    log_path.write_bytes(json.dumps({"cache_key": "aaa111", "webbook_id": "C630080"}).encode("utf-8") + b"\n")
+    (cache_dir / "aaa111.body").write_text("<html></html>", encoding="utf-8")
+    (cache_dir / "aaa111.meta.json").write_text(json.dumps({"status_code": 200, "params": {"ID": "C630080", "Mask": "1000"}}), encoding="utf-8")
+
+    rr = normalize_cache.run(cache_dir=cache_dir)
+    assert rr.skipped_already_ingested == 1
+    assert (paths.normalized_molecular_dir / "webbook_ingested.keys").read_text(encoding="utf-8") == "aaa111\n"
+
+
+def test_normalize_cache_rebuilds_keys_sidecar_that_no_longer_matches_the_log(monkeypatch, tmp_path: Path) -> None:
+    paths = RepoPaths(repo_root=tmp_path / "repo")
+    cache_dir = paths.raw_dir / "nist_webbook" / "cbook"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    paths.normalized_molecular_dir.mkdir(parents=True, exist_ok=True)
+    monkeypatch.setattr(normalize_cache, "get_paths", lambda: paths)
+
+    log_path = paths.normalized_molecular_dir / "webbook_ingested.ndjson"
+    keys_path = paths.normalized_molecular_dir / "webbook_ingested.keys"
+    log_path.write_bytes(json.dumps({"cache_key": "aaa111"}).encode("utf-8") + b"\n")
+    keys_path.write_text("aaa111\n", encoding="utf-8")
+    assert normalize_cache._load_ingested_keys(log_path, keys_path) == {"aaa111"}
+
+    # A crash after the log append but before the sidecar append: the log holds a key the sidecar lacks.
+    with log_path.open("ab") as f:
+        f.write(json.dumps({"cache_key": "bbb222"}).encode("utf-8") + b"\n")
+    assert normalize_cache._load_ingested_keys(log_path, keys_path) == {"aaa111", "bbb222"}
+
+    # The log replaced by one that never ingested bbb222: the sidecar's extra key must not be trusted.
+    log_path.write_bytes(json.dumps({"cache_key": "aaa111"}).encode("utf-8") + b"\n" + b" " * 40 + b"\n")
+    assert normalize_cache._load_ingested_keys(log_path, keys_path) == {"aaa111"}
+    assert keys_path.read_text(encoding="utf-8") == "aaa111\n"
+
+
+def test_normalize_cache_skips_other_masks_by_marker(monkeypatch, tmp_path: Path) -> None:
+    paths = RepoPaths(repo_root=tmp_path / "repo")
+    cache_dir = paths.raw_dir / "nist_webbook" / "cbook"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    monkeypatch.setattr(normalize_cache, "get_paths", lambda: paths)
+
+    # The marker alone decides: the meta is deliberately unreadable.
+    (cache_dir / "ccc333.body").write_text("<html></html>", encoding="utf-8")
+    (cache_dir / "ccc333.meta.json").write_text("not json", encoding="utf-8")
+    (cache_dir / "ccc333.mask2").touch()
+
+    rr = normalize_cache.run(cache_dir=cache_dir, workers=1)
+    assert rr.ok is True
+    assert rr.skipped_non_diatomic_mask == 1
+    assert rr.errors == 0
@@ -7,17 +7,7 @@ import pytest
 
 from spectra_db.scrapers.nist_webbook import normalize_diatomic_constants as norm
 from spectra_db.util.paths import RepoPaths
-
-
-def _read_ndjson(path: Path) -> list[dict]:
-    if not path.exists():
-        return []
-    out = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if line:
-            out.append(json.loads(line))
-    return out
+from tests._fakes import read_ndjson
 
 
 def test_webbook_normalizer_scrapes_notes_references_and_footnotes_and_keeps_cell_targets(monkeypatch, tmp_path: Path) -> None:
@@ -93,10 +83,10 @@ def test_webbook_normalizer_scrapes_notes_references_and_footnotes_and_keeps_cel
 
     outdir = getattr(paths, "normalized_molecular_dir", paths.normalized_dir)
 
-    species = _read_ndjson(outdir / "species.ndjson")
-    params = _read_ndjson(outdir / "parameters.ndjson")
-    refs = _read_ndjson(outdir / "refs.ndjson")
-    states = _read_ndjson(outdir / "states.ndjson")
+    species = read_ndjson(outdir / "species.ndjson")
+    params = read_ndjson(outdir / "parameters.ndjson")
+    refs = read_ndjson(outdir / "refs.ndjson")
+    states = read_ndjson(outdir / "states.ndjson")
 
     assert species, "species.ndjson should not be empty"
     sx = json.loads(species[0].get("extra_json") or "{}")